@@ -1,18 +1,20 @@
 import streamlit as st
 import pandas as pd
 import re
-import io
 from typing import Dict, List, Tuple
 import base64
 
-def parse_slk_file(file_content: str) -> pd.DataFrame:
+from slk_exporters import export_bytes
+from slk_sources import iter_lines
+
+def parse_slk_file(file_content) -> pd.DataFrame:
     """
-    Parse SLK file content and extract data into a structured format.
+    Parse SLK file content (de tekst, of een iterator met regels) and extract data into a structured format.
     """
     data = []
     current_row = {}
     
-    lines = file_content.split('\n')
+    lines = file_content.split('\n') if isinstance(file_content, str) else file_content
     for line in lines:
         line = line.strip()
         
@@ -100,12 +102,8 @@ def convert_to_routemeister_format(df: pd.DataFrame, column_mapping: Dict[str, s
 
 def get_download_link(df: pd.DataFrame, filename: str, text: str):
     """Generate a download link for the DataFrame."""
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Data')
-    
-    buffer.seek(0)
-    b64 = base64.b64encode(buffer.read()).decode()
+    # XLSX met headers via de gedeelde exporters (werkblad 'Data')
+    b64 = base64.b64encode(export_bytes(df, 'xlsx', header=True)).decode()
     href = f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="{filename}">{text}</a>'
     return href
 
@@ -172,12 +170,12 @@ def main():
         st.subheader("📁 Input Data")
         
         if uploaded_file is not None:
-            # Read file content
-            file_content = uploaded_file.read().decode('utf-8', errors='ignore')
+            # De upload in blokken decoderen en regel voor regel parsen, zonder kopie van de hele tekst
+            uploaded_file.seek(0)
             
             # Parse SLK file
             with st.spinner("SLK bestand wordt geparsed..."):
-                df = parse_slk_file(file_content)
+                df = parse_slk_file(iter_lines(uploaded_file, 'utf-8'))
             
             if not df.empty:
                 st.success(f"✅ {len(df)} records gevonden!")
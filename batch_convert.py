@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Batch conversie van Meditec exports naar Routemeister bestanden.
+
+Elke bron (een .slk, de inhoud van een .slk.gz of een lid van een zip) wordt een
+eigen output in --out-dir, met dezelfde pipeline als de app: Routemeister
+formaat, opgeschoond, zonder headers. Leden van een zip worden rechtstreeks uit
+het archief gelezen en komen in een submap met de naam van het archief. De
+bronnen worden parallel geconverteerd, één proces per CPU.
+
+Met --provenance komt naast elke output de herkomst van de rijen
+(<output>.provenance.npz); `slk_inspect.py <output> --explain RIJ` toont daarmee
+de ruwe SLK records van een rij.
+
+In --out-dir staat een manifest (slk_manifest): per geconverteerde bron de hash
+van de inhoud, de output, de opties en de tijden. Bronnen die met dezelfde
+opties al geconverteerd zijn en waarvan de output er nog staat, worden
+overgeslagen; een afgebroken run gaat zo verder waar hij stopte. --force
+converteert alles opnieuw.
+
+Met --queue gaan de bronnen als jobs door de job queue (slk_jobs): een mislukte
+bron wordt opnieuw geprobeerd en status en tijden per bron blijven bewaard
+(`python slk_jobs.py status`). Jobs die na een crash nog wachten, verwerkt
+`python slk_jobs.py work`.
+
+Usage:
+    python batch_convert.py "reha bonn exports/*.slk" --out-dir geconverteerd
+    python batch_convert.py archief/2025-*.zip --out-dir geconverteerd --format xlsx --workers 4
+    python batch_convert.py "reha bonn exports/*.slk" --out-dir geconverteerd --provenance
+    python batch_convert.py "reha bonn exports/*.slk" --out-dir geconverteerd --queue
+
+Exit code 1 als een bron niet geconverteerd kon worden, 2 bij verkeerde argumenten.
+"""
+
+import argparse
+import functools
+import os
+import sys
+import time
+import zipfile
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from slk_exporters import EXPORTERS, export_frame
+from slk_inspect import expand_paths
+from slk_jobs import FAILED, JOBS_FILE, open_queue, run_workers
+from slk_manifest import MANIFEST_NAME, Manifest, StatKey, options_digest, stat_key
+from slk_phones import PHONE_STYLES
+from slk_pipeline import clean_dataframe, convert_to_custom_format
+from slk_profiles import DEFAULT_PROFILE, PROFILES
+from slk_provenance import Provenance, provenance_path
+from slk_sources import SlkSource, list_sources, map_sources, parse_source
+
+
+class BatchResult(NamedTuple):
+    source: str
+    output: str
+    rows: int
+    seconds: float
+    error: Optional[str] = None
+
+
+def _stem(name: str) -> str:
+    """Bestandsnaam zonder map, .gz en .slk."""
+    base = os.path.basename(name)
+    for extension in ('.gz', '.slk'):
+        if base.lower().endswith(extension):
+            base = base[:-len(extension)]
+    return base
+
+
+def output_path(source: SlkSource, out_dir: str, output_format: str) -> str:
+    """Waar de output van een bron komt; leden van een zip in een submap per archief."""
+    name = _stem(source.member or source.file)
+    if source.member:
+        name = os.path.join(_stem(os.path.splitext(source.file)[0]), name)
+    return os.path.join(out_dir, name + EXPORTERS[output_format].extension)
+
+
+def convert_one(source: SlkSource, out_dir: str, output_format: str = 'csv',
+                profile: Optional[str] = None, phone_style: Optional[str] = None,
+                provenance: bool = False) -> BatchResult:
+    """
+    Eén bron naar zijn output (draait in een worker proces); fouten komen terug in het resultaat.
+    Met `provenance` ook de herkomst van de rijen naast de output.
+    """
+    output = output_path(source, out_dir, output_format)
+    start = time.perf_counter()
+    rows = Provenance() if provenance else None
+    try:
+        df, rit_datum = parse_source(source, provenance=rows)
+        routemeister_df = clean_dataframe(convert_to_custom_format(df, rit_datum, phone_style=phone_style),
+                                          profile=profile)
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        # Eerst naar een tijdelijk bestand, zodat een afgebroken run geen halve output achterlaat
+        partial = output + '.part'
+        with open(partial, 'wb') as file:
+            export_frame(routemeister_df, {output_format: file})
+        os.replace(partial, output)
+        if rows is not None:
+            rows.save(provenance_path(output))
+    except Exception as e:
+        return BatchResult(source.name, output, 0, time.perf_counter() - start, str(e))
+    return BatchResult(source.name, output, len(routemeister_df), time.perf_counter() - start)
+
+
+def collect_sources(paths: Sequence[str]) -> List[SlkSource]:
+    """Alle bronnen in de bestanden, in de volgorde van de paden en van de archieven."""
+    sources = []
+    for path in paths:
+        sources.extend(list_sources(path))
+    return sources
+
+
+def run_batch(sources: Sequence[SlkSource], out_dir: str, output_format: str = 'csv',
+              profile: Optional[str] = None, phone_style: Optional[str] = None,
+              workers: Optional[int] = None, provenance: bool = False) -> Iterator[BatchResult]:
+    """Converteer alle bronnen parallel; de resultaten komen in de volgorde van `sources`."""
+    convert = functools.partial(convert_one, out_dir=out_dir, output_format=output_format,
+                                profile=profile, phone_style=phone_style, provenance=provenance)
+    return map_sources(convert, list(sources), workers)
+
+
+def run_queued(sources: Sequence[SlkSource], out_dir: str, output_format: str = 'csv',
+               profile: Optional[str] = None, phone_style: Optional[str] = None,
+               workers: Optional[int] = None, provenance: bool = False,
+               queue_file: str = JOBS_FILE) -> Iterator[BatchResult]:
+    """
+    Als run_batch, maar via de job queue: elke bron wordt een job met dezelfde opties.
+    De resultaten komen zodra een job klaar of definitief mislukt is.
+    """
+    jobs = open_queue(queue_file)
+    # Absoluut: een worker van `slk_jobs.py work` kan vanuit een andere map draaien
+    options = dict(out_dir=os.path.abspath(out_dir), output_format=output_format, profile=profile,
+                   phone_style=phone_style, provenance=provenance)
+    ids = [jobs.submit(source, output_path(source, out_dir, output_format), options) for source in sources]
+    for job in run_workers(queue_file, workers, ids):
+        yield BatchResult(job.source, job.output, job.rows or 0, job.seconds or 0.0,
+                          job.error if job.state == FAILED else None)
+
+
+def pending_sources(sources: Sequence[SlkSource], outputs: Sequence[str], manifest: Manifest, options: str,
+                    force: bool = False) -> Dict[str, Tuple[SlkSource, Optional[StatKey], Optional[str]]]:
+    """
+    De bronnen die (opnieuw) geconverteerd moeten worden, op naam, met hun stat en
+    inhoud hash voor het manifest; de rest staat met deze opties al in het manifest.
+    """
+    pending = {}
+    for source, output in zip(sources, outputs):
+        try:
+            key = stat_key(source)
+            digest = manifest.digest(source, key)
+        except (OSError, ValueError, zipfile.BadZipFile) as e:
+            # Niet te lezen; de conversie meldt de fout
+            print(f"⚠️ {source.name}: geen hash ({e})", file=sys.stderr)
+            key = digest = None
+        if force or digest is None or not manifest.is_current(digest, output, options):
+            pending[source.name] = (source, key, digest)
+        elif key not in manifest.digests:
+            manifest.refresh(key, digest, output)
+    return pending
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Meditec exports (.slk, .slk.gz, .zip) in batch naar Routemeister')
+    parser.add_argument('paths', nargs='+', help='bestanden of globs, bv. "reha bonn exports/*.slk" of archief.zip')
+    parser.add_argument('--out-dir', required=True, help='map voor de output bestanden')
+    parser.add_argument('--format', dest='output_format', choices=list(EXPORTERS), default='csv',
+                        help='output formaat (standaard csv)')
+    parser.add_argument('--profile', choices=list(PROFILES), default=DEFAULT_PROFILE,
+                        help=f'transliteratie van de tekens (standaard {DEFAULT_PROFILE})')
+    parser.add_argument('--phones', choices=list(PHONE_STYLES), default=None,
+                        help='telefoonnummers normaliseren (standaard ongewijzigd)')
+    parser.add_argument('--workers', type=int, default=None, help="aantal processen (standaard: aantal CPU's)")
+    parser.add_argument('--provenance', action='store_true',
+                        help='herkomst van de rijen naast elke output bewaren (voor slk_inspect.py --explain)')
+    parser.add_argument('--force', action='store_true',
+                        help=f'ook bronnen converteren die volgens het manifest ({MANIFEST_NAME}) al klaar zijn')
+    parser.add_argument('--queue', nargs='?', const=JOBS_FILE, default=None, metavar='BESTAND',
+                        help='via de job queue, met nieuwe pogingen bij fouten (standaard bestand: .slk_jobs.sqlite3)')
+    args = parser.parse_args()
+
+    paths = expand_paths(args.paths)
+    if not paths:
+        sys.exit(2)
+    sources = collect_sources(paths)
+    outputs = [output_path(source, args.out_dir, args.output_format) for source in sources]
+    duplicates = sorted({output for output in outputs if outputs.count(output) > 1})
+    if duplicates:
+        parser.error(f"meerdere bronnen met dezelfde output: {', '.join(duplicates)}")
+
+    print(f"📦 {len(paths)} bestand(en), {len(sources)} export(s) naar {args.out_dir}", file=sys.stderr)
+    start = time.perf_counter()
+    manifest = Manifest(os.path.join(args.out_dir, MANIFEST_NAME))
+    options = options_digest(dict(output_format=args.output_format, profile=args.profile,
+                                  phone_style=args.phones, provenance=args.provenance))
+    pending = pending_sources(sources, outputs, manifest, options, args.force)
+    skipped = len(sources) - len(pending)
+    if skipped:
+        print(f"⏭️ {skipped} export(s) ongewijzigd, overgeslagen (--force om ze opnieuw te converteren)",
+              file=sys.stderr)
+    sources = [source for source, _, _ in pending.values()]
+
+    failed = 0
+    rows = 0
+    if args.queue:
+        results = run_queued(sources, args.out_dir, args.output_format, args.profile, args.phones, args.workers,
+                             args.provenance, args.queue)
+    else:
+        results = run_batch(sources, args.out_dir, args.output_format, args.profile, args.phones, args.workers,
+                            args.provenance)
+    for result in results:
+        if result.error:
+            failed += 1
+            print(f"❌ {result.source}: {result.error}", file=sys.stderr)
+            continue
+        rows += result.rows
+        _, key, digest = pending[result.source]
+        if digest is not None:
+            manifest.record(key, digest, result.output, options, result.rows, result.seconds)
+        print(f"✅ {result.source} -> {result.output} ({result.rows} rijen, {result.seconds * 1000:.0f} ms)",
+              file=sys.stderr)
+    print(f"📈 {len(sources) - failed} geconverteerd, {skipped} overgeslagen, {failed} mislukt, {rows} rijen in "
+          f"{time.perf_counter() - start:.1f} s", file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
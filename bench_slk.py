@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Benchmarks voor de Routemeister converter
+Usage: python bench_slk.py [--repeat N] [--update-goldens] [--max-regression 0.5]
+
+Twee onderdelen:
+- Budgetten: koude start van de app, een Streamlit rerun, de volledige pipeline
+  en een paar metingen op een grote lijst. Elke meting heeft een budget in seconden.
+- Corpus: elke converter (app CSV en convert_slk.py XLSX) draait over alle echte
+  exports in de repo. Per bestand worden latency, rijen/s en piekgeheugen gemeten
+  en de output wordt byte voor byte vergeleken met de goldens in `goldens/`.
+  Daarna volgt de hit rate van de memo caches (slk_memo) over het corpus.
+- Geheugen: een maand exports (MONTH_EXPORTS keer een corpus bestand) samengevoegd
+  met concat_tables, geparst en als output, met categorical kolommen tegenover
+  dezelfde tabel met alleen tekst kolommen.
+
+Het script eindigt met exit code 1 als een budget overschreden wordt, een output
+afwijkt van zijn golden of de doorvoer over het corpus meer dan --max-regression
+slechter is dan de opgeslagen baseline. De baseline is geen tijd maar een
+verhouding: de tijd over het corpus gedeeld door die van een vaste referentielus
+(`reference_seconds`) in dezelfde run. Zo geeft een tragere of drukkere machine
+geen vals alarm. `--update-goldens` schrijft goldens en baseline opnieuw.
+"""
+
+import argparse
+import difflib
+import glob
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_FILE = os.path.join(HERE, 'fahrdlist20250627.slk')
+GOLDEN_DIR = os.path.join(HERE, 'goldens')
+BASELINE_FILE = os.path.join(GOLDEN_DIR, 'throughput.json')
+
+# Echte exports in de repo
+CORPUS = [
+    'reha bonn.slk',
+    'reha bonn ohne Sonderzeichen.slk',
+    'fahrdlist20250627.slk',
+    'fahrdlist20250627 (002).slk',
+    'reha bonn exports/*.slk',
+]
+
+# Budgetten in seconden
+BUDGETS = {
+    'startup': 3.0,   # python -c "import simple_app" in een nieuw proces
+    'rerun': 0.5,     # een Streamlit rerun zonder upload
+    'pipeline': 0.5,  # decode + parse + convert + clean + CSV op SAMPLE_FILE
+    'special_mask': 1.0,  # speciale-tekens masker + cellenlijst op LARGE_ROWS rijen
+    'validation': 1.0,    # alle validatieregels op LARGE_ROWS output rijen
+    'corrections': 1.0,   # CORRECTION_PATTERNS correcties op de namen van LARGE_ROWS rijen
+}
+
+# Aantal rijen voor de metingen op een grote lijst
+LARGE_ROWS = 50000
+# Aantal patronen in de correctietabel voor de corrections meting
+CORRECTION_PATTERNS = 500
+# Aantal exports in een maand voor de geheugenmeting
+MONTH_EXPORTS = 30
+# Aantal rondes van de referentielus die de snelheid van de machine ijkt
+REFERENCE_ROUNDS = 200
+
+
+def bench_startup(repeat: int) -> float:
+    """Koude start: importeer de app in een vers proces, openpyxl mag nog niet geladen zijn."""
+    code = "import sys, simple_app; sys.exit('openpyxl' in sys.modules)"
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', code], cwd=HERE)
+        timings.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise RuntimeError('openpyxl wordt al bij het opstarten geladen')
+    return statistics.median(timings)
+
+
+def bench_rerun(repeat: int) -> float:
+    """Rerun: het script opnieuw uitvoeren terwijl de modules al geladen zijn."""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(HERE, 'simple_app.py'), default_timeout=30)
+    app.run()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        app.run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def bench_pipeline(repeat: int) -> float:
+    """Volledige conversie van SAMPLE_FILE zoals de app die bij een rerun uitvoert."""
+    from slk_pipeline import (
+        clean_dataframe,
+        convert_to_custom_format,
+        decode_slk_bytes,
+        extract_rit_datum,
+        parse_slk_patients,
+    )
+
+    with open(SAMPLE_FILE, 'rb') as file:
+        raw_content = file.read()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        file_content = decode_slk_bytes(raw_content)
+        df = parse_slk_patients(file_content)
+        routemeister_df = convert_to_custom_format(df, extract_rit_datum(file_content))
+        clean_dataframe(routemeister_df).to_csv(index=False, header=False, sep=';')
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def bench_special_mask(repeat: int) -> float:
+    """Speciale tekens markeren in een grote lijst met maar een paar foute cellen."""
+    import pandas as pd
+    from slk_pipeline import (
+        clean_dataframe,
+        decode_slk_bytes,
+        parse_slk_patients,
+        special_char_cells,
+        special_char_mask,
+    )
+
+    with open(SAMPLE_FILE, 'rb') as file:
+        df = clean_dataframe(parse_slk_patients(decode_slk_bytes(file.read())))
+    large = pd.concat([df] * (LARGE_ROWS // len(df) + 1), ignore_index=True).head(LARGE_ROWS)
+    for row in range(0, LARGE_ROWS, LARGE_ROWS // 10):
+        large.loc[row, 'name'] = 'M\x1bNHuller'
+    # De waarden zijn aangepast, dus de ASCII vlaggen van de parser gelden niet meer
+    large.attrs.clear()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        special_char_cells(large, special_char_mask(large))
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def bench_validation(repeat: int) -> float:
+    """Alle validatieregels over een grote Routemeister tabel."""
+    import pandas as pd
+    from slk_pipeline import convert_to_custom_format, decode_slk_bytes, extract_rit_datum, parse_slk_patients
+    from slk_validation import validate_output
+
+    with open(SAMPLE_FILE, 'rb') as file:
+        file_content = decode_slk_bytes(file.read())
+    output = convert_to_custom_format(parse_slk_patients(file_content), extract_rit_datum(file_content))
+    large = pd.concat([output] * (LARGE_ROWS // len(output) + 1), ignore_index=True).head(LARGE_ROWS)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        validate_output(large)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def bench_corrections(repeat: int) -> float:
+    """Een correctietabel met honderden patronen over de namen van een grote lijst."""
+    import pandas as pd
+    from slk_corrections import CompiledCorrections
+    from slk_pipeline import decode_slk_bytes, parse_slk_patients
+
+    with open(SAMPLE_FILE, 'rb') as file:
+        df = parse_slk_patients(decode_slk_bytes(file.read()))
+    names = pd.concat([df['name']] * (LARGE_ROWS // len(df) + 1), ignore_index=True).head(LARGE_ROWS)
+    # Verminkte varianten zoals 'HNHarig' -> 'Härig', genummerd zodat ze uniek zijn
+    corrections = CompiledCorrections({
+        f'{name[:1]}NH{name[1:]}{i}': name for i, name in enumerate(names.head(CORRECTION_PATTERNS))
+    })
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        names.map(corrections.apply)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+BENCHMARKS = {
+    'startup': bench_startup,
+    'rerun': bench_rerun,
+    'pipeline': bench_pipeline,
+    'special_mask': bench_special_mask,
+    'validation': bench_validation,
+    'corrections': bench_corrections,
+}
+
+
+def corpus_files():
+    files = []
+    for pattern in CORPUS:
+        files.extend(sorted(glob.glob(os.path.join(HERE, pattern))))
+    return files
+
+
+def run_simple_app(path: str):
+    """De app: de achtergrond conversie (hier direct aangeroepen) en de CSV van de downloadknop."""
+    from slk_pipeline import to_routemeister_csv
+    from slk_worker import run_conversion
+
+    with open(path, 'rb') as file:
+        result = run_conversion(file.read())
+    if result.df.empty:
+        return 0, b''
+    return len(result.df), to_routemeister_csv(result.routemeister_df).encode('utf-8')
+
+
+def run_convert_slk(path: str):
+    """convert_slk.py: sample formaat naar XLSX (in geheugen)."""
+    from convert_slk import convert_file
+
+    buffer = io.BytesIO()
+    summary = convert_file(path, buffer)
+    if not summary.patients:
+        return 0, b''
+    return summary.patients, dump_xlsx(buffer)
+
+
+def dump_xlsx(buffer) -> bytes:
+    """
+    Celwaarden van een XLSX als tekst. Het XLSX bestand zelf bevat tijdstempels,
+    dus de golden vergelijkt de inhoud (inclusief types via repr) in plaats van de zip.
+    """
+    from openpyxl import load_workbook
+
+    buffer.seek(0)
+    ws = load_workbook(buffer, read_only=True).active
+    lines = ['\t'.join(repr(value) for value in row) for row in ws.iter_rows(values_only=True)]
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+ENTRY_POINTS = {
+    'simple_app_csv': run_simple_app,
+    'convert_slk_xlsx': run_convert_slk,
+}
+
+
+def golden_path(entry: str, path: str) -> str:
+    return os.path.join(GOLDEN_DIR, entry, os.path.basename(path) + '.golden')
+
+
+def check_golden(entry: str, path: str, output: bytes, update: bool):
+    """Vergelijk output met de golden; geeft een lijst met verschilregels (leeg = gelijk)."""
+    golden = golden_path(entry, path)
+    if update:
+        os.makedirs(os.path.dirname(golden), exist_ok=True)
+        with open(golden, 'wb') as file:
+            file.write(output)
+        return []
+    if not os.path.exists(golden):
+        return [f"golden ontbreekt: {os.path.relpath(golden, HERE)} (draai met --update-goldens)"]
+    with open(golden, 'rb') as file:
+        expected = file.read()
+    if expected == output:
+        return []
+    diff = difflib.unified_diff(
+        expected.decode('utf-8', errors='replace').splitlines(),
+        output.decode('utf-8', errors='replace').splitlines(),
+        'golden', 'output', lineterm='', n=0,
+    )
+    return list(diff)[:12] or ['bytes verschillen (alleen regeleinden of encoding)']
+
+
+def reference_seconds(repeat: int) -> float:
+    """
+    Mediaan van een vaste lus met hetzelfde soort werk als de converters (Python
+    strings en kleine pandas tabellen); de noemer van de doorvoer verhouding.
+    """
+    import pandas as pd
+
+    values = [f"Straße {i}" for i in range(100)]
+    timings = []
+    for _ in range(max(repeat, 3)):
+        start = time.perf_counter()
+        for _ in range(REFERENCE_ROUNDS):
+            df = pd.DataFrame({'a': values, 'b': values})
+            df['a'].str.upper().str.replace('ß', 'ss', regex=False).str.len().sum()
+            ';'.join(value.casefold() for value in values)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run_corpus(repeat: int, update: bool, max_regression: float, report):
+    """Draai alle converters over het corpus; geeft een lijst met fouten."""
+    from slk_memo import clear_caches
+
+    # De cache statistieken gaan alleen over het corpus
+    clear_caches()
+    failures = []
+    baseline = {}
+    if os.path.exists(BASELINE_FILE) and not update:
+        with open(BASELINE_FILE) as file:
+            baseline = json.load(file)
+    totals = {}
+
+    report(f"{'converter':<18} {'bestand':<34} {'rijen':>5} {'ms':>8} {'rijen/s':>9} {'piek KiB':>9}  golden")
+    for entry, run in ENTRY_POINTS.items():
+        total_seconds = 0.0
+        total_rows = 0
+        # De referentielus voor en na de converter: de verhouding volgt de belasting van de machine
+        reference = reference_seconds(repeat)
+        for path in corpus_files():
+            rows, output = run(path)  # warming-up, levert ook de output
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                run(path)
+                timings.append(time.perf_counter() - start)
+            latency = statistics.median(timings)
+
+            # Geheugen apart meten, tracemalloc vertraagt de uitvoering
+            tracemalloc.start()
+            run(path)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            diff = check_golden(entry, path, output, update)
+            total_seconds += latency
+            total_rows += rows
+            rate = rows / latency if latency else 0.0
+            name = os.path.relpath(path, HERE)
+            report(f"{entry:<18} {name[-34:]:<34} {rows:>5} {latency * 1000:8.2f} {rate:9.0f} {peak / 1024:9.0f}  "
+                   f"{'OK' if not diff else 'AFWIJKING'}")
+            if diff:
+                failures.append(f"{entry}: {name} wijkt af van de golden")
+                for line in diff:
+                    report(f"    {line}")
+
+        reference = (reference + reference_seconds(repeat)) / 2
+        ratio = total_seconds / reference
+        totals[entry] = {'seconds': total_seconds, 'rows': total_rows, 'reference_seconds': reference, 'ratio': ratio}
+        report(f"{entry:<18} {'TOTAAL':<34} {total_rows:>5} {total_seconds * 1000:8.2f} "
+               f"{total_rows / total_seconds if total_seconds else 0:9.0f}  "
+               f"({ratio:.2f}x referentielus van {reference * 1000:.1f} ms)")
+        if 'ratio' in baseline.get(entry, {}):
+            allowed = baseline[entry]['ratio'] * (1 + max_regression)
+            if ratio > allowed:
+                failures.append(f"{entry}: corpus kost {ratio:.2f}x de referentielus, "
+                                f"baseline {baseline[entry]['ratio']:.2f}x (+{max_regression:.0%} toegestaan)")
+        elif entry in baseline:
+            report(f"{entry:<18} baseline zonder verhouding, draai --update-goldens")
+
+    if update:
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        with open(BASELINE_FILE, 'w') as file:
+            json.dump(totals, file, indent=2)
+        report(f"💾 Goldens en baseline bijgewerkt in {os.path.relpath(GOLDEN_DIR, HERE)}/")
+    return failures
+
+
+def run_budgets(repeat: int, report):
+    """Draai de metingen met een vast budget; geeft een lijst met fouten."""
+    failures = []
+    for name, bench in BENCHMARKS.items():
+        measured = bench(repeat)
+        budget = BUDGETS[name]
+        status = 'OK' if measured <= budget else 'TE TRAAG'
+        report(f"{name:<14} {measured * 1000:9.1f} ms  (budget {budget * 1000:.0f} ms)  {status}")
+        if measured > budget:
+            failures.append(f"{name}: budget overschreden")
+    return failures
+
+
+def report_caches(report):
+    """Hit rate van de memo caches over alle metingen hierboven."""
+    from slk_memo import cache_stats
+
+    report(f"{'cache':<30} {'hits':>9} {'misses':>9} {'grootte':>9} {'hit rate':>9}")
+    for name, stats in cache_stats().items():
+        report(f"{name:<30} {stats['hits']:>9} {stats['misses']:>9} {stats['size']:>9} {stats['hit_rate']:>9.1%}")
+
+
+def month_tables():
+    """Geparste en output tabel van MONTH_EXPORTS exports (het corpus rondom), samengevoegd."""
+    from slk_pipeline import clean_dataframe, concat_tables, convert_to_custom_format
+    from slk_sources import list_sources, parse_source
+
+    files = corpus_files()
+    parsed, outputs = [], []
+    for i in range(MONTH_EXPORTS):
+        df, rit_datum = parse_source(list_sources(files[i % len(files)])[0])
+        parsed.append(df)
+        outputs.append(clean_dataframe(convert_to_custom_format(df, rit_datum)))
+    return {'geparst': concat_tables(parsed), 'output': concat_tables(outputs)}
+
+
+def report_memory(report):
+    """Geheugen van een maand samengevoegde exports: categorical tegenover alleen tekst kolommen."""
+    from slk_symbols import is_categorical
+
+    report(f"{'maand tabel':<14} {'rijen':>6} {'categorical':>11} {'KiB':>9} {'tekst KiB':>10} {'besparing':>10}")
+    for name, df in month_tables().items():
+        dense = df.astype({col: df[col].cat.categories.dtype for col in df.columns if is_categorical(df[col])})
+        size = df.memory_usage(deep=True).sum()
+        dense_size = dense.memory_usage(deep=True).sum()
+        categorical = sum(is_categorical(df[col]) for col in df.columns)
+        report(f"{name:<14} {len(df):>6} {categorical:>11} {size / 1024:9.1f} {dense_size / 1024:10.1f} "
+               f"{1 - size / dense_size if dense_size else 0:>10.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks voor de Routemeister converter')
+    parser.add_argument('--repeat', type=int, default=5, help='aantal herhalingen per meting')
+    parser.add_argument('--skip-budgets', action='store_true', help='alleen het corpus draaien')
+    parser.add_argument('--skip-corpus', action='store_true', help='alleen de budgetten draaien')
+    parser.add_argument('--update-goldens', action='store_true', help='goldens en baseline opnieuw schrijven')
+    parser.add_argument('--max-regression', type=float, default=0.5,
+                        help='toegestane vertraging van het corpus t.o.v. de baseline (0.5 = 50%%)')
+    parser.add_argument('--output', help='schrijf het rapport ook naar dit bestand')
+    args = parser.parse_args()
+
+    lines = []
+
+    def report(line):
+        print(line)
+        lines.append(line)
+
+    failures = []
+    if not args.skip_budgets:
+        failures += run_budgets(args.repeat, report)
+    if not args.skip_corpus:
+        if not args.skip_budgets:
+            report('')
+        failures += run_corpus(args.repeat, args.update_goldens, args.max_regression, report)
+        report('')
+        report_memory(report)
+    report('')
+    report_caches(report)
+
+    if failures:
+        report('')
+        report("❌ Benchmark mislukt:")
+        for failure in failures:
+            report(f"   • {failure}")
+    else:
+        report("✅ Alle metingen binnen budget en alle output gelijk aan de goldens")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(lines) + '\n')
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,59 +1,106 @@
 #!/usr/bin/env python3
 """
 Simple SLK to Excel converter
-Usage: python convert_slk.py input.slk output.xlsx
+Usage: python convert_slk.py input.slk output.xlsx [output.csv ...] [--profile unicode|umlauts|german_ascii|ascii] [--phones national|e164]
+
+De input mag ook een .slk.gz of een zip met meerdere exports zijn; de leden van
+een zip worden parallel geconverteerd en na elkaar in dezelfde output geschreven.
+
+Met '-' als input leest het script van stdin, met '-' als output schrijft het naar
+stdout (formaat via --format, standaard csv). De samenvatting gaat altijd naar
+stderr, dus het script past in een pipe:
+
+    gunzip -c export.slk.gz | python convert_slk.py - - --format jsonl | gzip > export.jsonl.gz
+
+Exit codes: 0 ok, 1 conversie mislukt, 2 verkeerde argumenten, 3 input niet
+leesbaar, 4 geen patiënten gevonden, 5 validatieproblemen (alleen met --strict),
+141 de lezer van stdout is gestopt.
 """
 
+import argparse
+import functools
+import itertools
+import os
 import pandas as pd
-import re
 import sys
-import os
-import unicodedata
+from contextlib import ExitStack
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+from slk_corrections import CorrectionTable
+from slk_diagnostics import ParseDiagnostics
+from slk_exporters import EXPORTERS, ROW_BATCH, export_rows, format_for_path, iter_row_batches
+from slk_memo import memoized
+from slk_phones import PHONE_STYLES, extract_phones, join_phones
+from slk_pipeline import decode_cell, iter_slk_cells
+from slk_profiles import PROFILES, fold_text, get_profile
+from slk_sources import SlkSource, iter_lines, list_sources, map_sources, sniff_encoding, spool_stream
+from slk_tables import (
+    ALL_COLUMNS,
+    CK_QUOTED_RE,
+    COLUMN_MAPPING,
+    ENCODINGS_TO_TRY,
+    POSITION_RE,
+)
+from slk_validation import BatchValidator, compile_rules
 
-def clean_value(val):
+# Specifieke correcties voor bekende parsing fouten (zie corrections.txt)
+# Deze patronen ontstaan door verkeerde parsing van het SLK bestand
+CORRECTIONS = CorrectionTable()
+
+# Logische veldnaam -> kolom in het sample formaat, voor de validatieregels
+SAMPLE_FORMAT_FIELDS = {
+    'patient_id': 'PT18007598',
+    'strasse': 'Alst 6',
+    'plz': '41379',
+    'telefon': '0049 215222111',
+    'erster_termin': '800',
+    'letzter_termin': '830',
+}
+VALIDATOR = compile_rules(field_map=SAMPLE_FORMAT_FIELDS)
+
+# De Excel export houdt umlauts standaard gewoon, maar schrijft ß als ss
+DEFAULT_PROFILE = 'umlauts'
+
+# Kolommen van het sample formaat (de koppen zijn de waarden uit het voorbeeldbestand)
+SAMPLE_COLUMNS = [
+    'PT18007598', 'TS-RV-AHB', 'Mevilzen', 'Hansel', 'M', '07.07.1985', 'Alst 6', 'Unnamed: 7',
+    'Brüggen', '41379', 'D', '0049 215222111', 'Unnamed: 12', '15.01.2024', 'Unnamed: 14',
+    '01.02.2025', 'Unnamed: 16', '800', '830'
+]
+
+# '-' als bestandsnaam: stdin of stdout
+STDIO = '-'
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_NO_INPUT = 3
+EXIT_NO_DATA = 4
+EXIT_INVALID = 5
+EXIT_BROKEN_PIPE = 141  # 128 + SIGPIPE, zoals de shell het meldt
+
+def clean_value(val, corrections=None, profile=None):
     if pd.isna(val):
         return val
     
-    # Converteer naar string
-    text = str(val)
-    
-    # Specifieke correcties voor bekende parsing fouten
-    # Deze patronen ontstaan door verkeerde parsing van het SLK bestand
-    corrections = {
-        'HNHarig': 'Härig',
-        'KNHubra': 'Kübra', 
-        'HNHoveler': 'Höveler',
-        'BINHuchenstraße': 'Blüchenstraße',
-        'HHarig': 'Härig',  # Voor het geval er dubbele H's zijn
-        'KKubra': 'Kübra',  # Voor het geval er dubbele K's zijn
-    }
-    
-    # Pas correcties toe
-    for wrong, correct in corrections.items():
-        text = text.replace(wrong, correct)
-    
-    # Verwijder controle karakters maar behoud printbare karakters
-    cleaned = ''.join(c for c in text if unicodedata.category(c)[0] != 'C')
-    
-    # Verwijder alleen de echt problematische karakters voor Excel
-    problematic_chars = ['\x00', '\x01', '\x02', '\x03', '\x04', '\x05', '\x06', '\x07', '\x08', 
-                        '\x0b', '\x0c', '\x0e', '\x0f', '\x10', '\x11', '\x12', '\x13', '\x14', 
-                        '\x15', '\x16', '\x17', '\x18', '\x19', '\x1a', '\x1b', '\x1c', '\x1d', 
-                        '\x1e', '\x1f']
-    
-    for char in problematic_chars:
-        cleaned = cleaned.replace(char, '')
+    # Converteer naar string; het resultaat wordt per string, correctietabel en profiel onthouden
+    return _clean_text(str(val), corrections or CORRECTIONS.current(), get_profile(profile or DEFAULT_PROFILE))
+
+@memoized('convert_slk.clean_value')
+def _clean_text(text: str, corrections, profile) -> str:
+    # Pas correcties toe (alle patronen in één scan)
+    text = corrections.apply(text)
     
-    return cleaned
+    # Transliteratie volgens het profiel en controle karakters weg (die zijn problematisch voor Excel)
+    return fold_text(text, profile)
 
-def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    return df.applymap(clean_value)
+def clean_dataframe(df: pd.DataFrame, profile: str = DEFAULT_PROFILE) -> pd.DataFrame:
+    # Eén keer per tabel kijken of het correctiebestand gewijzigd is
+    return df.map(clean_value, corrections=CORRECTIONS.current(), profile=profile)
 
 def read_file_with_encoding(file_path: str) -> str:
     """Lees bestand met verschillende encodings voor Duitse karakters"""
-    encodings_to_try = ['utf-8', 'cp1252', 'iso-8859-1', 'windows-1252']
-    
-    for encoding in encodings_to_try:
+    for encoding in ENCODINGS_TO_TRY:
         try:
             with open(file_path, 'r', encoding=encoding) as file:
                 return file.read()
@@ -65,105 +112,81 @@ def read_file_with_encoding(file_path: str) -> str:
         return file.read()
 
 def extract_rit_datum(file_path: str) -> str:
-    # Zoek naar Y2;X1
-    file_content = read_file_with_encoding(file_path)
-    
+    return rit_datum_from_content(read_file_with_encoding(file_path))
+
+def rit_datum_from_content(file_content: Union[str, Iterable[str]]) -> str:
+    # Zoek naar Y2;X1 (in de tekst, of in een iterator met regels)
     last_row = None
     last_col = None
-    for line in file_content.split('\n'):
+    for line in file_content.split('\n') if isinstance(file_content, str) else file_content:
         line = line.strip()
-        pos_match = re.search(r'Y(\d+);X(\d+)', line)
+        pos_match = POSITION_RE.search(line)
         if pos_match:
             last_row = int(pos_match.group(1))
             last_col = int(pos_match.group(2))
             continue
         if line.startswith('C;K') and last_row == 2 and last_col == 1:
-            match = re.search(r'C;K"([^"]*)"', line)
+            match = CK_QUOTED_RE.search(line)
             if match:
                 datum = match.group(1)
                 # Vervang punten door streepjes in datum
                 return datum.replace('.', '-')
     return ''
 
-def parse_slk_patients(file_path: str) -> pd.DataFrame:
-    # Per patient: Y4..Ymax, X2..X14
-    patients = []
+def input_sources(input_file: str) -> List[SlkSource]:
+    """De SLK bronnen in de input: het bestand, de inhoud van een .gz of de .slk leden van een zip."""
+    if input_file == STDIO:
+        # stdin kan maar één keer gelezen worden; de kopie blijft gecomprimeerd
+        return list_sources(spool_stream(sys.stdin.buffer), label='stdin')
+    return list_sources(input_file)
+
+def iter_patients(file_content: Union[str, Iterable[str]], encoding: str,
+                  diagnostics: ParseDiagnostics = None) -> Iterator[dict]:
+    """Eén dict per patiënt (Y4..Ymax, X2..X14), zodra zijn rij compleet is."""
     current_patient = {}
-    last_row = None
-    last_col = None
-    
-    file_content = read_file_with_encoding(file_path)
-    for line in file_content.split('\n'):
-        line = line.strip()
-        pos_match = re.search(r'Y(\d+);X(\d+)', line)
-        if pos_match:
-            last_row = int(pos_match.group(1))
-            last_col = int(pos_match.group(2))
-            continue
-        if line.startswith('C;K') and last_row is not None and last_col is not None:
-            if last_row >= 4 and 2 <= last_col <= 14:
-                match = re.search(r'C;K"([^"]*)"', line)
-                if not match:
-                    # Probeer zonder quotes (voor numerieke waarden)
-                    match = re.search(r'C;K([0-9]+)$', line)
-                if match:
-                    value = match.group(1)
-                    
-                    # Vervang escape sequences + de volgende letter door de juiste umlaut
-                    # De escape sequence vervangt de volgende letter
-                    escape_replacements = {
-                        '\x1bNHa': 'ä',  # \x1bNH + a = ä
-                        '\x1bNHo': 'ö',  # \x1bNH + o = ö 
-                        '\x1bNHu': 'ü',  # \x1bNH + u = ü 
-                        '\x1bNHr': 'ür', # \x1bNH + r = ür (voor "für")
-                        '\x1bNOo': 'ö',  # \x1bNO + o = ö
-                        '\x1bNUu': 'ü',  # \x1bNU + u = ü
-                        '\x1bNSs': 'ss', # \x1bNS + s = ss (ß wordt ss)
-                        '\x1bN{e': 'ße', # \x1bN{ + e = ße (ß escape sequence)
-                        # Probeer ook andere varianten
-                        '\x1bNUb': 'üb', # \x1bNU + b = üb 
-                        '\x1bNUc': 'üc', # \x1bNU + c = üc 
-                    }
-                    
-                    # Probeer alle mogelijke combinaties
-                    for escape_seq, replacement in escape_replacements.items():
-                        if escape_seq in value:
-                            value = value.replace(escape_seq, replacement)
-                    
-                    # Verwijder overgebleven escape sequences
-                    value = re.sub(r'\x1b[A-Z]{2,}[a-z{]?', '', value)
-                    
-                    # Extra conversie: ß naar ss als het nog in de tekst staat
-                    value = value.replace('ß', 'ss')
-                    
-                    # Map kolomnummer naar veldnaam
-                    column_mapping = {
-                        2: 'erster_termin',
-                        3: 'letzter_termin',
-                        4: 'name',
-                        5: 'vorname',
-                        6: 'titel',
-                        7: 'telefon',
-                        8: 'strasse',
-                        9: 'plz',
-                        10: 'ort',
-                        11: 'adresszusatz',
-                        12: 'bemerkung',
-                        13: 'bht',
-                        14: 'fallnummer'
-                    }
-                    col_name = column_mapping[last_col]
-                    if last_col == 2:
-                        # Start nieuwe patient bij X2
-                        if current_patient:
-                            patients.append(current_patient)
-                        current_patient = {}
-                    current_patient[col_name] = value
+    for _, col, value, _, _ in iter_slk_cells(file_content, encoding, diagnostics):
+        value = decode_cell(value)
+        col_name = COLUMN_MAPPING[col]
+        if col == 2:
+            # Start nieuwe patient bij X2
+            if current_patient:
+                yield current_patient
+            current_patient = {}
+        current_patient[col_name] = value
     if current_patient:
-        patients.append(current_patient)
-    return pd.DataFrame(patients)
+        yield current_patient
+
+def parse_slk_patients(file_path: str, diagnostics: ParseDiagnostics = None) -> pd.DataFrame:
+    # Bytes zelf decoderen (per blok) zodat de byte offsets in de meldingen kloppen
+    patients = []
+    for source in input_sources(file_path):
+        encoding, _ = sniff_encoding(source)
+        with source.open() as stream:
+            patients.extend(iter_patients(iter_lines(stream, encoding), encoding, diagnostics))
+    return patients_frame(patients)
 
-def convert_to_sample_format(df: pd.DataFrame, rit_datum: str) -> pd.DataFrame:
+def patients_frame(patients: List[dict]) -> pd.DataFrame:
+    """
+    Patiënten als tabel met altijd alle SLK kolommen. Zo hangt de output van een rij
+    niet af van de andere rijen in dezelfde batch (een kolom die in de ene batch wel
+    en in de andere niet voorkomt).
+    """
+    return pd.DataFrame(patients, columns=ALL_COLUMNS)
+
+def log(*values):
+    """Samenvatting en meldingen naar stderr, zodat stdout vrij blijft voor de data."""
+    print(*values, file=sys.stderr)
+
+def print_diagnostics(diagnostics: ParseDiagnostics, limit: int = 20):
+    """Toon de parser meldingen, begrensd tot `limit` regels."""
+    if not diagnostics:
+        return
+    log(f"⚠️ Parser: {len(diagnostics)} record(s) overgeslagen of verdacht:")
+    log(diagnostics.to_frame().head(limit).to_string(index=False))
+    if len(diagnostics) > limit:
+        log(f"   ... en nog {len(diagnostics) - limit} melding(en)")
+
+def convert_to_sample_format(df: pd.DataFrame, rit_datum: str, phone_style: str = None) -> pd.DataFrame:
     # Helper: format time by removing colons and leading zeros
     def format_time(tijd):
         if pd.isna(tijd) or tijd == '':
@@ -175,86 +198,233 @@ def convert_to_sample_format(df: pd.DataFrame, rit_datum: str) -> pd.DataFrame:
             tijd_str = tijd_str[1:]
         return tijd_str
     
-    columns = [
-        'PT18007598', 'TS-RV-AHB', 'Mevilzen', 'Hansel', 'M', '07.07.1985', 'Alst 6', 'Unnamed: 7',
-        'Brüggen', '41379', 'D', '0049 215222111', 'Unnamed: 12', '15.01.2024', 'Unnamed: 14',
-        '01.02.2025', 'Unnamed: 16', '800', '830'
-    ]
+    # Een ontbrekende cel krijgt per rij de default, of de kolom nu in de tabel staat of niet
+    def field(row, col, default=''):
+        value = row.get(col)
+        return default if value is None or pd.isna(value) else value
+
     output = []
     for _, row in df.iterrows():
         output.append([
-            row.get('fallnummer', ''),         # PT18007598
+            field(row, 'fallnummer'),         # PT18007598
             'TS-RV-AHB',                      # TS-RV-AHB (vast)
-            row.get('name', ''),              # Mevilzen (achternaam)
-            row.get('vorname', ''),           # Hansel (voornaam)
-            row.get('titel', 'M'),            # M (geslacht of titel, default 'M')
+            field(row, 'name'),               # Mevilzen (achternaam)
+            field(row, 'vorname'),            # Hansel (voornaam)
+            field(row, 'titel', 'M'),         # M (geslacht of titel, default 'M')
             '',                               # 07.07.1985 (geboortedatum, niet beschikbaar)
-            row.get('strasse', ''),           # Alst 6 (adres)
+            field(row, 'strasse'),            # Alst 6 (adres)
             '',                               # Unnamed: 7
-            row.get('ort', ''),               # Brüggen (plaats)
-            row.get('plz', ''),               # 41379 (postcode)
+            field(row, 'ort'),                # Brüggen (plaats)
+            field(row, 'plz'),                # 41379 (postcode)
             'D',                              # D (landcode)
-            row.get('telefon', ''),           # 0049 215222111 (telefoon)
+            field(row, 'telefon'),            # 0049 215222111 (telefoon)
             '',                               # Unnamed: 12
             '',                               # 15.01.2024 (datum opname, niet beschikbaar)
             '',                               # Unnamed: 14
             rit_datum,                        # 01.02.2025 (datum rit)
             '',                               # Unnamed: 16 (leeg)
-            format_time(row.get('erster_termin', '')),  # 800 (tijd start)
-            format_time(row.get('letzter_termin', ''))  # 830 (tijd eind)
+            format_time(field(row, 'erster_termin')),  # 800 (tijd start)
+            format_time(field(row, 'letzter_termin'))  # 830 (tijd eind)
         ])
-    return pd.DataFrame(output, columns=columns)
+    sample_df = pd.DataFrame(output, columns=SAMPLE_COLUMNS)
+    if phone_style is not None and 'telefon' in df.columns:
+        # Alle nummers genormaliseerd, weer in één veld
+        sample_df['0049 215222111'] = join_phones(extract_phones(df['telefon'], phone_style)).to_numpy()
+    return sample_df
+
+def open_outputs(stack: ExitStack, output_files, output_format: Optional[str] = None) -> Dict[str, object]:
+    """
+    {formaat: binair bestand} voor alle outputs. Het formaat volgt uit de extensie
+    (.xlsx, .csv, .jsonl, .parquet); '-' is stdout in `output_format`, een open buffer wordt XLSX.
+    """
+    if isinstance(output_files, (str, os.PathLike)) or hasattr(output_files, 'write'):
+        output_files = [output_files]
+    targets = {}
+    for output in output_files:
+        if hasattr(output, 'write'):
+            name, target = output_format or 'xlsx', output
+        elif output == STDIO:
+            name, target = output_format or 'csv', sys.stdout.buffer
+        else:
+            name = format_for_path(os.fspath(output))
+            target = None
+        if name in targets:
+            raise ValueError(f"Meer dan één {name} bestand gevraagd")
+        targets[name] = target if target is not None else stack.enter_context(open(output, 'wb'))
+    return targets
+
+class ConversionSummary(NamedTuple):
+    patients: int
+    rit_datum: str
+    columns: List[str]          # gevonden SLK kolommen
+    issues: pd.DataFrame        # validatieproblemen over alle rijen
+    head: pd.DataFrame          # eerste rijen van de output
+
+def iter_sample_batches(patients: Iterator[dict], rit_datum: str, profile: str = DEFAULT_PROFILE,
+                        phone_style: str = None, batch_size: int = ROW_BATCH) -> Iterator[pd.DataFrame]:
+    """Opgeschoonde sample tabellen per batch patiënten."""
+    while True:
+        batch = list(itertools.islice(patients, batch_size))
+        if not batch:
+            return
+        yield clean_dataframe(convert_to_sample_format(patients_frame(batch), rit_datum, phone_style), profile)
+
+class SourceConversion(NamedTuple):
+    name: str
+    rit_datum: str
+    columns: Dict[str, None]            # gevonden SLK kolommen; gevuld terwijl de batches lopen
+    diagnostics: ParseDiagnostics
+    batches: Iterable[pd.DataFrame]     # opgeschoonde sample tabellen
+
+def convert_source(source: SlkSource, profile: str = DEFAULT_PROFILE, phone_style: str = None) -> SourceConversion:
+    """Eén bron als stream van sample batches; de bron wordt pas gelezen als de batches lopen."""
+    encoding, _ = sniff_encoding(source)
+    with source.open() as stream:
+        rit_datum = rit_datum_from_content(iter_lines(stream, encoding))
+    columns = {}
+    diagnostics = ParseDiagnostics()
+
+    def seen(patients):
+        for patient in patients:
+            columns.update(dict.fromkeys(patient))
+            yield patient
+
+    def batches():
+        with source.open() as stream:
+            patients = seen(iter_patients(iter_lines(stream, encoding), encoding, diagnostics))
+            yield from iter_sample_batches(patients, rit_datum, profile, phone_style)
+
+    return SourceConversion(source.name, rit_datum, columns, diagnostics, batches())
+
+def convert_member(source: SlkSource, profile: str = DEFAULT_PROFILE, phone_style: str = None) -> SourceConversion:
+    """convert_source helemaal uitgevoerd, zodat het resultaat uit een worker proces terug kan."""
+    conversion = convert_source(source, profile, phone_style)
+    return conversion._replace(batches=list(conversion.batches))
+
+def convert_file(input_file: str, output_file, diagnostics: ParseDiagnostics = None,
+                 profile: str = DEFAULT_PROFILE, phone_style: str = None,
+                 output_format: Optional[str] = None, workers: Optional[int] = None) -> ConversionSummary:
+    """
+    Converteer één SLK bestand (of stdin bij '-') naar het sample formaat.
+    `output_file` mag ook een lijst bestanden zijn; alle formaten worden in één pass
+    geschreven, batch voor batch zodra de patiënten gelezen zijn. Een zip met
+    meerdere exports wordt door `workers` processen tegelijk geconverteerd en in de
+    volgorde van het archief geschreven. Zonder patiënten wordt er niets geschreven.
+    """
+    sources = input_sources(input_file)
+    if len(sources) > 1:
+        conversions = map_sources(functools.partial(convert_member, profile=profile, phone_style=phone_style),
+                                  sources, workers)
+    else:
+        conversions = (convert_source(source, profile, phone_style) for source in sources)
+    rit_datums = []
+    columns = {}
+    # Regels per rij per batch; dubbele patiënten pas aan het eind, over alle batches en bronnen
+    validation = BatchValidator(VALIDATOR)
+    head = []
+    written = [0]
+
+    def row_batches():
+        for conversion in conversions:
+            rit_datums.append(conversion.rit_datum)
+            for sample_df in conversion.batches:
+                # De index loopt door over batches en bronnen, zodat de validatie de echte rij noemt
+                sample_df.index = pd.RangeIndex(written[0], written[0] + len(sample_df))
+                validation.add(sample_df)
+                if not head:
+                    head.append(sample_df.head(3))
+                written[0] += len(sample_df)
+                yield from iter_row_batches(sample_df)
+            columns.update(conversion.columns)
+            if diagnostics is not None:
+                diagnostics.merge(conversion.diagnostics)
+
+    batches = row_batches()
+    first = next(batches, None)
+    if first is None:
+        # Alle bronnen gelezen, geen enkele patiënt
+        return ConversionSummary(0, ', '.join(dict.fromkeys(filter(None, rit_datums))), [], pd.DataFrame(),
+                                 pd.DataFrame(columns=SAMPLE_COLUMNS))
+    with ExitStack() as stack:
+        export_rows(itertools.chain([first], batches), SAMPLE_COLUMNS, open_outputs(stack, output_file, output_format))
+    return ConversionSummary(written[0], ', '.join(dict.fromkeys(filter(None, rit_datums))), list(columns),
+                             validation.report(), head[0])
 
 def main():
-    print("=" * 50)
-    print("📊 Meditec SLK naar Excel Converter (Sample Format)")
-    print("=" * 50)
-    if len(sys.argv) != 3:
-        print("Gebruik: python convert_slk.py input.slk output.xlsx")
-        sys.exit(1)
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
-    if not os.path.exists(input_file):
-        print(f"❌ Fout: Bestand '{input_file}' bestaat niet!")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='Meditec SLK naar Excel (sample formaat)')
+    parser.add_argument('input_file', help="SLK bestand (ook .slk.gz of .zip), of '-' voor stdin")
+    parser.add_argument('output_file', nargs='+',
+                        help="output bestand(en); formaat volgens de extensie: .xlsx, .csv, .jsonl of .parquet; "
+                             "'-' voor stdout")
+    parser.add_argument('--format', dest='output_format', choices=list(EXPORTERS), default=None,
+                        help="formaat voor stdout (standaard csv)")
+    parser.add_argument('--profile', choices=list(PROFILES), default=DEFAULT_PROFILE,
+                        help=f'transliteratie van de tekens (standaard {DEFAULT_PROFILE})')
+    parser.add_argument('--phones', choices=list(PHONE_STYLES), default=None,
+                        help='telefoonnummers normaliseren (standaard ongewijzigd)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processen voor de leden van een zip (standaard: aantal CPU's)")
+    parser.add_argument('--strict', action='store_true', help=f'exit code {EXIT_INVALID} bij validatieproblemen')
+    parser.add_argument('-q', '--quiet', action='store_true', help='geen samenvatting, alleen fouten')
+    args = parser.parse_args()
+    input_file = args.input_file
+    output_file = args.output_file
+    say = (lambda *values: None) if args.quiet else log
+
+    if output_file.count(STDIO) > 1:
+        parser.error("stdout ('-') kan maar één keer als output")
     try:
-        rit_datum = extract_rit_datum(input_file)
-        print(f"📅 Datum van de rit: {rit_datum}")
-        df = parse_slk_patients(input_file)
-        if df.empty:
-            print("❌ Geen data gevonden in het SLK bestand!")
-            sys.exit(1)
-        print(f"✅ {len(df)} patiënten gevonden!")
-        print(f"📊 Kolommen: {', '.join(df.columns.tolist())}")
-        print("🔄 Data wordt geconverteerd naar sample formaat...")
-        sample_df = convert_to_sample_format(df, rit_datum)
-        sample_df = clean_dataframe(sample_df)
-        print(f"💾 Excel bestand wordt opgeslagen: {output_file}")
-        # Export zonder headers - gebruik openpyxl direct
-        from openpyxl import Workbook
-        
-        wb = Workbook()
-        ws = wb.active
-        ws.title = 'Data'
-        
-        # Schrijf alleen de data waarden, geen headers
-        data_only = sample_df.values.tolist()
-        for row_idx, row_data in enumerate(data_only, 1):  # Start bij rij 1
-            for col_idx, value in enumerate(row_data, 1):   # Start bij kolom 1
-                ws.cell(row=row_idx, column=col_idx, value=value)
-        
-        wb.save(output_file)
-        print("✅ Conversie voltooid!")
-        print(f"📈 Samenvatting:")
-        print(f"   • Patiënten: {len(df)}")
-        print(f"   • Output records: {len(sample_df)}")
-        print(f"   • Output kolommen: {len(sample_df.columns)}")
-        print(f"   • Bestand opgeslagen: {output_file}")
-        print("\n📋 Eerste 3 rijen van output:")
-        print(sample_df.head(3).to_string(index=False))
+        for output in output_file:
+            if output != STDIO:
+                format_for_path(output)
+    except ValueError as e:
+        parser.error(str(e))
+    if input_file != STDIO and not (os.path.isfile(input_file) and os.access(input_file, os.R_OK)):
+        log(f"❌ Fout: Bestand '{input_file}' bestaat niet of is niet leesbaar!")
+        sys.exit(EXIT_NO_INPUT)
+
+    say("=" * 50)
+    say("📊 Meditec SLK naar Excel Converter (Sample Format)")
+    say("=" * 50)
+    diagnostics = ParseDiagnostics()
+    try:
+        summary = convert_file(input_file, output_file, diagnostics, args.profile, args.phones, args.output_format,
+                               args.workers)
+    except BrokenPipeError:
+        # De lezer (bv. head) is gestopt; Python mag bij het afsluiten niet nog eens naar stdout schrijven
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(EXIT_BROKEN_PIPE)
     except Exception as e:
-        print(f"❌ Fout tijdens conversie: {str(e)}")
-        sys.exit(1)
+        log(f"❌ Fout tijdens conversie: {str(e)}")
+        sys.exit(EXIT_FAILED)
+
+    say(f"📅 Datum van de rit: {summary.rit_datum}")
+    if not args.quiet:
+        print_diagnostics(diagnostics)
+    if not summary.patients:
+        log("❌ Geen data gevonden in het SLK bestand!")
+        sys.exit(EXIT_NO_DATA)
+    say(f"✅ {summary.patients} patiënten gevonden!")
+    say(f"📊 Kolommen: {', '.join(summary.columns)}")
+    say(f"💾 Opgeslagen in sample formaat: {', '.join(output_file)}")
+    say("✅ Conversie voltooid!")
+    say(f"📈 Samenvatting:")
+    say(f"   • Patiënten: {summary.patients}")
+    say(f"   • Output records: {summary.patients}")
+    say(f"   • Output kolommen: {len(SAMPLE_COLUMNS)}")
+    say(f"   • Bestand(en) opgeslagen: {', '.join(output_file)}")
+    issues = summary.issues
+    if issues.empty:
+        say("✅ Validatie: geen problemen gevonden")
+    else:
+        say(f"⚠️ Validatie: {len(issues)} probleem/problemen in {issues['rij'].nunique()} rij(en):")
+        say(issues.to_string(index=False))
+    say("\n📋 Eerste 3 rijen van output:")
+    say(summary.head.to_string(index=False))
+    if args.strict and not issues.empty:
+        sys.exit(EXIT_INVALID)
+    sys.exit(EXIT_OK)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
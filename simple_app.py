@@ -1,388 +1,125 @@
 import streamlit as st
-import pandas as pd
-import re
-import io
-import unicodedata
-from typing import Dict, List, Tuple
-import base64
+import numpy as np
+import time
+
+from translations import TRANSLATIONS
+from slk_exporters import EXPORTERS, available_formats
+from slk_jobs import JOBS_FILE
+from slk_pipeline import CLEANED, CONVERTED, EMITTED, TOKENIZED, export_routemeister
+from slk_phones import PHONE_STYLES
+from slk_profiles import DEFAULT_PROFILE, PROFILES
+from slk_mapping import (DEFAULT_MAPPING, SLK_COLUMNS, apply_column_mapping, list_presets, load_preset,
+                         mapped_fields, save_preset)
+from slk_validation import validate_output
+from slk_provenance import describe, printable
+from slk_sources import SOURCE_EXTENSIONS, digest_stream, read_origin
+from slk_worker import ConversionPool, preview_upload, upload_members, upload_source
 
 # Simple SLK to Excel converter app
+# De zware onderdelen (pandas, parser, tabellen) staan in aparte modules en worden
+# dus maar één keer per proces geladen; openpyxl pas als er een XLSX gevraagd wordt.
 
-TRANSLATIONS = {
-    "Nederlands": {
-        "title": "Routemeister converter tool",
-        "subtitle": "Meditec Export Reha Bonn  > Routemeister import",
-        "upload": "Upload SLK Bestand",
-        "select_file": "Selecteer een SLK bestand om te converteren",
-        "mapping": "⚙️ Kolom Mapping Configuratie (optioneel)",
-        "mapping_desc": "Configureer hoe de SLK kolommen moeten worden omgezet:",
-        "preview": "📊 Data Preview",
-        "input_data": "📁 Input Data (SLK)",
-        "found_columns": "📊 Gevonden Kolommen",
-        "output_data": "🔄 Output Data (Excel)",
-        "success": "✅ Conversie voltooid!",
-        "download": "📥 Download Excel bestand",
-        "warning_special": "⚠️ {n} cel(len) bevatten speciale of niet-toegestane tekens. Deze zijn lichtrood gemarkeerd. Pas het SLK-bestand aan en probeer opnieuw te converteren.",
-        "no_data": "❌ Geen data gevonden in het SLK bestand",
-        "processing": "SLK bestand wordt geparsed...",
-        "converting": "Data wordt geconverteerd...",
-        "select_language": "Taal / Sprache / Language"
-    },
-    "Deutsch": {
-        "title": "Routemeister Konverter-Tool",
-        "subtitle": "Meditec Export Reha Bonn  > Routemeister Import",
-        "upload": "SLK Datei hochladen",
-        "select_file": "Wählen Sie eine SLK-Datei zum Konvertieren aus",
-        "mapping": "⚙️ Spaltenzuordnung (optional)",
-        "mapping_desc": "Konfigurieren Sie, wie die SLK-Spalten zugeordnet werden:",
-        "preview": "📊 Datenvorschau",
-        "input_data": "📁 Eingabedaten (SLK)",
-        "found_columns": "📊 Gefundene Spalten",
-        "output_data": "🔄 Ausgabedaten (Excel)",
-        "success": "✅ Konvertierung abgeschlossen!",
-        "download": "📥 Excel-Datei herunterladen",
-        "warning_special": "⚠️ {n} Zelle(n) enthalten spezielle oder nicht erlaubte Zeichen. Diese sind hellrot markiert. Bitte passen Sie die SLK-Datei an und versuchen Sie es erneut.",
-        "no_data": "❌ Keine Daten in der SLK-Datei gefunden",
-        "processing": "SLK-Datei wird geparst...",
-        "converting": "Daten werden konvertiert...",
-        "select_language": "Taal / Sprache / Language"
-    },
-    "English": {
-        "title": "Routemeister converter tool",
-        "subtitle": "Meditec Export Reha Bonn  > Routemeister import",
-        "upload": "Upload SLK file",
-        "select_file": "Select an SLK file to convert",
-        "mapping": "⚙️ Column Mapping (optional)",
-        "mapping_desc": "Configure how the SLK columns should be mapped:",
-        "preview": "📊 Data Preview",
-        "input_data": "📁 Input Data (SLK)",
-        "found_columns": "📊 Found Columns",
-        "output_data": "🔄 Output Data (Excel)",
-        "success": "✅ Conversion completed!",
-        "download": "📥 Download Excel file",
-        "warning_special": "⚠️ {n} cell(s) contain special or disallowed characters. These are highlighted in light red. Please adjust the SLK file and try again.",
-        "no_data": "❌ No data found in the SLK file",
-        "processing": "Parsing SLK file...",
-        "converting": "Converting data...",
-        "select_language": "Taal / Sprache / Language"
-    }
-}
+# Aantal rijen per pagina in de preview met gemarkeerde cellen
+PAGE_SIZE = 50
 
-def clean_value(val):
-    if pd.isna(val):
-        return val
-    
-    # Converteer naar string
-    text = str(val)
-    
-    # Fix encoding issues (UTF-8 bytes read as Latin-1) - EERST doen!
-    encoding_fixes = {
-        'Ã¤': 'ä',  # ä incorrectly encoded
-        'Ã¶': 'ö',  # ö incorrectly encoded  
-        'Ã¼': 'ü',  # ü incorrectly encoded
-        'ÃŸ': 'ss', # ß incorrectly encoded -> ss
-        'Ã„': 'Ä',  # Ä incorrectly encoded
-        'Ã–': 'Ö',  # Ö incorrectly encoded
-        'Ãœ': 'Ü',  # Ü incorrectly encoded
-    }
-    
-    for wrong_encoding, correct_char in encoding_fixes.items():
-        text = text.replace(wrong_encoding, correct_char)
-    
-    # Vervang escape sequences + de volgende letter door de juiste umlaut
-    # Deze worden nu al in de parser afgehandeld, maar als backup hier ook
-    escape_replacements = {
-        '\x1bNHa': 'ä',  # \x1bNH + a = ä
-        '\x1bNHo': 'ö',  # \x1bNH + o = ö 
-        '\x1bNHu': 'ü',  # \x1bNH + u = ü 
-        '\x1bNHr': 'ür', # \x1bNH + r = ür (voor "für")
-        '\x1bNOo': 'ö',  # \x1bNO + o = ö
-        '\x1bNUu': 'ü',  # \x1bNU + u = ü
-        '\x1bNSs': 'ss', # \x1bNS + s = ss (ß wordt ss)
-        '\x1bN{e': 'ße', # \x1bN{ + e = ße (ß escape sequence)
-        # Probeer ook andere varianten
-        '\x1bNUb': 'üb', # \x1bNU + b = üb 
-        '\x1bNUc': 'üc', # \x1bNU + c = üc 
-    }
-    
-    # Pas escape sequence replacements toe
-    for escape_seq, replacement in escape_replacements.items():
-        if escape_seq in text:
-            text = text.replace(escape_seq, replacement)
-    
-    # Verwijder overgebleven escape sequences
-    text = re.sub(r'\x1b[A-Z]{2,}[a-z{]?', '', text)
-    
-    # Extra conversie: ß naar ss als het nog in de tekst staat
-    text = text.replace('ß', 'ss')
-    
-    # Vervang Duitse karakters door hun ASCII equivalenten (voor CSV compatibiliteit)
-    german_replacements = {
-        'ä': 'a', 'ö': 'o', 'ü': 'u',
-        'Ä': 'A', 'Ö': 'O', 'Ü': 'U',
-    }
-    
-    for german_char, ascii_char in german_replacements.items():
-        text = text.replace(german_char, ascii_char)
-    
-    # Verwijder controle karakters maar behoud printbare karakters
-    cleaned = ''.join(c for c in text if unicodedata.category(c)[0] != 'C')
-    
-    # Verwijder alleen de echt problematische karakters voor Excel
-    problematic_chars = ['\x00', '\x01', '\x02', '\x03', '\x04', '\x05', '\x06', '\x07', '\x08', 
-                        '\x0b', '\x0c', '\x0e', '\x0f', '\x10', '\x11', '\x12', '\x13', '\x14', 
-                        '\x15', '\x16', '\x17', '\x18', '\x19', '\x1a', '\x1b', '\x1c', '\x1d', 
-                        '\x1e', '\x1f']
-    
-    for char in problematic_chars:
-        cleaned = cleaned.replace(char, '')
-    
-    return cleaned
+# Aantal patiënten in de preview (ook de snelle preview terwijl de conversie loopt)
+PREVIEW_ROWS = 10
 
-def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    return df.applymap(clean_value)
+@st.cache_resource(show_spinner=False)
+def get_conversion_pool():
+    """Eén process pool per server, gedeeld door alle sessies; de conversies komen in de job queue."""
+    return ConversionPool(jobs_file=JOBS_FILE)
 
-def extract_rit_datum(file_content: str) -> str:
-    # Zoek naar Y2;X1
-    last_row = None
-    last_col = None
-    for line in file_content.split('\n'):
-        line = line.strip()
-        pos_match = re.search(r'Y(\d+);X(\d+)', line)
-        if pos_match:
-            last_row = int(pos_match.group(1))
-            last_col = int(pos_match.group(2))
-            continue
-        if line.startswith('C;K') and last_row == 2 and last_col == 1:
-            match = re.search(r'C;K"([^"]*)"', line)
-            if match:
-                datum = match.group(1)
-                # Vervang punten door streepjes in datum
-                return datum.replace('.', '-')
-    return ''
+def upload_digest(uploaded_file) -> str:
+    """sha1 van de upload, per upload (file_id) één keer per sessie: een rerun hasht niet opnieuw."""
+    file_id = getattr(uploaded_file, 'file_id', None)
+    cached = st.session_state.get('upload_digest')
+    if file_id is not None and cached is not None and cached[0] == file_id:
+        return cached[1]
+    digest = digest_stream(uploaded_file)
+    st.session_state['upload_digest'] = (file_id, digest)
+    return digest
 
-def parse_slk_patients(file_content: str) -> pd.DataFrame:
-    # Robuuste parser: onthoud altijd laatst gevonden Y/X, koppel elke C;K aan die coördinaat
-    patients = []
-    current_patient = {}
-    last_row = None
-    last_col = None
-    for line in file_content.split('\n'):
-        line = line.strip()
-        pos_match = re.search(r'Y(\d+);X(\d+)', line)
-        if pos_match:
-            last_row = int(pos_match.group(1))
-            last_col = int(pos_match.group(2))
-            continue
-        if line.startswith('C;K') and last_row is not None and last_col is not None:
-            if last_row >= 4 and 2 <= last_col <= 14:
-                # Accepteer zowel C;K"waarde" als C;Kwaarde (voor postcodes etc.)
-                match = re.search(r'C;K"([^"]*)"', line)
-                if not match:
-                    # Probeer zonder quotes (voor numerieke waarden)
-                    match = re.search(r'C;K([0-9]+)$', line)
-                if match:
-                    value = match.group(1) if match.group(1) is not None else match.group(2)
-                    
-                    # Vervang escape sequences + de volgende letter door de juiste umlaut
-                    # De escape sequence vervangt de volgende letter
-                    escape_replacements = {
-                        '\x1bNHa': 'ä',  # \x1bNH + a = ä
-                        '\x1bNHo': 'ö',  # \x1bNH + o = ö 
-                        '\x1bNHu': 'ü',  # \x1bNH + u = ü 
-                        '\x1bNHr': 'ür', # \x1bNH + r = ür (voor "für")
-                        '\x1bNOo': 'ö',  # \x1bNO + o = ö
-                        '\x1bNUu': 'ü',  # \x1bNU + u = ü
-                        '\x1bNSs': 'ss', # \x1bNS + s = ss (ß wordt ss)
-                        '\x1bN{e': 'ße', # \x1bN{ + e = ße (ß escape sequence)
-                        # Probeer ook andere varianten
-                        '\x1bNUb': 'üb', # \x1bNU + b = üb 
-                        '\x1bNUc': 'üc', # \x1bNU + c = üc 
-                    }
-                    
-                    # Probeer alle mogelijke combinaties
-                    for escape_seq, replacement in escape_replacements.items():
-                        if escape_seq in value:
-                            value = value.replace(escape_seq, replacement)
-                    
-                    # Verwijder overgebleven escape sequences
-                    value = re.sub(r'\x1b[A-Z]{2,}[a-z]?', '', value)
-                    
-                    # Extra conversie: ß naar ss als het nog in de tekst staat
-                    value = value.replace('ß', 'ss')
-                    
-                    column_mapping = {
-                        2: 'erster_termin',
-                        3: 'letzter_termin',
-                        4: 'name',
-                        5: 'vorname',
-                        6: 'titel',
-                        7: 'telefon',
-                        8: 'strasse',
-                        9: 'plz',
-                        10: 'ort',
-                        11: 'adresszusatz',
-                        12: 'bemerkung',
-                        13: 'bht',
-                        14: 'fallnummer'
-                    }
-                    col_name = column_mapping[last_col]
-                    if last_col == 2:
-                        # Start nieuwe patient bij X2
-                        if current_patient:
-                            patients.append(current_patient)
-                        current_patient = {}
-                    current_patient[col_name] = value
-    if current_patient:
-        patients.append(current_patient)
-    df = pd.DataFrame(patients)
-    # Zorg dat alle relevante kolommen altijd aanwezig zijn en in de juiste volgorde staan
-    all_cols = ['erster_termin', 'letzter_termin', 'name', 'vorname', 'titel', 'telefon', 'strasse', 'plz', 'ort', 'adresszusatz', 'bemerkung', 'bht', 'fallnummer']
-    for col in all_cols:
-        if col not in df.columns:
-            df[col] = ''
-    df = df[all_cols]
-    return df
+def run_conversion_job(uploaded_file, profile: str, phone_style, t: dict, member=None):
+    """
+    Converteer een upload op de achtergrond en toon intussen de voortgang.
 
-def convert_to_custom_format(df: pd.DataFrame, rit_datum: str) -> pd.DataFrame:
-    # Helper: split phone numbers
-    def split_phones(telefon):
-        if pd.isna(telefon):
-            return '', ''
-        parts = re.split(r'[ ,;/]+', str(telefon).strip())
-        hoofd = parts[0] if len(parts) > 0 else ''
-        tweede = parts[1] if len(parts) > 1 else ''
-        return hoofd, tweede
-    
-    # Helper: format time by removing colons and leading zeros
-    def format_time(tijd):
-        if pd.isna(tijd) or tijd == '':
-            return ''
-        # Verwijder dubbele punten uit tijd en leading zeros
-        tijd_str = str(tijd).replace(':', '')
-        # Verwijder leading zero als het een 4-cijferige tijd is (0700 -> 700)
-        if len(tijd_str) == 4 and tijd_str.startswith('0'):
-            tijd_str = tijd_str[1:]
-        return tijd_str
+    De upload wordt nooit in z'n geheel gekopieerd: hij wordt in blokken gehasht
+    (één keer per upload, zie upload_digest) en gaat via een tijdelijk bestand naar
+    de worker.
 
-    columns = [
-        'patient ID', 'leeg1', 'Name', 'vorname', 'leeg2', 'leeg3', 'strasse+nr', 'leeg4',
-        'ort', 'PLZ', 'landcode', '1telefon', '2telefon', 'leeg5', 'leeg6',
-        'datum von farht', 'leeg7', 'erster_termin', 'letze_termin'
-    ]
-    output = []
-    for _, row in df.iterrows():
-        hoofd, tweede = split_phones(row.get('telefon', ''))
-        landcode = 'D'
-        output.append([
-            row.get('fallnummer', ''), # 1 patient ID
-            '',                       # 2 leeg
-            row.get('name', ''),      # 3 Name (achternaam)
-            row.get('vorname', ''),   # 4 vorname
-            '',                       # 5 leeg
-            '',                       # 6 leeg
-            row.get('strasse', ''),   # 7 strasse+nr
-            '',                       # 8 leeg
-            row.get('ort', ''),       # 9 ort (plaatsnaam)
-            row.get('plz', ''),       # 10 PLZ (postcode)
-            landcode,                 # 11 landcode
-            hoofd,                    # 12 1telefon
-            tweede,                   # 13 2telefon
-            '',                       # 14 leeg
-            '',                       # 15 leeg
-            rit_datum,                # 16 datum der farht
-            '',                       # 17 leeg
-            format_time(row.get('erster_termin', '')), # 18 erster_termin
-            format_time(row.get('letzter_termin', '')) # 19 letzter_termin
-        ])
-    df_out = pd.DataFrame(output, columns=columns)
-    # Splits de kolom '1telefon' op komma's in meerdere kolommen
-    if '1telefon' in df_out.columns:
-        tel_split = df_out['1telefon'].str.split(',', expand=True)
-        for i in range(tel_split.shape[1]):
-            df_out[f'1telefon_{i+1}'] = tel_split[i].str.strip()
-        df_out = df_out.drop(columns=['1telefon'])
-    # Zet de kolommen in de gewenste volgorde, waarbij 1telefon_1 op positie 12 komt
-    gewenste_volgorde = [
-        'patient ID', 'leeg1', 'Name', 'vorname', 'leeg2', 'leeg3', 'strasse+nr', 'leeg4',
-        'ort', 'PLZ', 'landcode', '1telefon_1', '2telefon', 'leeg5', 'leeg6',
-        'datum von farht', 'leeg7', 'erster_termin', 'letze_termin'
-    ]
-    # Voeg extra telefoonkolommen toe achteraan als ze bestaan
-    extra_telcols = [col for col in df_out.columns if col.startswith('1telefon_') and col != '1telefon_1']
-    for col in extra_telcols:
-        if col not in gewenste_volgorde:
-            gewenste_volgorde.append(col)
-    # Alleen kolommen die daadwerkelijk bestaan in df_out
-    bestaande_volgorde = [col for col in gewenste_volgorde if col in df_out.columns]
-    df_out = df_out[bestaande_volgorde]
-    return df_out
+    Het resultaat blijft per sessie bewaard, dus een rerun (andere taal, andere
+    mapping) start geen nieuwe conversie; een ander profiel, een andere telefoon
+    stijl of een ander lid van een zip wel. Geeft None als de conversie is afgebroken.
 
-def get_download_link(df: pd.DataFrame, filename: str, text: str):
-    """Generate a download link for the DataFrame."""
-    
-    # Check if CSV or Excel based on filename extension
-    if filename.endswith('.csv'):
-        # Generate CSV without headers
-        buffer = io.StringIO()
-        
-        # Write only data values, no headers
-        data_only = df.values.tolist()
-        for row_data in data_only:
-            # Convert values to string and handle None/NaN
-            row_str = []
-            for value in row_data:
-                if pd.isna(value) or value is None:
-                    row_str.append('')
-                else:
-                    row_str.append(str(value))
-            buffer.write(','.join(row_str) + '\n')
-        
-        buffer.seek(0)
-        b64 = base64.b64encode(buffer.getvalue().encode('utf-8')).decode()
-        href = f'<a href="data:text/csv;base64,{b64}" download="{filename}">{text}</a>'
-        
-    else:
-        # Generate Excel without headers (original code)
-        from openpyxl import Workbook
-        
-        buffer = io.BytesIO()
-        
-        # Maak direct een Excel workbook zonder pandas tussenkomst
-        wb = Workbook()
-        ws = wb.active
-        ws.title = 'Data'
-        
-        # Schrijf alleen de data waarden, geen headers
-        data_only = df.values.tolist()
-        for row_idx, row_data in enumerate(data_only, 1):  # Start bij rij 1 (niet 0)
-            for col_idx, value in enumerate(row_data, 1):   # Start bij kolom 1 (niet 0)
-                ws.cell(row=row_idx, column=col_idx, value=value)
-        
-        # Sla op naar buffer
-        wb.save(buffer)
-        buffer.seek(0)
-        
-        b64 = base64.b64encode(buffer.read()).decode()
-        href = f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="{filename}">{text}</a>'
-    
-    return href
+    Terwijl de worker bezig is staan de eerste PREVIEW_ROWS patiënten er al; die
+    worden in dit proces gelezen, waarbij het tokenizen na die rijen stopt.
+    """
+    key = (upload_digest(uploaded_file), profile, phone_style, member)
+    finished = st.session_state.get('conversion')
+    if finished is not None and finished[0] == key:
+        return finished[1]
+
+    running = st.session_state.get('conversion_job')
+    if running is None or running[0] != key:
+        if running is not None:
+            running[1].cancel()
+        job = get_conversion_pool().submit(uploaded_file, profile, phone_style, member)
+        running = (key, job, preview_upload(uploaded_file, PREVIEW_ROWS, member))
+        st.session_state['conversion_job'] = running
+    job, preview = running[1], running[2]
+
+    # De knop geeft een rerun; in die rerun wordt de worker gestopt
+    cancel_slot = st.empty()
+    if cancel_slot.button(t["cancel"], key="cancel_conversion"):
+        job.cancel()
+        cancel_slot.empty()
+        del st.session_state['conversion_job']
+        st.session_state['conversion'] = (key, None)
+        return None
+
+    bar = st.progress(0.0)
+    # De snelle preview; de volledige conversie vervangt hem zodra hij klaar is
+    preview_slot = st.empty()
+    if not preview.empty:
+        with preview_slot.container():
+            st.caption(t["preview_partial"].format(n=len(preview)))
+            st.dataframe(preview, use_container_width=True)
+    while not job.done():
+        progress = job.poll()
+        bar.progress(job.fraction(), text=t["progress"].format(
+            bytes=progress[TOKENIZED], total=job.total_bytes,
+            rows=progress[EMITTED], converted=progress[CONVERTED], cleaned=progress[CLEANED]))
+        time.sleep(0.2)
+    bar.empty()
+    preview_slot.empty()
+    cancel_slot.empty()
 
-def has_special_chars(val):
-    """Check of een waarde speciale/ongewenste tekens bevat (niet-printbaar of niet-ASCII)."""
-    if pd.isna(val):
-        return False
-    s = str(val)
-    # Niet-printbare/control chars of niet-ASCII
-    return any(ord(c) < 32 or ord(c) > 126 for c in s)
+    result = job.result()
+    del st.session_state['conversion_job']
+    st.session_state['conversion'] = (key, result)
+    return result
 
-def highlight_special_chars(df):
-    """Geeft een Styler terug die cellen met speciale tekens lichtrood maakt."""
-    def style_func(val):
-        if has_special_chars(val):
-            return 'background-color: #ffcccc'  # lichtrood
-        return ''
-    return df.style.applymap(style_func)
+def show_provenance(routemeister_df, provenance, uploaded_file, member, column_mapping, t: dict):
+    """Het ruwe SLK record achter een output cel, met een seek in de upload."""
+    fields = mapped_fields(column_mapping)
+    if not len(provenance) or not fields:
+        return
+    with st.expander(t["provenance"], expanded=False):
+        row_col, column_col = st.columns([1, 2])
+        row = row_col.number_input(t["provenance_row"], min_value=0, max_value=len(routemeister_df) - 1, value=0)
+        column = column_col.selectbox(t["provenance_column"], list(fields))
+        origin = provenance.locate(int(row), fields[column])
+        if origin is None:
+            st.info(t["provenance_missing"].format(field=fields[column]))
+            return
+        st.caption(f"{origin.field}: {describe(origin)}")
+        st.code(printable(read_origin(upload_source(uploaded_file, member), origin)))
+
+def highlight_special_chars(df, special_mask):
+    """Geeft een Styler terug die de gemarkeerde cellen lichtrood maakt."""
+    styles = np.where(special_mask.values, 'background-color: #ffcccc', '')  # lichtrood
+    return df.style.apply(lambda _: styles, axis=None)
 
 def main():
     taal = st.selectbox(TRANSLATIONS["Deutsch"]["select_language"], ["Deutsch", "Nederlands", "English"], index=0)
@@ -405,208 +142,190 @@ def main():
     st.header(t["upload"])
     uploaded_file = st.file_uploader(
         t["select_file"],
-        type=['slk', 'txt'],
+        type=SOURCE_EXTENSIONS,
         help=t["select_file"]
     )
     
+    # Transliteratieprofiel voor de export
+    profile_names = list(PROFILES)
+    profile = st.selectbox(
+        t["profile"],
+        profile_names,
+        index=profile_names.index(DEFAULT_PROFILE),
+        format_func=lambda name: t[f"profile_{name}"]
+    )
+    
+    # Telefoonnummers ongewijzigd laten (None) of normaliseren
+    phone_style = st.selectbox(
+        t["phone_style"],
+        [None] + list(PHONE_STYLES),
+        format_func=lambda name: t[f"phone_style_{name or 'keep'}"]
+    )
+    
     # Column mapping configuration
+    # De selectboxes staan in een formulier: wijzigen kost pas een rerun bij "toepassen"
+    if 'column_mapping' not in st.session_state:
+        st.session_state['column_mapping'] = dict(DEFAULT_MAPPING)
     with st.expander(t["mapping"], expanded=False):
         st.markdown(t["mapping_desc"])
-        # Default column mapping
-        default_mapping = {
-            'Patient_ID': 'fallnummer',
-            'Name': 'name', 
-            'Vorname': 'vorname',
-            'Titel': 'titel',
-            'Telefon': 'telefon',
-            'Strasse': 'strasse',
-            'PLZ': 'plz',
-            'Ort': 'ort',
-            'Adresszusatz': 'adresszusatz',
-            'Bemerkung': 'bemerkung',
-            'BHT': 'bht',
-            'Erster_Termin': 'erster_termin',
-            'Letzter_Termin': 'letzter_termin'
-        }
-        # Available SLK columns
-        slk_columns = ['name', 'vorname', 'titel', 'telefon', 'strasse', 'plz', 'ort', 
-                       'adresszusatz', 'bemerkung', 'bht', 'fallnummer', 'erster_termin', 'letzter_termin']
-        # Create mapping interface
-        column_mapping = {}
-        for routemeister_col, default_slk_col in default_mapping.items():
-            selected_col = st.selectbox(
-                f"Map '{routemeister_col}' naar:",
-                [''] + slk_columns,
-                index=slk_columns.index(default_slk_col) + 1 if default_slk_col in slk_columns else 0
-            )
-            if selected_col:
-                column_mapping[routemeister_col] = selected_col
+        presets = list_presets()
+        if presets:
+            preset_col, load_col = st.columns([3, 1])
+            preset = preset_col.selectbox(t["preset"], presets)
+            if load_col.button(t["load_preset"], use_container_width=True):
+                loaded = load_preset(preset)
+                st.session_state['column_mapping'] = {key: value for key, value in loaded.items() if value}
+                for routemeister_col, slk_col in loaded.items():
+                    st.session_state[f"map_{routemeister_col}"] = slk_col
+        with st.form("mapping_form"):
+            selections = {}
+            for routemeister_col in DEFAULT_MAPPING:
+                widget_key = f"map_{routemeister_col}"
+                if widget_key not in st.session_state:
+                    st.session_state[widget_key] = st.session_state['column_mapping'].get(routemeister_col, '')
+                selections[routemeister_col] = st.selectbox(
+                    f"Map '{routemeister_col}' naar:",
+                    [''] + SLK_COLUMNS,
+                    key=widget_key
+                )
+            if st.form_submit_button(t["apply_mapping"]):
+                st.session_state['column_mapping'] = {key: value for key, value in selections.items() if value}
+        name_col, save_col = st.columns([3, 1])
+        preset_name = name_col.text_input(t["preset_name"])
+        if save_col.button(t["save_preset"], use_container_width=True) and preset_name:
+            try:
+                save_preset(preset_name, st.session_state['column_mapping'])
+                st.success(t["preset_saved"].format(name=preset_name))
+            except ValueError as e:
+                st.error(str(e))
+    column_mapping = st.session_state['column_mapping']
     
     # Main content area
     st.header(t["preview"])
     
     if uploaded_file is not None:
-        # Read file content
-        # Probeer verschillende encodings voor Duitse karakters
-        raw_content = uploaded_file.read()
-        encodings_to_try = ['utf-8', 'cp1252', 'iso-8859-1', 'windows-1252']
-        
-        file_content = None
-        for encoding in encodings_to_try:
-            try:
-                file_content = raw_content.decode(encoding)
-                break
-            except UnicodeDecodeError:
-                continue
+        # .slk, .slk.gz of een zip; de upload blijft een stream, de worker pakt uit
+        # Een zip met meerdere exports: één tegelijk converteren
+        members = upload_members(uploaded_file)
+        member = st.selectbox(t["archive_member"], members) if len(members) > 1 else None
         
-        if file_content is None:
-            file_content = raw_content.decode('utf-8', errors='ignore')
-        
-        # Parse SLK file
-        with st.spinner(t["processing"]):
-            df = parse_slk_patients(file_content)
+        # Parse en converteer op de achtergrond (met voortgang en annuleerknop)
+        result = run_conversion_job(uploaded_file, profile, phone_style, t, member)
+        if result is None:
+            st.info(t["cancelled"])
+            if st.button(t["restart"]):
+                del st.session_state['conversion']
+                st.rerun()
+        else:
+            df, diagnostics, special_mask, special_cells = result[:4]
+            
+            # Records die de parser niet kon lezen
+            if diagnostics:
+                st.warning(t["warning_parser"].format(n=len(diagnostics)))
+                with st.expander(t["parser_report"], expanded=False):
+                    st.dataframe(diagnostics.to_frame(), use_container_width=True, hide_index=True)
+                    if diagnostics.truncated:
+                        st.caption(t["parser_report_truncated"].format(shown=len(diagnostics.entries), n=len(diagnostics)))
         
-        if not df.empty:
-            st.success(t["success"])
+            if not df.empty:
+                st.success(t["success"])
             
-            # Check op speciale tekens
-            special_mask = df.applymap(has_special_chars)
-            n_special = special_mask.values.sum()
-            if n_special > 0:
-                st.warning(t["warning_special"].format(n=n_special))
-                st.dataframe(highlight_special_chars(df), use_container_width=True)
-            else:
-                st.dataframe(df.head(10), use_container_width=True)
+                # Check op speciale tekens
+                n_special = special_mask.values.sum()
+                if n_special > 0:
+                    st.warning(t["warning_special"].format(n=n_special))
+                    # Alleen de getoonde pagina stylen; begin bij de eerste gemarkeerde rij
+                    n_pages = (len(df) - 1) // PAGE_SIZE + 1
+                    first_page = int(special_mask.values.any(axis=1).argmax()) // PAGE_SIZE + 1
+                    page = 1
+                    if n_pages > 1:
+                        page = st.number_input(t["page"], min_value=1, max_value=n_pages, value=first_page)
+                    window = slice((page - 1) * PAGE_SIZE, page * PAGE_SIZE)
+                    st.dataframe(highlight_special_chars(df.iloc[window], special_mask.iloc[window]), use_container_width=True)
+                    with st.expander(t["special_cells"], expanded=False):
+                        st.dataframe(special_cells, use_container_width=True, hide_index=True)
+                else:
+                    st.dataframe(df.head(PREVIEW_ROWS), use_container_width=True)
             
-            # Show column info
-            with st.expander(t["found_columns"], expanded=False):
-                for col in df.columns:
-                    st.write(f"• {col}: {df[col].notna().sum()} waarden")
+                # Show column info
+                with st.expander(t["found_columns"], expanded=False):
+                    for col in df.columns:
+                        st.write(f"• {col}: {df[col].notna().sum()} waarden")
             
-            # Convert to Routemeister format
-            if column_mapping:
-                st.subheader(t["output_data"])
-                with st.spinner(t["converting"]):
-                    # Extract RIT datum
-                    rit_datum = extract_rit_datum(file_content)
-                    if not rit_datum:
-                        routemeister_df = convert_to_custom_format(df, '') # Pass empty string for rit_datum
-                    else:
-                        routemeister_df = convert_to_custom_format(df, rit_datum)
-                    
-                    # Keep original data for CSV export (before cleaning)
-                    original_routemeister_df = routemeister_df.copy()
-                    
-                    # Clean data to remove illegal characters (only for display)
-                    routemeister_df = clean_dataframe(routemeister_df)
+                # Convert to Routemeister format
+                if column_mapping:
+                    st.subheader(t["output_data"])
+                    # De conversie is al gedaan; de mapping is alleen een projectie daarover
+                    rit_datum = result.rit_datum
+                    routemeister_df = apply_column_mapping(result.routemeister_df, result.fields_df, column_mapping)
                 
-                if not routemeister_df.empty:
-                    st.success(t["success"])
-                    st.dataframe(routemeister_df.head(10).reset_index(drop=True), use_container_width=True, hide_index=True)
+                    if not routemeister_df.empty:
+                        st.success(t["success"])
+                        st.dataframe(routemeister_df.head(10).reset_index(drop=True), use_container_width=True, hide_index=True)
                     
-                    # Fixed CSV download button (always visible and large)
-                    # Use ORIGINAL data (same as small hover button) with escape sequence fixes
-                    def fix_escape_sequences(val):
-                        if pd.isna(val) or val is None:
-                            return val
-                        text = str(val)
-                        
-                        # Same escape replacements as in parser
-                        escape_replacements = {
-                            '\x1bNHa': 'ä',  # \x1bNH + a = ä
-                            '\x1bNHo': 'ö',  # \x1bNH + o = ö 
-                            '\x1bNHu': 'ü',  # \x1bNH + u = ü 
-                            '\x1bNHr': 'ür', # \x1bNH + r = ür (voor "für")
-                            '\x1bNOo': 'ö',  # \x1bNO + o = ö
-                            '\x1bNUu': 'ü',  # \x1bNU + u = ü
-                            '\x1bNSs': 'ss', # \x1bNS + s = ss (ß wordt ss)
-                            '\x1bN{e': 'ße', # \x1bN{ + e = ße (ß escape sequence)
-                            '\x1bNUb': 'üb', # \x1bNU + b = üb 
-                            '\x1bNUc': 'üc', # \x1bNU + c = üc 
-                        }
-                        
-                        for escape_seq, replacement in escape_replacements.items():
-                            if escape_seq in text:
-                                text = text.replace(escape_seq, replacement)
-                        
-                        # Remove remaining escape sequences
-                        text = re.sub(r'\x1b[A-Z]{2,}[a-z{]?', '', text)
-                        
-                        # Convert ß to ss
-                        text = text.replace('ß', 'ss')
+                        # Controleer de output op fouten die Routemeister zou weigeren
+                        issues = validate_output(routemeister_df)
+                        if not issues.empty:
+                            st.warning(t["warning_issues"].format(n=len(issues), rows=issues['rij'].nunique()))
+                            with st.expander(t["validation_report"], expanded=False):
+                                st.dataframe(issues, use_container_width=True, hide_index=True)
                         
-                        return text
+                        # Waar komt een cel vandaan (bv. een adres dat Routemeister verkeerd toont)
+                        show_provenance(routemeister_df, result.provenance, uploaded_file, member, column_mapping, t)
                     
-                    # Apply escape sequence fixes to original data (same as small button)
-                    csv_df = original_routemeister_df.applymap(fix_escape_sequences)
-                    
-                    csv_buffer = io.StringIO()
-                    csv_df.to_csv(csv_buffer, index=False, header=False, encoding='utf-8')
-                    csv_data = csv_buffer.getvalue()
-                    
-                    # Create filename with date
-                    if rit_datum:
-                        date_parts = rit_datum.split('-')
-                        if len(date_parts) == 3:
-                            date_str = f"{date_parts[0]}{date_parts[1]}{date_parts[2]}"
-                            download_filename = f"routemeister_{date_str}.csv"
+                        # Create filename with date
+                        if rit_datum:
+                            date_parts = rit_datum.split('-')
+                            if len(date_parts) == 3:
+                                date_str = f"{date_parts[0]}{date_parts[1]}{date_parts[2]}"
+                                download_filename = f"routemeister_{date_str}"
+                            else:
+                                download_filename = "routemeister"
                         else:
-                            download_filename = "routemeister.csv"
-                    else:
-                        download_filename = "routemeister.csv"
+                            download_filename = "routemeister"
                     
-                    # Make the button even more prominent
-                    st.markdown("---")  # Add separator line
+                        # Make the button even more prominent
+                        st.markdown("---")  # Add separator line
                     
-                    # Create columns to center and make button larger
-                    col1, col2, col3 = st.columns([1, 2, 1])
-                    with col2:
-                        # Prepare CSV data for download (with correct umlauts, no headers)
-                        # Apply escape sequence fixes to the download data
-                        def fix_escape_sequences(df):
-                            df_fixed = df.copy()
-                            for col in df_fixed.columns:
-                                df_fixed[col] = df_fixed[col].apply(lambda x: clean_value(x) if pd.notna(x) else x)
-                            return df_fixed
-                        
-                        download_df = fix_escape_sequences(original_routemeister_df)
+                        # Create columns to center and make button larger
+                        col1, col2, col3 = st.columns([1, 2, 1])
+                        with col2:
+                            # CSV voor Routemeister; de andere formaten uit dezelfde exporters
+                            download_format = st.selectbox(
+                                t["download_format"],
+                                available_formats(),
+                                format_func=str.upper,
+                                key="download_format"
+                            )
+                            exporter = EXPORTERS[download_format]
+                            # Prepare data for download (opgeschoonde data, no headers)
+                            export_data = export_routemeister(routemeister_df, download_format)
                         
-                        csv_buffer = io.StringIO()
-                        download_df.to_csv(
-                            csv_buffer, 
-                            index=False, 
-                            header=False, 
-                            encoding='utf-8',
-                            sep=';',  # Gebruik puntkomma als separator (beter voor Excel)
-                            quoting=1,  # Quote alleen als nodig
-                            lineterminator='\r\n'  # Windows line endings
-                        )
-                        csv_data = csv_buffer.getvalue()
-                        
-                        # Large, prominent download button
-                        st.download_button(
-                            label="📥 DOWNLOAD CSV",
-                            data=csv_data.encode('utf-8'),
-                            file_name=download_filename,
-                            mime="text/csv",
-                            key="large_csv_download",
-                            help="Download de geconverteerde data als CSV bestand",
-                            use_container_width=True
-                        )
+                            # Large, prominent download button
+                            st.download_button(
+                                label=f"📥 DOWNLOAD {download_format.upper()}",
+                                data=export_data,
+                                file_name=download_filename + exporter.extension,
+                                mime=exporter.mime,
+                                key="large_csv_download",
+                                help=f"Download de geconverteerde data als {download_format.upper()} bestand",
+                                use_container_width=True
+                            )
                     
-                    st.markdown("---")  # Add separator line
+                        st.markdown("---")  # Add separator line
                     
-                    # Show conversion summary
-                    st.subheader("📈 Conversie Samenvatting")
-                    st.write(f"• Input records: {len(df)}")
-                    st.write(f"• Output records: {len(routemeister_df)}")
-                    st.write(f"• Gemapte kolommen: {len(column_mapping)}")
+                        # Show conversion summary
+                        st.subheader("📈 Conversie Samenvatting")
+                        st.write(f"• Input records: {len(df)}")
+                        st.write(f"• Output records: {len(routemeister_df)}")
+                        st.write(f"• Gemapte kolommen: {len(column_mapping)}")
+                        st.write(f"• Validatie problemen: {len(issues)}")
+                    else:
+                        st.error("❌ Conversie mislukt")
                 else:
-                    st.error("❌ Conversie mislukt")
+                    st.info("⚙️ Configureer kolom mapping hierboven om output te zien")
             else:
-                st.info("⚙️ Configureer kolom mapping hierboven om output te zien")
-        else:
-            st.error(t["no_data"])
+                st.error(t["no_data"])
     else:
         st.info("👆 Upload een SLK bestand om te beginnen")
     
@@ -0,0 +1,113 @@
+"""
+Correctietabel voor bekende verminkte namen (bv. 'HNHarig' -> 'Härig').
+
+De tabel staat in een tekstbestand dat de gebruikers zelf bijhouden, één correctie
+per regel:
+
+    # commentaar
+    HNHarig = Härig
+
+Alle patronen worden samen in een trie gezet en die trie wordt één regex met
+gedeelde prefixen. Een cel wordt daardoor in één scan gecorrigeerd, hoe lang de
+lijst ook wordt; bij overlappende patronen wint de langste match. Een vervanging
+wordt niet opnieuw gescand: is de correctie van de ene regel de fout van een
+andere, dan blijft hij staan (`A = B` en `B = C` maken van A dus B, niet C). Het
+bestand wordt opnieuw ingelezen zodra het op schijf verandert (mtime of grootte).
+"""
+
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+CORRECTIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corrections.txt')
+
+
+def _trie_pattern(node: dict) -> str:
+    """Regex voor een trie knoop; '' markeert het einde van een patroon."""
+    ends_here = '' in node
+    branches = [re.escape(char) + _trie_pattern(child)
+                for char, child in sorted(node.items()) if char != '']
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    # Greedy optioneel: eerst de langere match proberen, anders hier stoppen
+    if ends_here:
+        body = ('(?:' + body + ')?') if len(branches) == 1 else body + '?'
+    return body
+
+
+class CompiledCorrections:
+    """Alle correcties als één regex over een trie van de foute spellingen."""
+
+    def __init__(self, corrections: Dict[str, str]):
+        self.corrections = dict(corrections)
+        self.regex = None
+        if self.corrections:
+            trie = {}
+            for wrong in self.corrections:
+                node = trie
+                for char in wrong:
+                    node = node.setdefault(char, {})
+                node[''] = True
+            self.regex = re.compile(_trie_pattern(trie))
+
+    def __len__(self):
+        return len(self.corrections)
+
+    def apply(self, text: str) -> str:
+        if self.regex is None:
+            return text
+        return self.regex.sub(lambda match: self.corrections[match.group(0)], text)
+
+
+class CorrectionError(NamedTuple):
+    line: int
+    record: str
+
+
+def parse_corrections(text: str) -> Tuple[Dict[str, str], List[CorrectionError]]:
+    """Lees 'fout = correctie' regels; onleesbare regels komen in de foutenlijst."""
+    corrections = {}
+    errors = []
+    for line_no, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        wrong, sep, correct = line.partition('=')
+        wrong, correct = wrong.strip(), correct.strip()
+        if not sep or not wrong:
+            errors.append(CorrectionError(line_no, line))
+            continue
+        corrections[wrong] = correct
+    return corrections, errors
+
+
+class CorrectionTable:
+    """
+    Correctiebestand met automatisch herladen.
+
+    `current()` kijkt (via os.stat) of het bestand gewijzigd is en compileert het
+    dan opnieuw; roep het één keer per tabel aan, niet per cel.
+    """
+
+    def __init__(self, path: str = CORRECTIONS_FILE):
+        self.path = path
+        self.errors: List[CorrectionError] = []
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._compiled = CompiledCorrections({})
+
+    def current(self) -> CompiledCorrections:
+        try:
+            stat = os.stat(self.path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            # Geen bestand: geen correcties
+            stamp = None
+        if stamp != self._stamp:
+            corrections, self.errors = {}, []
+            if stamp is not None:
+                with open(self.path, encoding='utf-8') as file:
+                    corrections, self.errors = parse_corrections(file.read())
+            self._compiled = CompiledCorrections(corrections)
+            self._stamp = stamp
+        return self._compiled
@@ -0,0 +1,67 @@
+"""
+Parser meldingen voor SLK bestanden.
+
+De tokenizer schrijft hier alleen iets naartoe als een record niet gelezen kan
+worden; goed gevormde regels kosten dus niets extra. De buffer is begrensd: na
+`limit` meldingen wordt alleen nog geteld.
+"""
+
+from typing import List, NamedTuple, Optional
+
+import pandas as pd
+
+# Redenen waarom een record is overgeslagen of verdacht is
+UNREADABLE = 'onleesbare waarde'          # C;K past op geen enkele regex, cel overgeslagen
+TRUNCATED = 'waarde mogelijk afgekapt'    # tekst na de afsluitende quote (bv. "" of ;;)
+NO_POSITION = 'cel zonder geldige positie'  # C;K zonder bekende Y/X of buiten kolom 2..14
+
+
+class Diagnostic(NamedTuple):
+    line: int               # regelnummer (vanaf 1)
+    offset: int             # byte offset van het begin van de regel
+    row: Optional[int]      # laatst bekende Y
+    col: Optional[int]      # laatst bekende X
+    reason: str
+    record: str             # de ruwe regel (ingekort)
+
+
+class ParseDiagnostics:
+    """Begrensde buffer met meldingen van de tokenizer."""
+
+    def __init__(self, limit: int = 200):
+        self.limit = limit
+        self.entries: List[Diagnostic] = []
+        self.total = 0
+
+    def add(self, line: int, offset: int, row, col, reason: str, record: str):
+        self.total += 1
+        if len(self.entries) < self.limit:
+            # Controle karakters (ESC) zichtbaar maken in plaats van ze naar de terminal te sturen
+            shown = ''.join(c if c.isprintable() else repr(c)[1:-1] for c in record[:120])
+            self.entries.append(Diagnostic(line, offset, row, col, reason, shown))
+
+    def merge(self, other: 'ParseDiagnostics'):
+        """Meldingen van een andere buffer toevoegen (bv. van een ander lid van een zip)."""
+        self.total += other.total
+        self.entries.extend(other.entries[:max(0, self.limit - len(self.entries))])
+
+    def __len__(self):
+        return self.total
+
+    @property
+    def truncated(self) -> bool:
+        """True als er meer meldingen waren dan de buffer kan bewaren."""
+        return self.total > len(self.entries)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            [(d.line, d.offset, d.row, d.col, d.reason, d.record) for d in self.entries],
+            columns=['regel', 'offset', 'Y', 'X', 'reden', 'record'],
+        )
+
+    def summary(self) -> dict:
+        """Aantal meldingen per reden (alleen over de bewaarde meldingen)."""
+        counts = {}
+        for d in self.entries:
+            counts[d.reason] = counts.get(d.reason, 0) + 1
+        return counts
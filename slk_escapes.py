@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Escape sequences in een corpus van SLK exports analyseren.
+
+Meditec schrijft umlauts als 7-bit escape: ESC N (single shift naar de G2 set)
+plus een teken uit ISO 6937, gevolgd door de letter waar het accent op hoort
+(ESC N H u = ü). De tabel in slk_tables.ESCAPE_REPLACEMENTS is met de hand
+opgesteld; dit script telt elke sequence met de letter erna over alle bestanden,
+toont voorbeelden, markeert wat de decoder niet kent en stelt een tabel voor.
+
+De bestanden worden parallel gescand (één proces per CPU), op de ruwe bytes met
+één gecompileerde regex; bestanden zonder ESC byte kosten alleen een `in`.
+
+Usage: python slk_escapes.py ["reha bonn exports/*.slk" ...] [--workers N] [--examples 3]
+
+Exit code 2 als er sequences zijn die de decoder niet kent.
+"""
+
+import argparse
+import multiprocessing
+import os
+import re
+import sys
+import unicodedata
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from slk_inspect import expand_paths
+from slk_tables import ESCAPE_REPLACEMENTS
+
+# ESC + twee tekens (bv. 'NH') + het teken erna, als dat printbaar ASCII is
+ESCAPE_SCAN_RE = re.compile(rb'\x1b([A-Z][\x21-\x7e])([\x20-\x7e]?)')
+
+DEFAULT_PATTERNS = ['**/*.slk']
+
+# ISO 6937 G2: non-spacing accenten (0xC1..0xCF) als Unicode combining tekens
+ISO6937_ACCENTS = {
+    0xC1: '\u0300', 0xC2: '\u0301', 0xC3: '\u0302', 0xC4: '\u0303', 0xC5: '\u0304',
+    0xC6: '\u0306', 0xC7: '\u0307', 0xC8: '\u0308', 0xCA: '\u030a', 0xCB: '\u0327',
+    0xCD: '\u030b', 0xCE: '\u0328', 0xCF: '\u030c',
+}
+# ISO 6937 G2: losse tekens die in namen en adressen voorkomen
+ISO6937_LETTERS = {
+    0xE1: 'Æ', 0xE2: 'Đ', 0xE8: 'Ł', 0xE9: 'Ø', 0xEA: 'Œ', 0xEC: 'Þ',
+    0xF1: 'æ', 0xF2: 'đ', 0xF3: 'ð', 0xF5: 'ı', 0xF8: 'ł', 0xF9: 'ø', 0xFA: 'œ',
+    0xFB: 'ß', 0xFC: 'þ',
+}
+
+# Status per sequence
+HANDLED = 'ok'
+DIFFERENT = 'afwijkend'       # de decoder kent hem, maar ISO 6937 zegt iets anders
+UNHANDLED = 'niet afgehandeld'
+
+
+class FileScan(NamedTuple):
+    counts: Counter                                     # (sequence, volgend teken) -> aantal
+    examples: Dict[Tuple[str, str], List[str]]          # (sequence, volgend teken) -> voorbeelden
+
+
+def _context(raw_content: bytes, offset: int, width: int = 30) -> str:
+    """De regel rond de treffer, met ESC zichtbaar als \\x1b."""
+    line_start = raw_content.rfind(b'\n', 0, offset) + 1
+    line_end = raw_content.find(b'\n', offset)
+    line_end = len(raw_content) if line_end == -1 else line_end
+    around = raw_content[max(line_start, offset - width):min(line_end, offset + width)]
+    return around.decode('latin-1').encode('unicode_escape').decode('ascii')
+
+
+def scan_file(path: str, max_examples: int = 3) -> FileScan:
+    """Tel de escape sequences in één bestand (draait in een worker proces)."""
+    with open(path, 'rb') as file:
+        raw_content = file.read()
+    counts = Counter()
+    examples: Dict[Tuple[str, str], List[str]] = {}
+    if b'\x1b' not in raw_content:
+        return FileScan(counts, examples)
+    for match in ESCAPE_SCAN_RE.finditer(raw_content):
+        key = ('\x1b' + match.group(1).decode('ascii'), match.group(2).decode('ascii'))
+        counts[key] += 1
+        shown = examples.setdefault(key, [])
+        if len(shown) < max_examples:
+            shown.append(f"{os.path.basename(path)}@{match.start()}: {_context(raw_content, match.start())}")
+    return FileScan(counts, examples)
+
+
+def propose(sequence: str, following: str) -> Optional[str]:
+    """Vervanging volgens ISO 6937 voor ESC N + teken + volgend teken, of None als onbekend."""
+    if len(sequence) != 3 or sequence[1] != 'N':
+        return None
+    code = ord(sequence[2]) + 0x80
+    if code in ISO6937_ACCENTS and following.isalpha():
+        return unicodedata.normalize('NFC', following + ISO6937_ACCENTS[code])
+    if code in ISO6937_LETTERS:
+        return ISO6937_LETTERS[code] + following
+    return None
+
+
+class Finding(NamedTuple):
+    key: str                    # sequence + volgend teken, zoals in ESCAPE_REPLACEMENTS
+    count: int
+    files: int
+    current: Optional[str]      # wat de decoder er nu van maakt (None: niets, STRAY_ESCAPE_RE gooit hem weg)
+    proposed: Optional[str]
+    status: str
+    examples: List[str]
+
+
+def analyze(paths: Sequence[str], workers: Optional[int] = None, max_examples: int = 3) -> List[Finding]:
+    """Scan alle bestanden parallel en vat samen, meest voorkomende sequence eerst."""
+    counts = Counter()
+    files = Counter()
+    examples: Dict[Tuple[str, str], List[str]] = {}
+    # spawn: hetzelfde gedrag op Windows en Linux (zie ook slk_worker)
+    context = multiprocessing.get_context('spawn')
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        for scan in executor.map(scan_file, paths, [max_examples] * len(paths), chunksize=chunksize):
+            counts.update(scan.counts)
+            files.update(scan.counts.keys())
+            for key, shown in scan.examples.items():
+                kept = examples.setdefault(key, [])
+                kept.extend(shown[:max_examples - len(kept)])
+
+    findings = []
+    for (sequence, following), count in counts.most_common():
+        key = sequence + following
+        current = ESCAPE_REPLACEMENTS.get(key)
+        proposed = propose(sequence, following)
+        if current is None:
+            status = UNHANDLED
+        elif proposed is not None and proposed != current:
+            status = DIFFERENT
+        else:
+            status = HANDLED
+        findings.append(Finding(key, count, files[(sequence, following)], current, proposed, status,
+                                examples[(sequence, following)]))
+    return findings
+
+
+def proposed_table(findings: Sequence[Finding]) -> Dict[str, str]:
+    """Huidige tabel aangevuld met de voorstellen voor wat de decoder nog niet kent."""
+    table = dict(ESCAPE_REPLACEMENTS)
+    for finding in findings:
+        if finding.current is None and finding.proposed is not None:
+            table[finding.key] = finding.proposed
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Escape sequences in SLK exports tellen en een decoder tabel voorstellen')
+    parser.add_argument('paths', nargs='*', default=DEFAULT_PATTERNS,
+                        help='SLK bestanden of globs (standaard: alle .slk bestanden onder de huidige map)')
+    parser.add_argument('--workers', type=int, default=None, help='aantal processen (standaard: aantal CPU\'s)')
+    parser.add_argument('--examples', type=int, default=3, help='voorbeelden per sequence (standaard 3)')
+    args = parser.parse_args()
+
+    paths = expand_paths(args.paths)
+    if not paths:
+        sys.exit(1)
+    findings = analyze(paths, args.workers, args.examples)
+    print(f"🔎 {len(paths)} bestand(en), {sum(f.count for f in findings)} escape sequences, "
+          f"{len(findings)} verschillend")
+    for finding in findings:
+        current = repr(finding.current) if finding.current is not None else '-'
+        proposed = repr(finding.proposed) if finding.proposed is not None else '?'
+        mark = '✅' if finding.status == HANDLED else '⚠️'
+        print(f"{mark} {finding.key!r:<12} {finding.count:>7}x in {finding.files:>4} bestand(en)  "
+              f"nu {current:<6} ISO 6937 {proposed:<6} {finding.status}")
+        for example in finding.examples:
+            print(f"      {example}")
+
+    print("\n# Voorgestelde ESCAPE_REPLACEMENTS (slk_tables.py)")
+    print("ESCAPE_REPLACEMENTS = {")
+    for key, value in proposed_table(findings).items():
+        print(f"    {key!r}: {value!r},")
+    print("}")
+    if any(finding.status == UNHANDLED for finding in findings):
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+Exporters voor de geconverteerde tabel.
+
+Elk formaat is een `Exporter` die batches rijen ontvangt; ze worden hier
+geregistreerd onder hun naam ('csv', 'xlsx', 'jsonl', 'parquet'). `export_rows`
+loopt één keer over de rijen en voedt alle gevraagde exporters tegelijk, zodat
+meerdere formaten in één pass geschreven worden. Een nieuw formaat is een nieuwe
+subklasse met `@register_exporter`; de pipeline hoeft er niet voor te veranderen.
+Een subklasse zonder `write_rows` wordt al bij het registreren geweigerd.
+
+Zware of optionele libraries (openpyxl, pyarrow) worden pas geïmporteerd als
+het formaat echt gevraagd wordt.
+"""
+
+import csv
+import importlib.util
+import inspect
+import io
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Type
+
+import pandas as pd
+
+# Aantal rijen per batch in de iterator
+ROW_BATCH = 5000
+
+
+class Exporter(ABC):
+    """Basis: `write_rows` krijgt batches tuples in kolomvolgorde, `close` rondt het bestand af."""
+
+    name = ''
+    extension = ''
+    mime = 'application/octet-stream'
+    requires: Optional[str] = None     # optionele module die voor dit formaat nodig is
+
+    def __init__(self, target: BinaryIO, columns: Sequence[str], header: bool = False):
+        self.target = target
+        self.columns = list(columns)
+        self.header = header
+
+    @abstractmethod
+    def write_rows(self, rows: List[tuple]):
+        ...
+
+    def close(self):
+        pass
+
+
+EXPORTERS: Dict[str, Type[Exporter]] = {}
+
+
+def register_exporter(cls: Type[Exporter]) -> Type[Exporter]:
+    """Decorator: maak een exporter beschikbaar onder `cls.name`."""
+    if inspect.isabstract(cls):
+        raise TypeError(f"Exporter {cls.__name__} mist {', '.join(sorted(cls.__abstractmethods__))}")
+    EXPORTERS[cls.name] = cls
+    return cls
+
+
+@register_exporter
+class CsvExporter(Exporter):
+    """CSV zoals Routemeister hem inleest: puntkomma's, alles gequote, Windows regeleinden."""
+
+    name = 'csv'
+    extension = '.csv'
+    mime = 'text/csv'
+
+    def __init__(self, target, columns, header=False):
+        super().__init__(target, columns, header)
+        self.text = io.TextIOWrapper(target, encoding='utf-8', newline='')
+        self.writer = csv.writer(self.text, delimiter=';', quoting=csv.QUOTE_ALL, lineterminator='\r\n')
+        if header:
+            self.writer.writerow(self.columns)
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.text.flush()
+        # Het doel blijft open; de aanroeper sluit het
+        self.text.detach()
+
+
+@register_exporter
+class XlsxExporter(Exporter):
+    """Excel werkblad 'Data', standaard zonder headers."""
+
+    name = 'xlsx'
+    extension = '.xlsx'
+    mime = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    requires = 'openpyxl'
+
+    def __init__(self, target, columns, header=False):
+        super().__init__(target, columns, header)
+        from openpyxl import Workbook
+
+        # write_only schrijft rij voor rij weg in plaats van alle cellen in geheugen te houden
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet('Data')
+        if header:
+            self.sheet.append(self.columns)
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.sheet.append(row)
+
+    def close(self):
+        self.workbook.save(self.target)
+
+
+@register_exporter
+class JsonLinesExporter(Exporter):
+    """Eén JSON object per rij, met de kolomnamen als sleutels."""
+
+    name = 'jsonl'
+    extension = '.jsonl'
+    mime = 'application/x-ndjson'
+
+    def write_rows(self, rows):
+        lines = [json.dumps(dict(zip(self.columns, row)), ensure_ascii=False) + '\n' for row in rows]
+        self.target.write(''.join(lines).encode('utf-8'))
+
+
+@register_exporter
+class ParquetExporter(Exporter):
+    """Parquet met alle kolommen als tekst; elke batch wordt een row group."""
+
+    name = 'parquet'
+    extension = '.parquet'
+    requires = 'pyarrow'
+
+    def __init__(self, target, columns, header=False):
+        super().__init__(target, columns, header)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.schema = pa.schema([(str(col), pa.string()) for col in self.columns])
+        self.writer = pq.ParquetWriter(target, self.schema)
+
+    def write_rows(self, rows):
+        columns = [[None if value is None else str(value) for value in values] for values in zip(*rows)]
+        if not columns:
+            columns = [[] for _ in self.columns]
+        self.writer.write_table(self.pa.Table.from_arrays(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def available_formats() -> List[str]:
+    """Formaten waarvan de (optionele) library geïnstalleerd is."""
+    return [name for name, cls in EXPORTERS.items()
+            if cls.requires is None or importlib.util.find_spec(cls.requires) is not None]
+
+
+def format_for_path(path: str) -> str:
+    """Formaat op basis van de extensie van een bestandsnaam."""
+    extension = os.path.splitext(path)[1].lower()
+    for name, cls in EXPORTERS.items():
+        if cls.extension == extension:
+            return name
+    raise ValueError(f"Onbekend export formaat: {path} (kies uit {', '.join(EXPORTERS)})")
+
+
+def iter_row_batches(df: pd.DataFrame, batch_size: int = ROW_BATCH) -> Iterator[List[tuple]]:
+    """De rijen van een tabel in batches tuples; ontbrekende waarden worden None."""
+    for start in range(0, len(df), batch_size):
+        values = df.iloc[start:start + batch_size].to_numpy(dtype=object)
+        values[pd.isna(values)] = None
+        yield [tuple(row) for row in values.tolist()]
+
+
+def export_rows(batches: Iterable[List[tuple]], columns: Sequence[str],
+                targets: Dict[str, BinaryIO], header: bool = False):
+    """Schrijf alle formaten in `targets` ({formaat: binair bestand}) in één pass over de rijen."""
+    exporters = [EXPORTERS[name](target, columns, header) for name, target in targets.items()]
+    for rows in batches:
+        for exporter in exporters:
+            exporter.write_rows(rows)
+    for exporter in exporters:
+        exporter.close()
+
+
+def export_frame(df: pd.DataFrame, targets: Dict[str, BinaryIO], header: bool = False):
+    export_rows(iter_row_batches(df), df.columns, targets, header)
+
+
+def export_bytes(df: pd.DataFrame, name: str, header: bool = False) -> bytes:
+    """Eén formaat in geheugen, bv. voor een downloadknop."""
+    buffer = io.BytesIO()
+    export_frame(df, {name: buffer}, header)
+    return buffer.getvalue()
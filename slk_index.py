@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Byte offset index voor SLK bestanden.
+
+Per (Y, X) cel staat in de index waar het C;K record in het bestand begint en
+hoe lang het is. Eén cel of één patiëntrij ophalen is daarna een seek en een
+korte read, zonder het hele bestand te decoderen of te tokenizen. Dat is handig
+om in een grote export één patiënt te bekijken, en om alleen een paar rijen
+opnieuw te verwerken.
+
+De index wordt op inhoud (sha1) gecached in INDEX_DIR; een gewijzigd bestand
+krijgt dus vanzelf een nieuwe index.
+
+Usage: python slk_index.py bestand.slk --row 5 [--col 4] [--raw] [--rebuild]
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from slk_pipeline import decode_cell, decode_slk
+from slk_tables import ALL_COLUMNS, CK_NUMERIC_RE, CK_QUOTED_RE, COLUMN_MAPPING
+
+INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.slk_index')
+
+POSITION_BYTES_RE = re.compile(rb'Y(\d+);X(\d+)')
+
+# Witruimte die str.strip() in de tokenizer van een regel haalt
+STRIP_BYTES = np.array([0x20, 0x09, 0x0d, 0x0b, 0x0c], dtype=np.uint8)
+
+# (Y, X) wordt één int64 sleutel, zodat een hele rij een aaneengesloten blok is
+COL_BITS = 16
+
+
+def _key(row: int, col: int) -> int:
+    return (row << COL_BITS) | col
+
+
+class SlkIndex:
+    """Gesorteerde sleutels met de offset en lengte van elk C;K record."""
+
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray, lengths: np.ndarray,
+                 encoding: str, digest: str):
+        self.keys = keys
+        self.offsets = offsets
+        self.lengths = lengths
+        self.encoding = encoding
+        self.digest = digest
+
+    def __len__(self):
+        return len(self.keys)
+
+    def locate(self, row: int, col: int) -> Optional[Tuple[int, int]]:
+        """(offset, lengte) van de cel, of None als er geen record is."""
+        key = _key(row, col)
+        pos = int(np.searchsorted(self.keys, key))
+        if pos < len(self.keys) and self.keys[pos] == key:
+            return int(self.offsets[pos]), int(self.lengths[pos])
+        return None
+
+    def row_cells(self, row: int) -> List[Tuple[int, int, int]]:
+        """(X, offset, lengte) voor alle cellen van rij Y."""
+        first, last = np.searchsorted(self.keys, [_key(row, 0), _key(row + 1, 0)])
+        mask = (1 << COL_BITS) - 1
+        return [(int(self.keys[i]) & mask, int(self.offsets[i]), int(self.lengths[i]))
+                for i in range(first, last)]
+
+    def rows(self) -> np.ndarray:
+        """Alle Y waarden met minstens één cel."""
+        return np.unique(self.keys >> COL_BITS)
+
+    def save(self, path: str):
+        np.savez(path, keys=self.keys, offsets=self.offsets, lengths=self.lengths,
+                 encoding=np.array(self.encoding), digest=np.array(self.digest))
+
+    @classmethod
+    def load(cls, path: str) -> 'SlkIndex':
+        with np.load(path) as data:
+            return cls(data['keys'], data['offsets'], data['lengths'],
+                       str(data['encoding']), str(data['digest']))
+
+
+def build_index(raw_content: bytes) -> SlkIndex:
+    """
+    Scan de bytes één keer, met dezelfde regels als de tokenizer: een regel met Y;X
+    is een positie, een regel die (na witruimte) met C;K begint is een cel op de
+    laatste positie. Bij dubbele cellen wint het laatste record, net als in de parser.
+    """
+    data = np.frombuffer(raw_content, dtype=np.uint8)
+    newlines = np.flatnonzero(data == 0x0a)
+    first = np.concatenate(([0], newlines + 1))
+    last = np.concatenate((newlines, [len(data)]))
+    # Witruimte aan begin en eind van elke regel overslaan (meestal alleen de \r)
+    while True:
+        lead = first < last
+        lead[lead] = np.isin(data[first[lead]], STRIP_BYTES)
+        if not lead.any():
+            break
+        first[lead] += 1
+    while True:
+        trail = last > first
+        trail[trail] = np.isin(data[last[trail] - 1], STRIP_BYTES)
+        if not trail.any():
+            break
+        last[trail] -= 1
+
+    is_cell = last - first >= 3
+    for shift, char in enumerate(b'C;K'):
+        is_cell[is_cell] = data[first[is_cell] + shift] == char
+
+    # Posities; per regel telt de eerste (re.search in de tokenizer)
+    found = [(match.start(), int(match.group(1)), int(match.group(2)))
+             for match in POSITION_BYTES_RE.finditer(raw_content)]
+    positions = np.array(found, dtype=np.int64).reshape(-1, 3)
+    position_lines, first_match = np.unique(np.searchsorted(newlines, positions[:, 0]), return_index=True)
+    position_keys = (positions[first_match, 1] << COL_BITS) | positions[first_match, 2]
+    is_cell[position_lines] = False
+
+    cell_lines = np.flatnonzero(is_cell)
+    previous = np.searchsorted(position_lines, cell_lines) - 1
+    cell_lines, previous = cell_lines[previous >= 0], previous[previous >= 0]
+    keys = position_keys[previous]
+    # Laatste record per sleutel: np.unique op de omgekeerde volgorde geeft de eerste daarvan
+    keys, last_record = np.unique(keys[::-1], return_index=True)
+    cell_lines = cell_lines[::-1][last_record]
+    offsets = first[cell_lines].astype(np.int64)
+    lengths = (last[cell_lines] - first[cell_lines]).astype(np.int64)
+    _, encoding = decode_slk(raw_content)
+    return SlkIndex(keys.astype(np.int64), offsets, lengths, encoding,
+                    hashlib.sha1(raw_content).hexdigest())
+
+
+def load_index(path: str, cache_dir: str = INDEX_DIR, rebuild: bool = False) -> SlkIndex:
+    """Index uit de cache (op sha1 van de inhoud), of opbouwen en bewaren."""
+    with open(path, 'rb') as file:
+        raw_content = file.read()
+    digest = hashlib.sha1(raw_content).hexdigest()
+    cache_path = os.path.join(cache_dir, f"{digest}.npz")
+    if not rebuild and os.path.exists(cache_path):
+        return SlkIndex.load(cache_path)
+    index = build_index(raw_content)
+    os.makedirs(cache_dir, exist_ok=True)
+    index.save(cache_path)
+    return index
+
+
+def cell_value(record: str) -> Optional[str]:
+    """De waarde uit een C;K record, zoals de tokenizer hem leest (None als onleesbaar)."""
+    match = CK_QUOTED_RE.search(record) or CK_NUMERIC_RE.search(record)
+    return match.group(1) if match else None
+
+
+class SlkReader:
+    """Losse cellen en rijen uit een SLK bestand lezen via de index."""
+
+    def __init__(self, path: str, index: Optional[SlkIndex] = None):
+        self.path = path
+        self.index = index if index is not None else load_index(path)
+        self.file = open(path, 'rb')
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read(self, offset: int, length: int) -> str:
+        self.file.seek(offset)
+        return self.file.read(length).decode(self.index.encoding, errors='replace')
+
+    def record(self, row: int, col: int) -> Optional[str]:
+        """Het ruwe C;K record van een cel."""
+        located = self.index.locate(row, col)
+        return self._read(*located) if located is not None else None
+
+    def cell(self, row: int, col: int) -> Optional[str]:
+        """De gedecodeerde waarde van een cel (escapes vervangen, zoals in de parser)."""
+        record = self.record(row, col)
+        if record is None:
+            return None
+        value = cell_value(record)
+        return decode_cell(value) if value is not None else None
+
+    def row(self, row: int) -> Dict[str, str]:
+        """Eén patiëntrij als {veldnaam: waarde}; alleen de kolommen X2..X14."""
+        patient = {}
+        for col, offset, length in self.index.row_cells(row):
+            if col not in COLUMN_MAPPING:
+                continue
+            value = cell_value(self._read(offset, length))
+            if value is not None:
+                patient[COLUMN_MAPPING[col]] = decode_cell(value)
+        return patient
+
+    def patients(self, rows) -> pd.DataFrame:
+        """Een paar rijen als tabel met dezelfde kolommen als parse_slk_patients, voor gedeeltelijk herverwerken."""
+        df = pd.DataFrame([self.row(row) for row in rows], index=list(rows))
+        return df.reindex(columns=ALL_COLUMNS, fill_value='')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cellen en rijen uit een SLK bestand via een byte offset index')
+    parser.add_argument('input_file', help='SLK bestand')
+    parser.add_argument('--row', type=int, help='rij (Y); zonder --row alleen de index samenvatting')
+    parser.add_argument('--col', type=int, help='kolom (X)')
+    parser.add_argument('--raw', action='store_true', help='ook het ruwe record en de byte offset tonen')
+    parser.add_argument('--rebuild', action='store_true', help='index opnieuw opbouwen')
+    args = parser.parse_args()
+    if not os.path.exists(args.input_file):
+        print(f"❌ Fout: Bestand '{args.input_file}' bestaat niet!")
+        sys.exit(1)
+
+    index = load_index(args.input_file, rebuild=args.rebuild)
+    if args.row is None:
+        rows = index.rows()
+        print(f"{len(index)} cellen in {len(rows)} rijen (Y {rows.min() if len(rows) else '-'}.."
+              f"{rows.max() if len(rows) else '-'}), encoding {index.encoding}, sha1 {index.digest}")
+        return
+
+    with SlkReader(args.input_file, index) as reader:
+        if args.col is not None:
+            cells = [(args.col,) + located for located in [index.locate(args.row, args.col)] if located]
+        else:
+            cells = index.row_cells(args.row)
+        if not cells:
+            print(f"Geen cellen op Y{args.row}" + (f";X{args.col}" if args.col is not None else ''))
+            sys.exit(1)
+        for col, offset, length in cells:
+            record = reader._read(offset, length)
+            value = cell_value(record)
+            shown = decode_cell(value) if value is not None else '<onleesbaar>'
+            name = COLUMN_MAPPING.get(col, '')
+            line = f"Y{args.row};X{col:<3} {name:<15} {shown}"
+            if args.raw:
+                line += f"    @{offset} ({length} bytes) {record!r}"
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+SLK inspector: snel in een of meer exports kijken zonder het hele bestand te parsen.
+
+Niet-ASCII bytes en escape sequences worden met numpy over de ruwe bytes gezocht;
+alleen de getoonde treffers krijgen daarna hun regel, Y/X en context. De output
+is begrensd (--limit per bestand) en wordt regel voor regel geschreven.
+
+Usage:
+    python slk_inspect.py "reha bonn exports/*.slk"                # samenvatting per bestand
+    python slk_inspect.py bestand.slk --non-ascii --escapes        # treffers met context
+    python slk_inspect.py bestand.slk --row 5                      # cellen van één rij
+    python slk_inspect.py bestand.slk --col 4 --col 5 --escapes    # escapes in de namen
+    python slk_inspect.py geconverteerd/x.csv --explain 17 --column ort   # herkomst van een output cel
+
+--explain werkt op een output van batch_convert.py --provenance: de ruwe SLK
+records van die rij worden met een seek uit de bron gelezen, zonder te parsen.
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from slk_index import COL_BITS, SlkIndex, cell_value, load_index
+from slk_pipeline import OUTPUT_SOURCES, decode_cell, decode_slk
+from slk_provenance import PROVENANCE_SUFFIX, Provenance, describe, printable, provenance_path
+from slk_sources import read_origin, ref_source
+from slk_tables import ALL_COLUMNS, COLUMN_MAPPING, ESCAPE_REPLACEMENTS
+
+POSITION_BYTES_RE = re.compile(rb'Y(\d+);X(\d+)')
+ESCAPE_BYTES_RE = re.compile(rb'\x1b[A-Z]{2,}[a-z{]?')
+CELL_START_RE = re.compile(rb'[ \t\r\x0b\x0c]*C;K')
+
+# Zo ver terug zoeken we naar de positie van een treffer (een C;K volgt direct op zijn F;Y;X)
+MAX_LOOKBACK_LINES = 50
+
+NON_ASCII = 'niet-ASCII'
+ESCAPE = 'escape'
+
+
+class Hit(NamedTuple):
+    kind: str
+    offset: int             # byte offset in het bestand
+    line: int               # regelnummer (vanaf 1)
+    row: Optional[int]      # Y van de cel, None buiten een C;K record
+    col: Optional[int]
+    raw: bytes              # de gevonden bytes
+
+
+def expand_paths(patterns: Sequence[str]) -> List[str]:
+    """Bestanden en globs (ook op Windows, waar de shell niet expandeert)."""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        if not matches or not all(os.path.isfile(path) for path in matches):
+            print(f"⚠️ Geen bestand: {pattern}", file=sys.stderr)
+        paths.extend(path for path in matches if os.path.isfile(path))
+    return list(dict.fromkeys(paths))
+
+
+def scan_bytes(raw_content: bytes) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Offsets van niet-ASCII reeksen, ESC bytes en regeleinden, in één keer met numpy."""
+    data = np.frombuffer(raw_content, dtype=np.uint8)
+    high = data > 127
+    # Alleen het begin van een reeks (één UTF-8 teken is 2-4 bytes)
+    run_start = high.copy()
+    run_start[1:] &= ~high[:-1]
+    return np.flatnonzero(run_start), np.flatnonzero(data == 0x1b), np.flatnonzero(data == 0x0a)
+
+
+def _position(raw_content: bytes, offset: int) -> Tuple[Optional[int], Optional[int]]:
+    """Y/X van de cel waar de offset in valt, zoals de tokenizer hem zou toewijzen."""
+    line_start = raw_content.rfind(b'\n', 0, offset) + 1
+    line_end = raw_content.find(b'\n', offset)
+    line = raw_content[line_start:line_end if line_end != -1 else len(raw_content)]
+    if POSITION_BYTES_RE.search(line) or not CELL_START_RE.match(line):
+        return None, None
+    end = line_start - 1
+    for _ in range(MAX_LOOKBACK_LINES):
+        if end <= 0:
+            break
+        start = raw_content.rfind(b'\n', 0, end) + 1
+        match = POSITION_BYTES_RE.search(raw_content, start, end)
+        if match:
+            return int(match.group(1)), int(match.group(2))
+        end = start - 1
+    return None, None
+
+
+def _selected_cells(index: SlkIndex, rows, cols) -> np.ndarray:
+    """Posities in de index van de cellen die bij --row/--col passen."""
+    keep = np.ones(len(index), dtype=bool)
+    if rows:
+        keep &= np.isin(index.keys >> COL_BITS, rows)
+    if cols:
+        keep &= np.isin(index.keys & ((1 << COL_BITS) - 1), cols)
+    return np.flatnonzero(keep)
+
+
+def _in_cells(offsets: np.ndarray, index: SlkIndex, cells: np.ndarray) -> np.ndarray:
+    """Alleen de offsets die binnen een van de gegeven C;K records vallen."""
+    order = np.argsort(index.offsets[cells], kind='stable')
+    starts = index.offsets[cells][order]
+    ends = starts + index.lengths[cells][order]
+    pos = np.searchsorted(starts, offsets, side='right') - 1
+    inside = pos >= 0
+    inside[inside] &= offsets[inside] < ends[pos[inside]]
+    return offsets[inside]
+
+
+def find_hit(raw_content: bytes, kind: str, offset: int, newlines: np.ndarray) -> Hit:
+    """De details van één treffer; alleen voor de treffers die getoond worden."""
+    if kind == ESCAPE:
+        match = ESCAPE_BYTES_RE.match(raw_content, offset)
+        end = match.end() if match else offset + 1
+    else:
+        end = offset
+        while end < len(raw_content) and raw_content[end] > 127:
+            end += 1
+    line = int(np.searchsorted(newlines, offset)) + 1
+    row, col = _position(raw_content, offset)
+    return Hit(kind, offset, line, row, col, raw_content[offset:end])
+
+
+def format_hit(hit: Hit, raw_content: bytes, encoding: str, context: int) -> str:
+    where = f"Y{hit.row};X{hit.col}" if hit.row is not None else 'geen cel'
+    if hit.kind == ESCAPE:
+        sequence = hit.raw.decode('ascii', errors='replace')
+        meaning = ESCAPE_REPLACEMENTS.get(sequence)
+        shown = f"{sequence!r} -> {meaning!r}" if meaning else f"{sequence!r} (onbekend)"
+    else:
+        shown = f"{hit.raw.hex(' ')} = {hit.raw.decode(encoding, errors='replace')!r}"
+    # Context binnen de eigen regel
+    line_start = raw_content.rfind(b'\n', 0, hit.offset) + 1
+    line_end = raw_content.find(b'\n', hit.offset)
+    line_end = len(raw_content) if line_end == -1 else line_end
+    around = raw_content[max(line_start, hit.offset - context):min(line_end, hit.offset + len(hit.raw) + context)]
+    return f"  regel {hit.line:<6} @{hit.offset:<9} {where:<10} {hit.kind:<10} {shown}  {around!r}"
+
+
+def inspect_file(path: str, rows: Sequence[int] = (), cols: Sequence[int] = (),
+                 non_ascii: bool = False, escapes: bool = False, limit: int = 20,
+                 context: int = 20, out=None):
+    """Samenvatting van één bestand plus (begrensd) de gevraagde treffers of cellen."""
+    out = out or sys.stdout
+    with open(path, 'rb') as file:
+        raw_content = file.read()
+    high, esc, newlines = scan_bytes(raw_content)
+    encoding = decode_slk(raw_content)[1] if len(high) else 'ascii'
+    print(f"📄 {path}: {len(raw_content)} bytes, {len(newlines) + 1} regels, encoding {encoding}, "
+          f"{len(high)} niet-ASCII, {len(esc)} escapes", file=out)
+
+    index = load_index(path) if rows or cols else None
+    if index is not None:
+        cells = _selected_cells(index, rows, cols)
+        high, esc = _in_cells(high, index, cells), _in_cells(esc, index, cells)
+
+    if non_ascii or escapes:
+        selected = [(NON_ASCII, high)] * non_ascii + [(ESCAPE, esc)] * escapes
+        offsets = np.concatenate([found for _, found in selected])
+        kinds = np.concatenate([np.full(len(found), kind, dtype=object) for kind, found in selected])
+        order = np.argsort(offsets, kind='stable')[:limit]
+        for offset, kind in zip(offsets[order].tolist(), kinds[order]):
+            hit = find_hit(raw_content, kind, offset, newlines)
+            print(format_hit(hit, raw_content, encoding, context), file=out)
+        _print_rest(len(offsets) - len(order), out)
+    elif index is not None:
+        _print_cells(raw_content, index, cells, encoding, limit, out)
+
+
+def _print_cells(raw_content: bytes, index: SlkIndex, cells: np.ndarray, encoding: str, limit: int, out):
+    mask = (1 << COL_BITS) - 1
+    for i in cells[:limit].tolist():
+        row, col = int(index.keys[i]) >> COL_BITS, int(index.keys[i]) & mask
+        offset, length = int(index.offsets[i]), int(index.lengths[i])
+        record = raw_content[offset:offset + length].decode(encoding, errors='replace')
+        value = cell_value(record)
+        shown = decode_cell(value) if value is not None else '<onleesbaar>'
+        print(f"  Y{row};X{col:<3} {COLUMN_MAPPING.get(col, ''):<15} {shown!r:<30} @{offset} {record!r}", file=out)
+    _print_rest(len(cells) - limit, out)
+
+
+def _print_rest(remaining: int, out):
+    if remaining > 0:
+        print(f"  ... en nog {remaining} (zie --limit)", file=out)
+
+
+def explain_row(output: str, row: int, columns: Sequence[str] = (), out=None) -> bool:
+    """
+    De ruwe SLK records achter rij `row` (vanaf 0, zoals 'rij' in de validatie) van
+    een output; `columns` zijn output of SLK kolommen, standaard alle SLK kolommen.
+    """
+    out = out or sys.stdout
+    path = output if output.endswith(PROVENANCE_SUFFIX) else provenance_path(output)
+    if not os.path.exists(path):
+        print(f"❌ Geen herkomst bij {output} (converteer met batch_convert.py --provenance)", file=out)
+        return False
+    provenance = Provenance.load(path)
+    if not 0 <= row < len(provenance):
+        print(f"❌ {output} heeft {len(provenance)} rijen", file=out)
+        return False
+    print(f"📄 {output}, rij {row}", file=out)
+    for column in columns or ALL_COLUMNS:
+        field = OUTPUT_SOURCES.get(column, column)
+        origin = provenance.locate(row, field)
+        if origin is None:
+            print(f"  {column:<15} geen record", file=out)
+            continue
+        record = read_origin(ref_source(origin.source), origin)
+        print(f"  {column:<15} {describe(origin)}\n  {'':<15} {printable(record)}", file=out)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SLK bestanden inspecteren (niet-ASCII, escapes, cellen)')
+    parser.add_argument('paths', nargs='+',
+                        help='SLK bestanden of globs, bv. "reha bonn exports/*.slk"; outputs bij --explain')
+    parser.add_argument('--row', type=int, action='append', default=[], help='alleen rij Y (herhaalbaar)')
+    parser.add_argument('--col', type=int, action='append', default=[], help='alleen kolom X (herhaalbaar)')
+    parser.add_argument('--non-ascii', action='store_true', help='bytes boven 127 tonen')
+    parser.add_argument('--escapes', action='store_true', help='ESC sequences tonen met hun betekenis')
+    parser.add_argument('--limit', type=int, default=20, help='maximaal aantal regels per bestand (standaard 20)')
+    parser.add_argument('--context', type=int, default=20, help='bytes context rond een treffer (standaard 20)')
+    parser.add_argument('--explain', type=int, metavar='RIJ',
+                        help='herkomst van output rij RIJ (vanaf 0) van een batch_convert --provenance output')
+    parser.add_argument('--column', action='append', default=[],
+                        help='bij --explain: alleen deze output of SLK kolom (herhaalbaar)')
+    args = parser.parse_args()
+    unknown = [column for column in args.column if column not in OUTPUT_SOURCES and column not in ALL_COLUMNS]
+    if unknown:
+        parser.error(f"onbekende kolom: {', '.join(unknown)} (kies uit {', '.join(dict.fromkeys(list(OUTPUT_SOURCES) + ALL_COLUMNS))})")
+
+    paths = expand_paths(args.paths)
+    if not paths:
+        sys.exit(1)
+    try:
+        if args.explain is not None:
+            explained = [explain_row(path, args.explain, args.column) for path in paths]
+            sys.exit(0 if all(explained) else 1)
+        for path in paths:
+            inspect_file(path, args.row, args.col, args.non_ascii, args.escapes, args.limit, args.context)
+    except BrokenPipeError:
+        # Output naar head/less die eerder stopt
+        sys.stderr.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Lokale job queue voor conversies (SQLite in WAL modus).
+
+Batch conversies (batch_convert.py --queue) en de conversies van de app komen in
+één database: per job de bron, de opties, de status, het aantal pogingen en de
+tijden (ingediend, gestart, klaar). Door WAL kunnen de workers schrijven terwijl
+`python slk_jobs.py status` leest; zo is er één plek om te zien welke conversie
+traag is of mislukt.
+
+Batch jobs worden verwerkt door een pool worker processen (`run_workers`). Een
+worker claimt de oudste wachtende job in een IMMEDIATE transactie, dus twee
+workers (ook van verschillende runs) krijgen nooit dezelfde job. Een mislukte
+job gaat terug in de queue tot hij MAX_ATTEMPTS keer geprobeerd is.
+
+Zolang een job bezig is, werkt zijn worker elke HEARTBEAT_INTERVAL de heartbeat
+bij. Een job zonder heartbeat sinds HEARTBEAT_TIMEOUT hoort bij een gestopte
+worker en gaat bij de volgende claim terug in de queue; een lange conversie van
+een levende worker blijft van hem.
+
+Conversies van de app draaien in de ConversionPool van de app, want het
+resultaat moet in het geheugen terug naar de sessie; de queue houdt daarvan
+status en tijden bij. Een upload die na UPLOAD_TIMEOUT nog wacht, hoort bij een
+gestopte sessie en wordt afgebroken. Afgeronde jobs ouder dan KEEP_DAYS dagen
+worden opgeruimd, zodat het bestand niet blijft groeien.
+
+Usage:
+    python slk_jobs.py status                      # aantallen en de laatste jobs
+    python slk_jobs.py status --state mislukt      # alleen mislukte jobs, met de fout
+    python slk_jobs.py status --slowest 10         # de traagste conversies
+    python slk_jobs.py work --workers 4            # wachtende jobs verwerken (bv. na een crash)
+    python slk_jobs.py retry                       # mislukte jobs opnieuw in de queue
+    python slk_jobs.py prune                       # oude jobs opruimen
+"""
+
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from slk_sources import SlkSource
+
+JOBS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.slk_jobs.sqlite3')
+
+# Soorten jobs
+BATCH = 'batch'
+UPLOAD = 'upload'
+
+# Status van een job
+QUEUED = 'wachtend'
+RUNNING = 'bezig'
+DONE = 'klaar'
+FAILED = 'mislukt'
+CANCELLED = 'afgebroken'
+STATES = (QUEUED, RUNNING, DONE, FAILED, CANCELLED)
+
+# Zo vaak wordt een batch job geprobeerd voordat hij mislukt blijft
+MAX_ATTEMPTS = 3
+# Zo vaak (seconden) werkt een worker de heartbeat van zijn job bij
+HEARTBEAT_INTERVAL = 10
+# Zo lang (seconden) zonder heartbeat: de worker is gestopt
+HEARTBEAT_TIMEOUT = 60
+# Zo lang (seconden) mag een upload wachten; daarna is de sessie vermoedelijk weg
+UPLOAD_TIMEOUT = 3600
+# Zo lang (dagen) blijven afgeronde jobs in de queue
+KEEP_DAYS = 30
+# Zo vaak (seconden) ruimt submit de queue op
+PRUNE_INTERVAL = 300
+# Wachten op een lock van een ander proces (seconden)
+BUSY_TIMEOUT = 30
+# Interval waarmee run_workers de queue bekijkt (seconden)
+POLL_INTERVAL = 0.2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    source TEXT NOT NULL,
+    file TEXT NOT NULL,
+    compression TEXT NOT NULL,
+    member TEXT,
+    output TEXT NOT NULL DEFAULT '',
+    options TEXT NOT NULL DEFAULT '{}',
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    rows INTEGER,
+    error TEXT,
+    worker TEXT,
+    submitted REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    seconds REAL,
+    heartbeat REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id);
+"""
+
+
+class Job(NamedTuple):
+    """Eén rij uit de queue; tijden in seconden sinds epoch (time.time)."""
+
+    id: int
+    kind: str
+    source: str             # naam in meldingen (pad, met :lid voor een zip)
+    file: str
+    compression: str
+    member: Optional[str]
+    output: str
+    options: str            # JSON, de keyword argumenten van de conversie
+    state: str
+    attempts: int
+    max_attempts: int
+    rows: Optional[int]
+    error: Optional[str]
+    worker: Optional[str]
+    submitted: float
+    started: Optional[float]
+    finished: Optional[float]
+    seconds: Optional[float]
+    heartbeat: Optional[float]    # laatste teken van leven van de worker
+
+    @property
+    def wait(self) -> Optional[float]:
+        """Tijd in de queue voor de laatste poging begon."""
+        return self.started - self.submitted if self.started is not None else None
+
+    def slk_source(self) -> SlkSource:
+        return SlkSource(self.file, self.compression, self.member)
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """
+    De queue in één SQLite bestand. Elk proces opent zijn eigen JobQueue; binnen een
+    proces mogen threads er één delen (de Streamlit server).
+    """
+
+    def __init__(self, path: str = JOBS_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        # Met WAL is NORMAL veilig bij een crash van het proces; alleen stroomuitval kan de laatste commits kosten
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+        columns = [row[1] for row in self.db.execute('PRAGMA table_info(jobs)')]
+        if 'heartbeat' not in columns:
+            # Queue van voor de heartbeat
+            self.db.execute('ALTER TABLE jobs ADD COLUMN heartbeat REAL')
+        self.pruned = 0.0
+
+    def close(self):
+        self.db.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """IMMEDIATE: de schrijflock meteen, zodat lezen en bijwerken samen atomair zijn."""
+        with self.lock:
+            self.db.execute('BEGIN IMMEDIATE')
+            try:
+                yield self.db
+            except BaseException:
+                self.db.execute('ROLLBACK')
+                raise
+            self.db.execute('COMMIT')
+
+    def submit(self, source: SlkSource, output: str = '', options: Optional[dict] = None,
+               kind: str = BATCH, max_attempts: int = MAX_ATTEMPTS) -> int:
+        """Zet een bron in de queue; geeft het job id."""
+        # Absoluut: `slk_jobs.py work` kan vanuit een andere map draaien
+        file = os.path.abspath(source.file) if isinstance(source.file, str) else source.label_or_path
+        now = time.time()
+        with self.transaction() as db:
+            if now - self.pruned > PRUNE_INTERVAL:
+                self._prune(db, now)
+                self.pruned = now
+            cursor = db.execute(
+                "INSERT INTO jobs (kind, source, file, compression, member, output, options, state, "
+                "max_attempts, submitted) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (kind, source.name, file, source.compression, source.member, output,
+                 json.dumps(options or {}, sort_keys=True), QUEUED, max_attempts, now))
+            return cursor.lastrowid
+
+    def claim(self, worker: str) -> Optional[Job]:
+        """De oudste wachtende batch job voor `worker`, of None als de queue leeg is."""
+        now = time.time()
+        with self.transaction() as db:
+            self._recover_stale(db, now)
+            row = db.execute("SELECT id FROM jobs WHERE state = ? AND kind = ? ORDER BY id LIMIT 1",
+                             (QUEUED, BATCH)).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE jobs SET state = ?, attempts = attempts + 1, worker = ?, started = ?, heartbeat = ?, "
+                       "finished = NULL, seconds = NULL WHERE id = ?", (RUNNING, worker, now, now, row[0]))
+        return self.job(row[0])
+
+    def start(self, job_id: int, worker: str) -> bool:
+        """Een bepaalde job starten (de app); False als hij intussen is afgebroken."""
+        now = time.time()
+        with self.transaction() as db:
+            cursor = db.execute("UPDATE jobs SET state = ?, attempts = attempts + 1, worker = ?, started = ?, "
+                                "heartbeat = ? WHERE id = ? AND state = ?", (RUNNING, worker, now, now, job_id, QUEUED))
+            return cursor.rowcount == 1
+
+    @contextmanager
+    def heartbeat(self, job_id: int) -> Iterator[None]:
+        """Werk de heartbeat van een bezige job bij zolang het blok loopt (in een thread)."""
+        stopped = threading.Event()
+
+        def beat():
+            while not stopped.wait(HEARTBEAT_INTERVAL):
+                with self.transaction() as db:
+                    db.execute("UPDATE jobs SET heartbeat = ? WHERE id = ? AND state = ?",
+                               (time.time(), job_id, RUNNING))
+
+        thread = threading.Thread(target=beat, name=f'heartbeat-{job_id}', daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stopped.set()
+            thread.join()
+
+    def finish(self, job_id: int, rows: int):
+        now = time.time()
+        with self.transaction() as db:
+            db.execute("UPDATE jobs SET state = ?, rows = ?, error = NULL, finished = ?, seconds = ? - started "
+                       "WHERE id = ? AND state = ?", (DONE, rows, now, now, job_id, RUNNING))
+
+    def fail(self, job_id: int, error: str) -> bool:
+        """Een mislukte poging; True als de job opnieuw in de queue staat."""
+        now = time.time()
+        with self.transaction() as db:
+            db.execute("UPDATE jobs SET state = CASE WHEN attempts < max_attempts THEN ? ELSE ? END, "
+                       "error = ?, finished = ?, seconds = ? - started WHERE id = ? AND state = ?",
+                       (QUEUED, FAILED, error, now, now, job_id, RUNNING))
+            state = db.execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return state is not None and state[0] == QUEUED
+
+    def cancel(self, job_id: int):
+        """Afbreken, zolang de job nog niet klaar of mislukt is."""
+        with self.transaction() as db:
+            db.execute("UPDATE jobs SET state = ?, finished = ? WHERE id = ? AND state IN (?, ?)",
+                       (CANCELLED, time.time(), job_id, QUEUED, RUNNING))
+
+    def retry_failed(self) -> int:
+        """Alle mislukte batch jobs opnieuw in de queue, met nieuwe pogingen; geeft het aantal."""
+        with self.transaction() as db:
+            return db.execute("UPDATE jobs SET state = ?, attempts = 0 WHERE state = ? AND kind = ?",
+                              (QUEUED, FAILED, BATCH)).rowcount
+
+    def prune(self) -> int:
+        """Gestopte jobs afronden en afgeronde jobs ouder dan KEEP_DAYS verwijderen; geeft het aantal verwijderde."""
+        now = time.time()
+        with self.transaction() as db:
+            self.pruned = now
+            return self._prune(db, now)
+
+    def _prune(self, db: sqlite3.Connection, now: float) -> int:
+        self._recover_stale(db, now)
+        # Een upload start pas als de pool van de app hem oppakt; wacht hij nog, dan is de app gestopt
+        db.execute("UPDATE jobs SET state = ?, error = 'sessie gestopt voor de conversie', finished = ? "
+                   "WHERE state = ? AND kind = ? AND submitted < ?",
+                   (CANCELLED, now, QUEUED, UPLOAD, now - UPLOAD_TIMEOUT))
+        return db.execute("DELETE FROM jobs WHERE state IN (?, ?, ?) AND finished < ?",
+                          (DONE, FAILED, CANCELLED, now - KEEP_DAYS * 86400)).rowcount
+
+    def _recover_stale(self, db: sqlite3.Connection, now: float):
+        # Een gestopte worker laat zijn job op 'bezig' staan, zonder heartbeat
+        db.execute("UPDATE jobs SET state = CASE WHEN attempts < max_attempts THEN ? ELSE ? END, "
+                   "error = 'worker gestopt tijdens de conversie', finished = ?, seconds = ? - started "
+                   "WHERE state = ? AND COALESCE(heartbeat, started) < ?",
+                   (QUEUED, FAILED, now, now, RUNNING, now - HEARTBEAT_TIMEOUT))
+
+    def job(self, job_id: int) -> Optional[Job]:
+        with self.lock:
+            row = self.db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job._make(row) if row is not None else None
+
+    def jobs(self, state: Optional[str] = None, ids: Optional[Sequence[int]] = None,
+             limit: Optional[int] = None, slowest: bool = False) -> List[Job]:
+        """Jobs, de nieuwste eerst (of de traagste met `slowest`), eventueel alleen `state` of `ids`."""
+        query, params = "SELECT * FROM jobs WHERE 1", []
+        if state is not None:
+            query += " AND state = ?"
+            params.append(state)
+        if ids is not None:
+            query += f" AND id IN ({', '.join('?' * len(ids))})"
+            params.extend(ids)
+        query += " AND seconds IS NOT NULL ORDER BY seconds DESC" if slowest else " ORDER BY id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self.lock:
+            return [Job._make(row) for row in self.db.execute(query, params)]
+
+    def counts(self) -> Dict[str, int]:
+        """Aantal jobs per status."""
+        with self.lock:
+            rows = self.db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = dict.fromkeys(STATES, 0)
+        counts.update(rows)
+        return counts
+
+
+@functools.lru_cache(maxsize=None)
+def open_queue(path: str) -> JobQueue:
+    """Eén JobQueue per bestand per proces (workers van de app en van run_workers)."""
+    return JobQueue(path)
+
+
+def run_job(job: Job):
+    """Eén batch job uitvoeren; geeft het BatchResult van batch_convert."""
+    # Pas hier: batch_convert gebruikt deze module zelf voor --queue
+    from batch_convert import convert_one
+
+    return convert_one(job.slk_source(), **json.loads(job.options))
+
+
+def process_jobs(path: str) -> Iterator[int]:
+    """Claim en verwerk batch jobs tot de queue leeg is; geeft het id van elke verwerkte job."""
+    jobs = open_queue(path)
+    name = worker_name()
+    while True:
+        job = jobs.claim(name)
+        if job is None:
+            return
+        try:
+            with jobs.heartbeat(job.id):
+                result = run_job(job)
+            error = result.error
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        if error:
+            jobs.fail(job.id, error)
+        else:
+            jobs.finish(job.id, result.rows)
+        yield job.id
+
+
+def work(path: str):
+    """Een worker proces van run_workers."""
+    for _ in process_jobs(path):
+        pass
+
+
+def run_workers(path: str, workers: Optional[int] = None,
+                job_ids: Optional[Sequence[int]] = None) -> Iterator[Job]:
+    """
+    Verwerk de wachtende batch jobs met `workers` processen (standaard één per CPU).
+    Geeft de jobs (alleen die in `job_ids`, als gegeven) zodra ze klaar of definitief
+    mislukt zijn, in de volgorde waarin dat gebeurt.
+    """
+    jobs = open_queue(path)
+    ids = list(job_ids) if job_ids is not None else None
+    workers = workers or os.cpu_count() or 1
+    if workers < 2:
+        wanted = set(ids) if ids is not None else None
+        for job_id in process_jobs(path):
+            job = jobs.job(job_id)
+            # Een job die opnieuw in de queue staat komt later nog een keer langs
+            if job.state != QUEUED and (wanted is None or job_id in wanted):
+                yield job
+        return
+    # spawn: hetzelfde gedrag op Windows en Linux (zie slk_worker)
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=work, args=(path,)) for _ in range(workers)]
+    begin = time.time()
+    for process in processes:
+        process.start()
+    reported = set()
+    while True:
+        running = any(process.is_alive() for process in processes)
+        # Zonder job_ids: alles wat sinds de start van deze pool klaar is (finished is leeg
+        # bij een job van voor de heartbeat die nooit afgerond is)
+        finished = [job for state in (DONE, FAILED) for job in jobs.jobs(state, ids=ids)
+                    if job.id not in reported
+                    and (ids is not None or (job.finished is not None and job.finished >= begin))]
+        for job in sorted(finished):
+            reported.add(job.id)
+            yield job
+        if not running:
+            break
+        time.sleep(POLL_INTERVAL)
+    for process in processes:
+        process.join()
+
+
+def format_job(job: Job) -> str:
+    wait = f"{job.wait * 1000:8.0f}" if job.wait is not None else f"{'':>8}"
+    seconds = f"{job.seconds * 1000:8.0f}" if job.seconds is not None else f"{'':>8}"
+    rows = job.rows if job.rows is not None else ''
+    line = f"{job.id:>6} {job.kind:<6} {job.state:<10} {job.attempts:>3}/{job.max_attempts:<3} {rows:>6} {wait} {seconds}  {job.source}"
+    return line + (f"\n       ↳ {job.error}" if job.error and job.state != DONE else '')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Job queue van de conversies')
+    parser.add_argument('--queue', default=JOBS_FILE, help=f'queue bestand (standaard {JOBS_FILE})')
+    commands = parser.add_subparsers(dest='command', required=True)
+    status = commands.add_parser('status', help='aantallen per status en de laatste jobs')
+    status.add_argument('--state', choices=STATES, help='alleen jobs met deze status')
+    status.add_argument('--slowest', type=int, metavar='N', help='de N traagste jobs')
+    status.add_argument('--limit', type=int, default=20, help='aantal jobs (standaard 20)')
+    work_parser = commands.add_parser('work', help='wachtende batch jobs verwerken')
+    work_parser.add_argument('--workers', type=int, default=None, help="aantal processen (standaard: aantal CPU's)")
+    commands.add_parser('retry', help='mislukte batch jobs opnieuw in de queue')
+    commands.add_parser('prune', help=f'gestopte jobs afronden en jobs ouder dan {KEEP_DAYS} dagen verwijderen')
+    args = parser.parse_args()
+
+    jobs = JobQueue(args.queue)
+    if args.command == 'retry':
+        print(f"🔁 {jobs.retry_failed()} job(s) opnieuw in de queue", file=sys.stderr)
+    elif args.command == 'prune':
+        print(f"🧹 {jobs.prune()} job(s) verwijderd", file=sys.stderr)
+    elif args.command == 'work':
+        failed = 0
+        for job in run_workers(args.queue, args.workers):
+            failed += job.state == FAILED
+            print(format_job(job))
+        if failed:
+            sys.exit(1)
+    else:
+        print('  '.join(f"{state}: {count}" for state, count in jobs.counts().items()))
+        print(f"{'id':>6} {'soort':<6} {'status':<10} {'poging':<7} {'rijen':>6} {'wacht ms':>8} {'ms':>8}  bron")
+        selected = jobs.jobs(args.state, limit=args.slowest or args.limit, slowest=args.slowest is not None)
+        for job in selected:
+            print(format_job(job))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Manifest van batch conversies: welke exports al geconverteerd zijn.
+
+batch_convert.py houdt in de output map een manifest bij (MANIFEST_NAME, één
+JSON regel per geconverteerde bron): de sha1 van de gedecomprimeerde inhoud, het
+output pad, een hash van de opties, het aantal rijen en de tijden. Een bron met
+dezelfde inhoud en opties waarvan de output er nog staat, wordt overgeslagen.
+Een afgebroken run gaat dus verder waar hij stopte, en een nachtelijke run
+converteert alleen wat nieuw of gewijzigd is.
+
+De inhoud hashen kost één keer lezen. Daarom staan bij elke regel ook de grootte
+en mtime van het bestand: zijn die ongewijzigd, dan komt de hash uit het
+manifest en is overslaan een stat en een dict lookup.
+
+Een regel wordt toegevoegd zodra een bron klaar is, dus een crash kost hooguit
+de bronnen die bezig waren. Een halve laatste regel wordt bij het laden
+overgeslagen; per bron en output wint de laatste regel.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from slk_sources import SlkSource, source_digest
+
+MANIFEST_NAME = '.manifest.jsonl'
+
+# Bestand, lid van een zip, grootte en mtime (ns) van het bestand
+StatKey = Tuple[str, str, int, int]
+
+
+class ManifestEntry(NamedTuple):
+    digest: str             # sha1 van de gedecomprimeerde inhoud
+    output: str
+    options: str            # options_digest van de conversie
+    rows: int
+    seconds: float
+    finished: float         # time.time() van het einde van de conversie
+    file: str
+    member: str
+    size: int
+    mtime: int
+
+
+def options_digest(options: dict) -> str:
+    """Korte hash van de opties die de output bepalen."""
+    return hashlib.sha1(json.dumps(options, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def stat_key(source: SlkSource) -> StatKey:
+    stat = os.stat(source.file)
+    return os.path.abspath(source.file), source.member or '', stat.st_size, stat.st_mtime_ns
+
+
+class Manifest:
+    """De regels van één manifest bestand, op (inhoud, output) en op bestand en mtime."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[Tuple[str, str], ManifestEntry] = {}
+        self.digests: Dict[StatKey, str] = {}
+        # Eindigt het bestand midden in een regel, dan begint de volgende regel op een nieuwe
+        self.torn = False
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                for line in file:
+                    self.torn = not line.endswith('\n')
+                    try:
+                        entry = ManifestEntry(**json.loads(line))
+                    except (ValueError, TypeError):
+                        # Een halve regel van een afgebroken run
+                        continue
+                    self._add(entry)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _add(self, entry: ManifestEntry):
+        self.entries[entry.digest, os.path.abspath(entry.output)] = entry
+        self.digests[entry.file, entry.member, entry.size, entry.mtime] = entry.digest
+
+    def digest(self, source: SlkSource, key: Optional[StatKey] = None) -> str:
+        """De hash van een bron; uit het manifest als het bestand niet veranderd is."""
+        key = key or stat_key(source)
+        digest = self.digests.get(key)
+        return digest if digest is not None else source_digest(source)
+
+    def is_current(self, digest: str, output: str, options: str) -> bool:
+        """Is deze inhoud met deze opties al naar `output` geconverteerd (en staat die er nog)?"""
+        entry = self.entries.get((digest, os.path.abspath(output)))
+        return entry is not None and entry.options == options and os.path.exists(output)
+
+    def record(self, key: StatKey, digest: str, output: str, options: str, rows: int, seconds: float):
+        """Een geconverteerde bron toevoegen, direct op schijf."""
+        file, member, size, mtime = key
+        self._append(ManifestEntry(digest, output, options, rows, seconds, time.time(), file, member, size, mtime))
+
+    def refresh(self, key: StatKey, digest: str, output: str):
+        """Dezelfde inhoud met een nieuwe mtime (bv. opnieuw gekopieerd): de volgende run hoeft niet te hashen."""
+        file, member, size, mtime = key
+        entry = self.entries[digest, os.path.abspath(output)]
+        self._append(entry._replace(file=file, member=member, size=size, mtime=mtime))
+
+    def _append(self, entry: ManifestEntry):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as manifest:
+            manifest.write(('\n' if self.torn else '') + json.dumps(entry._asdict(), ensure_ascii=False) + '\n')
+        self.torn = False
+        self._add(entry)
@@ -0,0 +1,129 @@
+"""
+Kolom mapping en mapping presets.
+
+De conversie zelf gebruikt altijd de standaard mapping en wordt gecached. Een
+aangepaste mapping wordt daarna als goedkope projectie over die tabel gelegd:
+alleen de output kolommen waarvan de bron afwijkt worden vervangen.
+"""
+
+import json
+import os
+import re
+from typing import Dict
+
+import pandas as pd
+
+from slk_phones import extract_phones
+from slk_pipeline import PHONE_STYLE, format_times
+
+# Standaard mapping: Routemeister veld -> SLK kolom
+DEFAULT_MAPPING = {
+    'Patient_ID': 'fallnummer',
+    'Name': 'name',
+    'Vorname': 'vorname',
+    'Titel': 'titel',
+    'Telefon': 'telefon',
+    'Strasse': 'strasse',
+    'PLZ': 'plz',
+    'Ort': 'ort',
+    'Adresszusatz': 'adresszusatz',
+    'Bemerkung': 'bemerkung',
+    'BHT': 'bht',
+    'Erster_Termin': 'erster_termin',
+    'Letzter_Termin': 'letzter_termin'
+}
+
+# Beschikbare SLK kolommen
+SLK_COLUMNS = ['name', 'vorname', 'titel', 'telefon', 'strasse', 'plz', 'ort',
+               'adresszusatz', 'bemerkung', 'bht', 'fallnummer', 'erster_termin', 'letzter_termin']
+
+# Output kolom(men) die door een Routemeister veld gevuld worden.
+# Titel, Adresszusatz, Bemerkung en BHT komen niet in de Routemeister output.
+MAPPED_OUTPUT_COLUMNS = {
+    'Patient_ID': ['patient ID'],
+    'Name': ['Name'],
+    'Vorname': ['vorname'],
+    'Strasse': ['strasse+nr'],
+    'PLZ': ['PLZ'],
+    'Ort': ['ort'],
+    'Telefon': ['1telefon_1', '2telefon'],
+    'Erster_Termin': ['erster_termin'],
+    'Letzter_Termin': ['letze_termin'],
+}
+TIME_FIELDS = ('Erster_Termin', 'Letzter_Termin')
+
+PRESET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mapping_presets')
+
+
+def apply_column_mapping(output_df: pd.DataFrame, fields_df: pd.DataFrame,
+                         column_mapping: Dict[str, str]) -> pd.DataFrame:
+    """
+    Leg een mapping over de (met de standaard mapping) geconverteerde tabel.
+
+    `fields_df` bevat de opgeschoonde SLK kolommen; alleen afwijkende velden worden
+    daaruit opnieuw gevuld. Met de standaard mapping komt `output_df` ongewijzigd terug.
+    """
+    changed = {
+        key: column_mapping.get(key, '')
+        for key in MAPPED_OUTPUT_COLUMNS
+        if column_mapping.get(key, '') != DEFAULT_MAPPING[key]
+    }
+    if not changed:
+        return output_df
+
+    projected = output_df.copy()
+    for key, field in changed.items():
+        columns = [col for col in MAPPED_OUTPUT_COLUMNS[key] if col in projected.columns]
+        if not field:
+            # Niet gemapt: kolom leeg laten
+            for col in columns:
+                projected[col] = ''
+            continue
+        source = fields_df[field]
+        if key == 'Telefon':
+            # Zelfde stijl als de standaard conversie
+            phones = extract_phones(source, output_df.attrs.get(PHONE_STYLE))
+            projected['1telefon_1'] = phones['primary'].to_numpy()
+            projected['2telefon'] = phones['secondary'].to_numpy()
+        elif key in TIME_FIELDS:
+            projected[columns[0]] = format_times(source).to_numpy()
+        else:
+            projected[columns[0]] = source.to_numpy()
+    return projected
+
+
+def mapped_fields(column_mapping: Dict[str, str]) -> Dict[str, str]:
+    """Output kolom -> SLK kolom waar hij met deze mapping uit komt (voor de herkomst van een cel)."""
+    return {col: column_mapping[key] for key, columns in MAPPED_OUTPUT_COLUMNS.items()
+            if column_mapping.get(key) for col in columns}
+
+
+def _preset_path(name: str) -> str:
+    safe_name = re.sub(r'[^\w\- ]', '', name).strip()
+    if not safe_name:
+        raise ValueError("Ongeldige naam voor mapping preset")
+    return os.path.join(PRESET_DIR, f"{safe_name}.json")
+
+
+def list_presets():
+    """Namen van alle opgeslagen mapping presets."""
+    if not os.path.isdir(PRESET_DIR):
+        return []
+    return sorted(name[:-5] for name in os.listdir(PRESET_DIR) if name.endswith('.json'))
+
+
+def load_preset(name: str) -> Dict[str, str]:
+    with open(_preset_path(name), encoding='utf-8') as file:
+        mapping = json.load(file)
+    # Onbekende velden of kolommen negeren, ontbrekende velden krijgen de standaard
+    return {
+        key: mapping.get(key, default) if mapping.get(key, default) in [''] + SLK_COLUMNS else default
+        for key, default in DEFAULT_MAPPING.items()
+    }
+
+
+def save_preset(name: str, column_mapping: Dict[str, str]):
+    os.makedirs(PRESET_DIR, exist_ok=True)
+    mapping = {key: column_mapping.get(key, '') for key in DEFAULT_MAPPING}
+    with open(_preset_path(name), 'w', encoding='utf-8') as file:
+        json.dump(mapping, file, indent=2, ensure_ascii=False)
@@ -0,0 +1,46 @@
+"""
+Begrensde memo caches voor het opschonen van celwaarden.
+
+Fahrdlists herhalen zich sterk (landcode, rit datum, tijden, plaatsen), dus de
+opschoonfuncties onthouden hun resultaat per ruwe string. Elke cache is een
+`functools.lru_cache` met een vaste grootte en wordt hier geregistreerd, zodat
+de hit rate in het prestatierapport (bench_slk.py) getoond kan worden.
+"""
+
+import functools
+from typing import Callable, Dict
+
+# Maximaal aantal onthouden waarden per functie
+MEMO_SIZE = 65536
+
+_CACHES: Dict[str, Callable] = {}
+
+
+def memoized(name: str, maxsize: int = MEMO_SIZE):
+    """Decorator: lru_cache met een naam in het register. Argumenten moeten hashable zijn."""
+    def decorate(func):
+        cached = functools.lru_cache(maxsize=maxsize)(func)
+        _CACHES[name] = cached
+        return cached
+    return decorate
+
+
+def cache_stats() -> Dict[str, dict]:
+    """Hits, misses, grootte en hit rate per geregistreerde cache."""
+    stats = {}
+    for name, cached in _CACHES.items():
+        info = cached.cache_info()
+        lookups = info.hits + info.misses
+        stats[name] = {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'maxsize': info.maxsize,
+            'hit_rate': info.hits / lookups if lookups else 0.0,
+        }
+    return stats
+
+
+def clear_caches():
+    for cached in _CACHES.values():
+        cached.cache_clear()
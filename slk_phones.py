@@ -0,0 +1,91 @@
+"""
+Telefoonnummers: splitsen en (optioneel) normaliseren.
+
+Het telefoonveld uit Meditec bevat nul, één of meer nummers gescheiden door
+spaties, komma's, puntkomma's of slashes. `extract_phones` splitst een hele kolom
+in één keer naar een vast schema (primary, secondary, overflow), zodat de CSV
+altijd dezelfde kolommen heeft, ook als een patiënt drie nummers heeft.
+
+Normaliseren is optioneel: 'national' schrijft Duitse nummers als 0049..., 'e164'
+als +49.... De regels worden één keer gecompileerd en het resultaat per nummer
+wordt onthouden.
+"""
+
+import re
+from typing import Optional
+
+import pandas as pd
+
+from slk_memo import memoized
+
+PHONE_SEPARATOR_RE = re.compile(r'[ ,;/]+')
+PHONE_COLUMNS = ['primary', 'secondary', 'overflow']
+
+# Landcode voor nummers die met één 0 beginnen
+COUNTRY_CODE = '49'
+
+# Alles behalve cijfers en een + aan het begin
+PHONE_NOISE_RE = re.compile(r'(?!^\+)[^\d]')
+
+# Normalisatieregels per stijl: (patroon, vervanging), de eerste die past wint
+PHONE_STYLES = {
+    'national': [
+        (re.compile(r'^\+(\d+)$'), r'00\1'),                 # +49... -> 0049...
+        (re.compile(r'^(00\d+)$'), r'\1'),                   # al internationaal
+        (re.compile(r'^0(\d+)$'), '00' + COUNTRY_CODE + r'\1'),  # 0228... -> 0049228...
+    ],
+    'e164': [
+        (re.compile(r'^\+(\d+)$'), r'+\1'),
+        (re.compile(r'^00(\d+)$'), r'+\1'),
+        (re.compile(r'^0(\d+)$'), '+' + COUNTRY_CODE + r'\1'),
+    ],
+}
+
+
+@memoized('normalize_phone')
+def normalize_phone(number: str, style: str) -> str:
+    """Eén nummer naar de gegeven stijl; nummers zonder kengetal blijven zoals ze zijn."""
+    digits = PHONE_NOISE_RE.sub('', number)
+    for pattern, replacement in PHONE_STYLES[style]:
+        if pattern.match(digits):
+            return pattern.sub(replacement, digits)
+    return number
+
+
+def _normalize_column(values: pd.Series, style: str) -> pd.Series:
+    # Alleen de unieke nummers normaliseren, dan terug mappen
+    mapping = {value: normalize_phone(value, style) for value in values.unique() if value}
+    return values.map(lambda value: mapping.get(value, value))
+
+
+def extract_phones(telefon: pd.Series, style: Optional[str] = None) -> pd.DataFrame:
+    """
+    Splits een telefoonkolom in primary, secondary en overflow.
+
+    overflow bevat het derde en volgende nummer, gescheiden door ', '. Ontbrekende
+    waarden worden lege strings. Met `style` ('national' of 'e164') worden alle
+    nummers genormaliseerd.
+    """
+    if style is not None and style not in PHONE_STYLES:
+        raise ValueError(f"Onbekende telefoon stijl: {style} (kies uit {', '.join(PHONE_STYLES)})")
+    # Zonder df.attrs verder: pandas kopieert die anders bij elke tussenstap
+    text = pd.Series(telefon.to_numpy(dtype=object), index=telefon.index).fillna('').astype(str).str.strip()
+    parts = text.str.split(PHONE_SEPARATOR_RE, n=2, expand=True, regex=True)
+    parts = parts.reindex(columns=range(3)).fillna('')
+    phones = pd.DataFrame({
+        'primary': parts[0].astype(object),
+        'secondary': parts[1].astype(object),
+        # De rest is ongesplitst gebleven; netjes opnieuw scheiden
+        'overflow': parts[2].astype(object).str.replace(PHONE_SEPARATOR_RE, ', ', regex=True),
+    }, index=telefon.index)
+    if style is not None:
+        for col in PHONE_COLUMNS[:2]:
+            phones[col] = _normalize_column(phones[col], style)
+        phones['overflow'] = phones['overflow'].map(
+            lambda value: ', '.join(normalize_phone(n, style) for n in value.split(', ')) if value else value)
+    return phones
+
+
+def join_phones(phones: pd.DataFrame) -> pd.Series:
+    """Alle nummers weer in één veld, gescheiden door ', '."""
+    return phones[PHONE_COLUMNS].apply(lambda row: ', '.join(value for value in row if value), axis=1)
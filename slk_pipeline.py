@@ -0,0 +1,509 @@
+"""
+SLK parse- en conversiepipeline van de Routemeister converter.
+
+Deze functies stonden eerst in `simple_app.py`. Ze staan nu in een aparte
+module zodat Streamlit ze bij een rerun niet opnieuw hoeft te definiëren.
+"""
+
+from array import array
+from typing import Callable, Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from slk_diagnostics import NO_POSITION, TRUNCATED, UNREADABLE, ParseDiagnostics
+from slk_exporters import export_bytes
+from slk_memo import memoized
+from slk_phones import extract_phones
+from slk_profiles import fold_column, fold_text, get_profile
+from slk_provenance import Provenance, SourceRef
+from slk_symbols import CATEGORICAL_COLUMNS, SymbolTable, constant_column, is_categorical, map_categories
+
+from slk_tables import (
+    ALL_COLUMNS,
+    CK_NUMERIC_RE,
+    CK_QUOTED_RE,
+    COLUMN_MAPPING,
+    ENCODINGS_TO_TRY,
+    POSITION_RE,
+    SPECIAL_CHAR_RE,
+    STRAY_ESCAPE_RE,
+    decode_escapes,
+    is_plain_ascii,
+)
+
+# Voortgangsmeldingen: progress(stap, aantal) na elke PROGRESS_EVERY regels of rijen
+PROGRESS_EVERY = 2000
+TOKENIZED = 'bytes getokeniseerd'
+EMITTED = 'rijen gelezen'
+CONVERTED = 'rijen geconverteerd'
+CLEANED = 'rijen opgeschoond'
+
+ProgressCallback = Callable[[str, int], None]
+
+# df.attrs sleutels die de parser zet: het hele bestand, en de kolommen, bevatten alleen
+# printbaar ASCII. Opschonen en markeren slaan die kolommen over; wie de waarden in
+# zo'n tabel aanpast moet deze attrs weghalen.
+ASCII_FILE = 'ascii_file'
+ASCII_COLUMNS = 'ascii_columns'
+
+
+# Normalisatie gebeurt in twee vaste stappen, elk precies één keer per waarde:
+#   1. decoderen (de parser, decode_cell): escape sequences en losse escapes; ß blijft ß
+#   2. vouwen (clean_dataframe): mojibake, transliteratie volgens het profiel, controle karakters weg
+# df.attrs[NORMALIZED] zegt hoe ver een tabel is; volgende stappen en exporters vertrouwen daarop.
+NORMALIZED = 'normalized'
+DECODED = 'decoded'
+FOLDED = 'folded'
+# Het transliteratieprofiel waarmee een gevouwen tabel gevouwen is
+PROFILE = 'profile'
+
+# X van de categorical kolommen -> plaats in de codes per rij
+CATEGORICAL_SLOTS = {col: CATEGORICAL_COLUMNS.index(name) for col, name in COLUMN_MAPPING.items()
+                     if name in CATEGORICAL_COLUMNS}
+
+
+def ascii_columns(df: pd.DataFrame) -> set:
+    """Kolommen waarvan de parser heeft vastgesteld dat ze alleen printbaar ASCII bevatten."""
+    return set(df.attrs.get(ASCII_COLUMNS, ()))
+
+
+def decode_slk(raw_content: bytes) -> Tuple[str, str]:
+    """Probeer verschillende encodings voor Duitse karakters; geeft (tekst, encoding)."""
+    for encoding in ENCODINGS_TO_TRY:
+        try:
+            return raw_content.decode(encoding), encoding
+        except UnicodeDecodeError:
+            continue
+    return raw_content.decode('utf-8', errors='ignore'), 'utf-8'
+
+
+def decode_slk_bytes(raw_content: bytes) -> str:
+    return decode_slk(raw_content)[0]
+
+
+@memoized('decode_cell')
+def decode_cell(value: str) -> str:
+    """Stap 1 (parser): escape sequences naar umlauts en ß, losse escapes weg; ß -> ss is aan het profiel."""
+    # Vervang escape sequences + de volgende letter door de juiste umlaut
+    value = decode_escapes(value)
+
+    # Verwijder overgebleven escape sequences
+    if '\x1b' in value:
+        value = STRAY_ESCAPE_RE.sub('', value)
+    return value
+
+
+def fold_value(val, profile: Optional[str] = None):
+    """Stap 2 voor een waarde die al gedecodeerd is."""
+    if pd.isna(val):
+        return val
+    return fold_text(str(val), get_profile(profile))
+
+
+def clean_value(val, profile: Optional[str] = None):
+    """Beide stappen, voor een waarde die niet uit de parser komt."""
+    if pd.isna(val):
+        return val
+    return fold_text(decode_cell(str(val)), get_profile(profile))
+
+
+def _decode_column(values: pd.Series) -> pd.Series:
+    if is_categorical(values):
+        return map_categories(values, _decode_column)
+    return values.map(lambda val: val if pd.isna(val) else decode_cell(str(val)))
+
+
+def _fold_frame(df: pd.DataFrame, profile, decoded: bool) -> pd.DataFrame:
+    folded = {}
+    for col in df.columns:
+        values = df[col] if decoded else _decode_column(df[col])
+        folded[col] = fold_column(values, profile)
+    return pd.DataFrame(folded, index=df.index, columns=df.columns)
+
+
+def _fold_in_chunks(df: pd.DataFrame, profile, decoded: bool,
+               progress: Optional[ProgressCallback]) -> pd.DataFrame:
+    if progress is None or len(df) <= PROGRESS_EVERY:
+        return _fold_frame(df, profile, decoded)
+    # In blokken opschonen zodat er tussendoor voortgang gemeld (en afgebroken) kan worden
+    chunks = []
+    for start in range(0, len(df), PROGRESS_EVERY):
+        chunks.append(_fold_frame(df.iloc[start:start + PROGRESS_EVERY], profile, decoded))
+        progress(CLEANED, start + len(chunks[-1]))
+    return pd.concat(chunks)
+
+
+def clean_dataframe(df: pd.DataFrame, progress: Optional[ProgressCallback] = None,
+                    profile: Optional[str] = None) -> pd.DataFrame:
+    """
+    Stap 2 over een hele tabel, kolom voor kolom, met het gegeven profiel (standaard german_ascii).
+
+    Een tabel die al gevouwen is komt ongewijzigd terug; met een ander profiel
+    opnieuw vouwen kan niet, want vouwen is niet omkeerbaar.
+    """
+    state = df.attrs.get(NORMALIZED)
+    if state == FOLDED:
+        if profile is not None and profile != df.attrs.get(PROFILE):
+            raise ValueError(f"Tabel is al gevouwen met profiel {df.attrs.get(PROFILE)}, niet met {profile}")
+        if progress is not None:
+            progress(CLEANED, len(df))
+        return df
+    compiled = get_profile(profile)
+    # Waarden uit de parser zijn al gedecodeerd, andere tabellen krijgen beide stappen
+    decoded = state == DECODED
+
+    # Printbare ASCII verandert in geen enkel profiel, dus schone kolommen overslaan
+    clean = ascii_columns(df)
+    dirty = [col for col in df.columns if col not in clean]
+    if len(dirty) == len(df.columns):
+        cleaned = _fold_in_chunks(df, compiled, decoded, progress)
+    else:
+        cleaned = df.copy()
+        if dirty:
+            cleaned[dirty] = _fold_in_chunks(df[dirty], compiled, decoded, progress)
+        elif progress is not None:
+            progress(CLEANED, len(df))
+    cleaned.attrs = dict(df.attrs)
+    cleaned.attrs[NORMALIZED] = FOLDED
+    cleaned.attrs[PROFILE] = compiled.name
+    return cleaned
+
+
+def _lines(file_content: Union[str, Iterable[str]]) -> Iterable[str]:
+    """Regels van de tekst; een iterator met regels (slk_sources.iter_lines) wordt zo doorgegeven."""
+    return file_content.split('\n') if isinstance(file_content, str) else file_content
+
+
+def extract_rit_datum(file_content: Union[str, Iterable[str]]) -> str:
+    # Zoek naar Y2;X1
+    last_row = None
+    last_col = None
+    for line in _lines(file_content):
+        line = line.strip()
+        pos_match = POSITION_RE.search(line)
+        if pos_match:
+            last_row = int(pos_match.group(1))
+            last_col = int(pos_match.group(2))
+            continue
+        if line.startswith('C;K') and last_row == 2 and last_col == 1:
+            match = CK_QUOTED_RE.search(line)
+            if match:
+                datum = match.group(1)
+                # Vervang punten door streepjes in datum
+                return datum.replace('.', '-')
+    return ''
+
+
+def iter_slk_cells(file_content: Union[str, Iterable[str]], encoding: str = 'utf-8',
+                   diagnostics: Optional[ParseDiagnostics] = None,
+                   progress: Optional[ProgressCallback] = None) -> Iterator[Tuple[int, int, str, int, int]]:
+    """
+    Tokenizer: geef (Y, X, ruwe waarde, regelnummer, byte offset van de regel) voor
+    elke C;K cel in het patiëntgebied (Y>=4, X 2..14).
+
+    Onthoudt altijd de laatst gevonden Y/X en koppelt elke C;K aan die coördinaat.
+    Records die niet gelezen kunnen worden gaan naar `diagnostics` met regelnummer
+    en byte offset; dat gebeurt alleen in de foutpaden. `progress` krijgt om de
+    PROGRESS_EVERY regels het aantal verwerkte bytes. `file_content` is de hele tekst
+    of een iterator met regels zonder '\n', zodat een (gedecomprimeerde) stream
+    regel voor regel getokeniseerd kan worden.
+    """
+    last_row = None
+    last_col = None
+    offset = 0
+    for line_no, raw_line in enumerate(_lines(file_content), 1):
+        line_offset = offset
+        # isascii() is O(1) in CPython, dus alleen niet-ASCII regels worden opnieuw ge-encodeerd
+        offset += (len(raw_line) if raw_line.isascii() else len(raw_line.encode(encoding, errors='replace'))) + 1
+        if progress is not None and line_no % PROGRESS_EVERY == 0:
+            progress(TOKENIZED, offset)
+        line = raw_line.strip()
+        pos_match = POSITION_RE.search(line)
+        if pos_match:
+            last_row = int(pos_match.group(1))
+            last_col = int(pos_match.group(2))
+            continue
+        if not line.startswith('C;K'):
+            continue
+        if last_row is None or last_col is None or not 2 <= last_col <= 14:
+            if diagnostics is not None and (last_row is None or last_row >= 4):
+                diagnostics.add(line_no, line_offset, last_row, last_col, NO_POSITION, line)
+            continue
+        if last_row < 4:
+            continue
+        # Accepteer zowel C;K"waarde" als C;Kwaarde (voor postcodes etc.)
+        match = CK_QUOTED_RE.search(line)
+        if match:
+            if diagnostics is not None and match.end() != len(line):
+                diagnostics.add(line_no, line_offset, last_row, last_col, TRUNCATED, line)
+        else:
+            # Probeer zonder quotes (voor numerieke waarden)
+            match = CK_NUMERIC_RE.search(line)
+            if not match:
+                if diagnostics is not None:
+                    diagnostics.add(line_no, line_offset, last_row, last_col, UNREADABLE, line)
+                continue
+        yield last_row, last_col, match.group(1), line_no, line_offset
+
+
+def parse_slk_patients(file_content: Union[str, Iterable[str]], diagnostics: Optional[ParseDiagnostics] = None,
+                       encoding: str = 'utf-8', progress: Optional[ProgressCallback] = None,
+                       plain_file: Optional[bool] = None, limit: Optional[int] = None,
+                       provenance: Optional[Provenance] = None) -> pd.DataFrame:
+    """
+    Eén rij per patiënt (X2 begint een nieuwe). Met `limit` stopt het tokenizen
+    zodra er zoveel patiënten compleet zijn; de rest van de input wordt niet gelezen.
+    Met `provenance` wordt de herkomst van elke rij bijgehouden (slk_provenance).
+    """
+    patients = []
+    current_patient = {}
+    # Herhalende kolommen (tijden, ort, titel, bht) als codes in een symbooltabel per bestand
+    symbols = [SymbolTable() for _ in CATEGORICAL_COLUMNS]
+    row_codes = array('i')
+    current_codes = None
+    # Herkomst: per rij offset en regel van het eerste record, per kolom de regel van de cel
+    row_offsets, row_starts, cell_lines = array('q'), array('i'), array('i')
+    current_lines = None
+    # Bestaat het hele bestand uit printbaar ASCII, dan hoeven de cellen niet gecontroleerd te worden.
+    # Bij een iterator met regels weet alleen de aanroeper dat (slk_sources.sniff_encoding).
+    if plain_file is None:
+        plain_file = isinstance(file_content, str) and is_plain_ascii(file_content)
+    dirty = set()
+    for _, col, value, line_no, line_offset in iter_slk_cells(file_content, encoding, diagnostics, progress):
+        value = decode_cell(value)
+        if not plain_file and col not in dirty and not (value.isascii() and value.isprintable()):
+            dirty.add(col)
+        if col == 2 and current_lines is not None:
+            # Start nieuwe patient bij X2
+            patients.append(current_patient)
+            row_codes.extend(current_codes)
+            cell_lines.extend(current_lines)
+            current_lines = None
+            if progress is not None and len(patients) % PROGRESS_EVERY == 0:
+                progress(EMITTED, len(patients))
+            if limit is not None and len(patients) >= limit:
+                break
+        if current_lines is None:
+            current_patient = {}
+            current_codes = [-1] * len(CATEGORICAL_COLUMNS)
+            current_lines = [0] * len(COLUMN_MAPPING)
+            row_offsets.append(line_offset)
+            row_starts.append(line_no)
+        slot = CATEGORICAL_SLOTS.get(col)
+        if slot is None:
+            current_patient[COLUMN_MAPPING[col]] = value
+        else:
+            current_codes[slot] = symbols[slot].code(value)
+        current_lines[col - 2] = line_no
+    if current_lines is not None:
+        patients.append(current_patient)
+        row_codes.extend(current_codes)
+        cell_lines.extend(current_lines)
+    df = pd.DataFrame(patients, index=pd.RangeIndex(len(patients)))
+    codes = np.asarray(row_codes, dtype=np.int32).reshape(len(patients), len(CATEGORICAL_COLUMNS))
+    for slot, col in enumerate(CATEGORICAL_COLUMNS):
+        if symbols[slot]:
+            df[col] = symbols[slot].categorical(codes[:, slot])
+    # Zorg dat alle relevante kolommen altijd aanwezig zijn en in de juiste volgorde staan
+    for col in ALL_COLUMNS:
+        if col not in df.columns:
+            df[col] = ''
+    df = df[ALL_COLUMNS]
+    df.attrs[NORMALIZED] = DECODED
+    df.attrs[ASCII_FILE] = plain_file
+    df.attrs[ASCII_COLUMNS] = [COLUMN_MAPPING[col] for col in sorted(COLUMN_MAPPING) if col not in dirty]
+    if provenance is not None:
+        # De bron kent de parser niet; slk_sources.parse_source vult hem in
+        provenance.add_rows(SourceRef('', '', encoding), row_offsets[:len(patients)], row_starts[:len(patients)],
+                            cell_lines)
+    return df
+
+
+def format_times(tijden: pd.Series) -> pd.Series:
+    """Verwijder dubbele punten en leading zeros uit een kolom tijden."""
+    if is_categorical(tijden):
+        # Elke tijd één keer formatteren; het resultaat blijft categorical
+        return map_categories(tijden, format_times)
+    # Zonder df.attrs verder: pandas kopieert die anders bij elke tussenstap
+    tijd_str = pd.Series(tijden.to_numpy(dtype=object), index=tijden.index).fillna('').astype(str)
+    tijd_str = tijd_str.str.replace(':', '', regex=False)
+    # Verwijder leading zero als het een 4-cijferige tijd is (0700 -> 700)
+    leading_zero = (tijd_str.str.len() == 4) & tijd_str.str.startswith('0')
+    return tijd_str.where(~leading_zero, tijd_str.str[1:]).astype(object)
+
+
+# SLK kolom waar een output kolom uit komt; de overige kolommen zijn leeg of vast
+OUTPUT_SOURCES = {
+    'patient ID': 'fallnummer', 'Name': 'name', 'vorname': 'vorname', 'strasse+nr': 'strasse',
+    'ort': 'ort', 'PLZ': 'plz', '1telefon_1': 'telefon', '2telefon': 'telefon',
+    'erster_termin': 'erster_termin', 'letze_termin': 'letzter_termin',
+}
+
+# Telefoon stijl waarmee de output gemaakt is (df.attrs), zie slk_phones
+PHONE_STYLE = 'phone_style'
+
+# De gewenste volgorde, waarbij 1telefon_1 op positie 12 komt
+OUTPUT_ORDER = [
+    'patient ID', 'leeg1', 'Name', 'vorname', 'leeg2', 'leeg3', 'strasse+nr', 'leeg4',
+    'ort', 'PLZ', 'landcode', '1telefon_1', '2telefon', 'leeg5', 'leeg6',
+    'datum von farht', 'leeg7', 'erster_termin', 'letze_termin'
+]
+
+
+def convert_to_custom_format(df: pd.DataFrame, rit_datum: str,
+                             progress: Optional[ProgressCallback] = None,
+                             phone_style: Optional[str] = None) -> pd.DataFrame:
+    """
+    Zet de SLK kolommen om naar de 19 kolommen van Routemeister, kolom voor kolom.
+    `phone_style` ('national' of 'e164') normaliseert de telefoonnummers.
+    """
+    # De rit datum komt rechtstreeks uit het bestand; breng hem op dezelfde stap als de tabel
+    state = df.attrs.get(NORMALIZED)
+    if state == DECODED:
+        rit_datum = decode_cell(rit_datum)
+    elif state == FOLDED:
+        rit_datum = clean_value(rit_datum, df.attrs.get(PROFILE))
+    n_rows = len(df)
+
+    def column(name: str):
+        if name not in df.columns:
+            return constant_column('', n_rows)
+        # Categorical kolommen (slk_symbols) blijven categorical
+        return df[name].array if is_categorical(df[name]) else df[name].to_numpy(dtype=object)
+
+    # Telefoon één keer per kolom splitsen naar een vast schema; overflow gaat niet naar Routemeister
+    telefon = df['telefon'] if 'telefon' in df.columns else pd.Series('', index=df.index)
+    phones = extract_phones(telefon, phone_style)
+    tijden = {
+        name: format_times(df[name]).array if name in df.columns else constant_column('', n_rows)
+        for name in ('erster_termin', 'letzter_termin')
+    }
+    # Lege en vaste kolommen: één waarde met een code per rij
+    empty = constant_column('', n_rows)
+    landcode = constant_column('D', n_rows)
+    datum = constant_column(rit_datum, n_rows)
+    df_out = pd.DataFrame({
+        'patient ID': column('fallnummer'),         # 1 patient ID
+        'leeg1': empty,                             # 2 leeg
+        'Name': column('name'),                     # 3 Name (achternaam)
+        'vorname': column('vorname'),               # 4 vorname
+        'leeg2': empty,                             # 5 leeg
+        'leeg3': empty,                             # 6 leeg
+        'strasse+nr': column('strasse'),            # 7 strasse+nr
+        'leeg4': empty,                             # 8 leeg
+        'ort': column('ort'),                       # 9 ort (plaatsnaam)
+        'PLZ': column('plz'),                       # 10 PLZ (postcode)
+        'landcode': landcode,                       # 11 landcode
+        '1telefon_1': phones['primary'].to_numpy(),   # 12 1telefon
+        '2telefon': phones['secondary'].to_numpy(),   # 13 2telefon
+        'leeg5': empty,                             # 14 leeg
+        'leeg6': empty,                             # 15 leeg
+        'datum von farht': datum,                   # 16 datum der farht
+        'leeg7': empty,                             # 17 leeg
+        'erster_termin': tijden['erster_termin'],   # 18 erster_termin
+        'letze_termin': tijden['letzter_termin'],   # 19 letzter_termin
+    }, index=pd.RangeIndex(n_rows), columns=OUTPUT_ORDER)
+    if progress is not None:
+        progress(CONVERTED, n_rows)
+    if phone_style is not None:
+        df_out.attrs[PHONE_STYLE] = phone_style
+    if state is not None:
+        df_out.attrs[NORMALIZED] = state
+    if ASCII_COLUMNS in df.attrs:
+        # Splitsen en tijden formatteren houden ASCII ASCII; de rit datum zelf controleren
+        clean = ascii_columns(df)
+        ascii_out = []
+        for col in df_out.columns:
+            if col == 'datum von farht':
+                is_clean = rit_datum.isascii() and rit_datum.isprintable()
+            else:
+                source = OUTPUT_SOURCES.get(col)
+                # Lege en vaste kolommen, en kolommen zonder bron in de input (dan leeg), zijn schoon
+                is_clean = source is None or source in clean or source not in df.columns
+            if is_clean:
+                ascii_out.append(col)
+        df_out.attrs[ASCII_COLUMNS] = ascii_out
+    return df_out
+
+
+def concat_tables(frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Tabellen met dezelfde kolommen onder elkaar, bv. een maand exports. Categorical
+    kolommen blijven categorical met de vereniging van de categorieën (pd.concat
+    maakt er bij verschillende categorieën object kolommen van). De attrs blijven
+    alleen staan voor zover ze voor alle tabellen gelden.
+    """
+    if not frames:
+        return pd.DataFrame()
+    columns = list(frames[0].columns)
+    n_rows = sum(len(frame) for frame in frames)
+    # Lege exports dragen geen rijen bij en hebben object kolommen zonder categorieën
+    filled = [frame for frame in frames if len(frame)] or frames[:1]
+    merged = {}
+    for col in columns:
+        parts = [frame[col] for frame in filled]
+        if any(is_categorical(part) for part in parts):
+            # Bv. een export zonder titels heeft daar een gewone lege kolom
+            merged[col] = union_categoricals([part.astype('category').array for part in parts])
+        else:
+            merged[col] = pd.concat(parts, ignore_index=True)
+    df = pd.DataFrame(merged, index=pd.RangeIndex(n_rows), columns=columns)
+    for key in (NORMALIZED, PROFILE, PHONE_STYLE):
+        values = {frame.attrs.get(key) for frame in frames}
+        if len(values) == 1 and None not in values:
+            df.attrs[key] = values.pop()
+    if all(ASCII_COLUMNS in frame.attrs for frame in frames):
+        df.attrs[ASCII_FILE] = all(frame.attrs.get(ASCII_FILE) for frame in frames)
+        df.attrs[ASCII_COLUMNS] = [col for col in columns if all(col in ascii_columns(frame) for frame in frames)]
+    return df
+
+
+def export_routemeister(df: pd.DataFrame, name: str = 'csv') -> bytes:
+    """Opgeschoonde output in een export formaat uit slk_exporters, zonder headers."""
+    # Een gevouwen tabel wordt niet opnieuw opgeschoond
+    return export_bytes(clean_dataframe(df), name)
+
+
+def to_routemeister_csv(df: pd.DataFrame) -> str:
+    """CSV zoals Routemeister hem inleest: geen headers, puntkomma's, alles gequote, Windows regeleinden."""
+    return export_routemeister(df, 'csv').decode('utf-8')
+
+
+def special_char_mask(df: pd.DataFrame) -> pd.DataFrame:
+    """Booleaans masker van cellen met speciale tekens, kolom voor kolom met één regex."""
+    mask = pd.DataFrame(False, index=df.index, columns=df.columns)
+    clean = ascii_columns(df)
+    for col in df.columns:
+        if col in clean:
+            continue
+        values = df[col]
+        if is_categorical(values):
+            # Elke categorie één keer controleren en het resultaat via de codes verspreiden
+            special = np.asarray(values.cat.categories.str.contains(SPECIAL_CHAR_RE), dtype=bool)
+            codes = values.cat.codes.to_numpy()
+            mask[col] = np.append(special, False)[codes]
+        elif values.dtype == object or pd.api.types.is_string_dtype(values):
+            mask[col] = values.str.contains(SPECIAL_CHAR_RE, na=False).astype(bool)
+    return mask
+
+
+def special_char_cells(df: pd.DataFrame, mask: pd.DataFrame) -> pd.DataFrame:
+    """Compacte lijst (rij, kolom, teken, code) van alle speciale tekens in de gemarkeerde cellen."""
+    cells = []
+    rows, cols = mask.values.nonzero()
+    for row_pos, col_pos in zip(rows, cols):
+        value = str(df.iat[row_pos, col_pos])
+        for char in SPECIAL_CHAR_RE.findall(value):
+            cells.append((df.index[row_pos], df.columns[col_pos], repr(char), ord(char)))
+    return pd.DataFrame(cells, columns=['rij', 'kolom', 'teken', 'code'])
+
+
+def has_special_chars(val):
+    """Check of een waarde speciale/ongewenste tekens bevat (niet-printbaar of niet-ASCII)."""
+    if pd.isna(val):
+        return False
+    s = str(val)
+    # Niet-printbare/control chars of niet-ASCII
+    return any(ord(c) < 32 or ord(c) > 126 for c in s)
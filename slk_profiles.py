@@ -0,0 +1,126 @@
+"""
+Transliteratieprofielen voor de output.
+
+Een profiel bepaalt hoe niet-ASCII tekens in een export terechtkomen:
+
+- unicode:       umlauts, ß en andere tekens blijven staan
+- umlauts:       umlauts blijven staan, ß -> ss (de Excel export van convert_slk.py)
+- german_ascii:  ß -> ss en äöü -> aou, zoals Routemeister het altijd kreeg
+- ascii:         algemene NFKD vouwing, ook voor Turkse, Poolse, ... namen
+
+Elk profiel wordt één keer gecompileerd naar een `str.translate` tabel plus een
+kleine map voor reeksen van meerdere tekens (mojibake als 'Ã¼'). Vouwen is dan per
+kolom één translate aanroep in C; alleen cellen met mojibake of controle
+karakters krijgen een extra stap.
+"""
+
+import re
+import unicodedata
+from typing import Dict, Optional
+
+import pandas as pd
+
+from slk_memo import memoized
+from slk_symbols import is_categorical, map_categories
+from slk_tables import ENCODING_FIXES, GERMAN_ASCII_TABLE, SHARP_S_TABLE, strip_control_chars
+
+# Tekens die NFKD niet ontleedt, met hun gebruikelijke ASCII schrijfwijze
+ASCII_SPECIALS = {
+    'ß': 'ss', 'ẞ': 'SS',
+    'æ': 'ae', 'Æ': 'AE', 'œ': 'oe', 'Œ': 'OE',
+    'ø': 'o', 'Ø': 'O', 'ł': 'l', 'Ł': 'L',
+    'đ': 'd', 'Đ': 'D', 'ð': 'd', 'Ð': 'D',
+    'þ': 'th', 'Þ': 'Th', 'ħ': 'h', 'Ħ': 'H',
+    'ı': 'i',  # Turkse i zonder punt
+}
+
+# Latijnse blokken waarvoor de ascii tabel wordt opgebouwd
+LATIN_RANGES = ((0x00A0, 0x024F), (0x1E00, 0x1EFF))
+
+
+def _nfkd_ascii_table() -> Dict[int, Optional[str]]:
+    table = {}
+    for first, last in LATIN_RANGES:
+        for code in range(first, last + 1):
+            char = chr(code)
+            if char in ASCII_SPECIALS:
+                table[code] = ASCII_SPECIALS[char]
+                continue
+            base = ''.join(c for c in unicodedata.normalize('NFKD', char)
+                           if not unicodedata.combining(c))
+            # Alleen vervangen als er echt ASCII uitkomt ('½' blijft dus '½')
+            if base != char and base.isascii() and base.isprintable():
+                table[code] = base
+    # Losse combinerende accenten (ontlede tekst) vallen weg
+    for code in range(0x0300, 0x0370):
+        table[code] = None
+    return table
+
+
+class Profile:
+    """Een gecompileerd profiel: translate tabel plus mojibake reeksen."""
+
+    def __init__(self, name: str, table: dict):
+        self.name = name
+        self.table = table
+        # Mojibake meteen herstellen naar de schrijfwijze van dit profiel
+        self.sequences = {seq: fixed.translate(table) for seq, fixed in ENCODING_FIXES.items()}
+        self.sequence_re = re.compile('|'.join(re.escape(seq) for seq in self.sequences))
+
+    def __repr__(self):
+        return f"Profile({self.name!r})"
+
+    def fix_sequences(self, text: str) -> str:
+        return self.sequence_re.sub(lambda m: self.sequences[m.group()], text)
+
+
+PROFILES = {
+    'unicode': Profile('unicode', {}),
+    'umlauts': Profile('umlauts', SHARP_S_TABLE),
+    'german_ascii': Profile('german_ascii', GERMAN_ASCII_TABLE),
+    'ascii': Profile('ascii', _nfkd_ascii_table()),
+}
+DEFAULT_PROFILE = 'german_ascii'
+
+# Alle mojibake reeksen in ENCODING_FIXES beginnen met dit teken
+MOJIBAKE_MARKER = 'Ã'
+
+
+def get_profile(name: Optional[str] = None) -> Profile:
+    if name is None:
+        name = DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Onbekend profiel: {name} (kies uit {', '.join(PROFILES)})")
+    return PROFILES[name]
+
+
+@memoized('fold_text')
+def fold_text(text: str, profile: Profile) -> str:
+    """Vouw één waarde: mojibake herstellen, translate, controle karakters weg."""
+    if MOJIBAKE_MARKER in text:
+        text = profile.fix_sequences(text)
+    return strip_control_chars(text.translate(profile.table))
+
+
+def fold_column(values: pd.Series, profile: Profile) -> pd.Series:
+    """Vouw een hele kolom; ontbrekende waarden blijven ontbrekend."""
+    if is_categorical(values):
+        # Alleen de categorieën vouwen (slk_symbols)
+        return map_categories(values, lambda categories: fold_column(categories, profile))
+    present = values.notna()
+    if not present.any():
+        return values
+    text = values[present].astype(str)
+    mojibake = text.str.contains(MOJIBAKE_MARKER, regex=False)
+    if mojibake.any():
+        text[mojibake] = text[mojibake].map(profile.fix_sequences)
+    if profile.table:
+        text = text.str.translate(profile.table)
+    unprintable = ~text.map(str.isprintable).astype(bool)
+    if unprintable.any():
+        text[unprintable] = text[unprintable].map(strip_control_chars)
+    if present.all():
+        return text
+    folded = values.astype(object)
+    folded[present] = text
+    return folded
@@ -0,0 +1,137 @@
+"""
+Herkomst van de rijen: uit welke bron en van welke SLK regels een rij komt.
+
+Als Routemeister een verkeerd adres meldt, moet je het record in de export
+terug kunnen vinden. De parser houdt daarom per rij een paar integers bij: de
+bron, de byte offset en het regelnummer van het eerste record van de rij, en per
+SLK kolom het regelnummer van de cel (0 als de rij die kolom niet heeft). Dat
+zijn numpy arrays naast de tabel, geen object per cel.
+
+Een cel uitleggen is daarna één seek naar het begin van de rij en een paar
+regels lezen, zonder het bestand opnieuw te tokenizen (`read_record`).
+
+Rij i van de herkomst hoort bij positie i van de tabel. convert_to_custom_format
+en clean_dataframe behouden de volgorde, dus de output rijen hebben dezelfde
+herkomst als de geparste rijen. Offsets en regelnummers tellen in de
+gedecomprimeerde bytes van de bron. De herkomst staat bewust niet in df.attrs:
+pandas kopieert die bij elke stap en pyarrow (st.dataframe) wil ze als JSON.
+"""
+
+from typing import BinaryIO, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from slk_tables import ALL_COLUMNS
+
+# Naast een output bestand (batch_convert --provenance)
+PROVENANCE_SUFFIX = '.provenance.npz'
+
+
+class SourceRef(NamedTuple):
+    """Waar een rij vandaan komt; genoeg om de bron later weer te openen."""
+
+    file: str           # pad, of de naam van een upload
+    member: str         # lid van een zip, '' als er geen is
+    encoding: str
+
+    @property
+    def name(self) -> str:
+        return f"{self.file}:{self.member}" if self.member else self.file
+
+
+class Origin(NamedTuple):
+    """Eén cel: de bron, de regel van het record en waar de rij begint."""
+
+    source: SourceRef
+    field: str
+    line: int           # regelnummer van het C;K record (vanaf 1)
+    row_offset: int     # byte offset van het eerste record van de rij
+    row_line: int       # regelnummer van dat record
+
+
+class Provenance:
+    """
+    Per rij: bron, offset en regel van het eerste record; per SLK kolom de regel van
+    de cel. Wordt net als ParseDiagnostics aan de parser meegegeven en gevuld; rijen
+    van meerdere bronnen komen achter elkaar (`extend`).
+    """
+
+    def __init__(self, sources: Sequence[SourceRef] = (), source_ids: Optional[np.ndarray] = None,
+                 offsets: Optional[np.ndarray] = None, starts: Optional[np.ndarray] = None,
+                 lines: Optional[np.ndarray] = None):
+        self.sources = list(sources)
+        self.source_ids = source_ids if source_ids is not None else np.zeros(0, dtype=np.int32)
+        self.offsets = offsets if offsets is not None else np.zeros(0, dtype=np.int64)
+        self.starts = starts if starts is not None else np.zeros(0, dtype=np.int32)
+        self.lines = lines if lines is not None else np.zeros((0, len(ALL_COLUMNS)), dtype=np.int32)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @property
+    def nbytes(self) -> int:
+        return self.source_ids.nbytes + self.offsets.nbytes + self.starts.nbytes + self.lines.nbytes
+
+    def add_rows(self, source: SourceRef, offsets: Sequence[int], starts: Sequence[int], lines: Sequence[int]):
+        """Rijen van één bron uit de platte arrays van de parser (`lines`: len(ALL_COLUMNS) per rij)."""
+        offsets = np.asarray(offsets, dtype=np.int64)
+        self.extend(Provenance([source], np.zeros(len(offsets), dtype=np.int32), offsets,
+                               np.asarray(starts, dtype=np.int32),
+                               np.asarray(lines, dtype=np.int32).reshape(len(offsets), len(ALL_COLUMNS))))
+
+    def extend(self, other: 'Provenance'):
+        """De rijen van `other` achter deze rijen, met zijn bronnen erbij."""
+        first_id = len(self.sources)
+        self.sources.extend(other.sources)
+        self.source_ids = np.concatenate((self.source_ids, other.source_ids + np.int32(first_id)))
+        self.offsets = np.concatenate((self.offsets, other.offsets))
+        self.starts = np.concatenate((self.starts, other.starts))
+        self.lines = np.concatenate((self.lines, other.lines))
+
+    def with_source(self, source: SourceRef) -> 'Provenance':
+        """Dezelfde rijen met `source` als (enige) bron; de parser zelf kent alleen de encoding."""
+        return Provenance([source], np.zeros_like(self.source_ids), self.offsets, self.starts, self.lines)
+
+    def locate(self, row: int, field: str) -> Optional[Origin]:
+        """De herkomst van cel (rij, SLK kolom), of None als de rij die kolom niet had."""
+        line = int(self.lines[row, ALL_COLUMNS.index(field)])
+        if not line:
+            return None
+        return Origin(self.sources[self.source_ids[row]], field, line,
+                      int(self.offsets[row]), int(self.starts[row]))
+
+    def save(self, path: str):
+        np.savez(path, source_ids=self.source_ids, offsets=self.offsets, starts=self.starts, lines=self.lines,
+                 files=np.array([source.file for source in self.sources], dtype=str),
+                 members=np.array([source.member for source in self.sources], dtype=str),
+                 encodings=np.array([source.encoding for source in self.sources], dtype=str))
+
+    @classmethod
+    def load(cls, path: str) -> 'Provenance':
+        with np.load(path) as data:
+            sources = [SourceRef(str(file), str(member), str(encoding))
+                       for file, member, encoding in zip(data['files'], data['members'], data['encodings'])]
+            return cls(sources, data['source_ids'], data['offsets'], data['starts'], data['lines'])
+
+
+def read_record(stream: BinaryIO, origin: Origin) -> str:
+    """Het ruwe record van een cel uit een open (gedecomprimeerde) stream van zijn bron."""
+    stream.seek(origin.row_offset)
+    for _ in range(origin.line - origin.row_line):
+        stream.readline()
+    return stream.readline().rstrip(b'\r\n').decode(origin.source.encoding, errors='replace')
+
+
+def printable(record: str) -> str:
+    """Controle karakters (ESC) zichtbaar maken, zoals in de parser meldingen."""
+    return ''.join(c if c.isprintable() else repr(c)[1:-1] for c in record)
+
+
+def provenance_path(output: str) -> str:
+    return output + PROVENANCE_SUFFIX
+
+
+def describe(origin: Origin) -> str:
+    """Waar een cel staat, voor de CLI en de app."""
+    return (f"{origin.source.name}, regel {origin.line} "
+            f"(rij vanaf regel {origin.row_line}, byte {origin.row_offset})")
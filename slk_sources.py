@@ -0,0 +1,311 @@
+"""
+SLK invoer uit gewone, gzip en zip bestanden.
+
+Meditec exports staan op de fileserver als .slk, .slk.gz of als zip met een
+export per dag. `list_sources` maakt van elk bestand (pad of upload) een lijst
+bronnen: het bestand zelf, de gzip inhoud of elk .slk lid van de zip. Het
+formaat wordt aan de eerste bytes herkend, niet aan de extensie.
+
+Een bron wordt gedecomprimeerd gelezen in blokken van READ_CHUNK bytes en via
+een incrementele decoder regel voor regel aan de tokenizer gegeven; er wordt
+niets uitgepakt naar schijf en de gedecomprimeerde inhoud staat nooit in z'n
+geheel in het geheugen. Daarvoor wordt een bron een paar keer gelezen: eerst
+om de encoding te bepalen (ENCODINGS_TO_TRY, net als decode_slk), dan tot de
+rit datum, dan de patiënten.
+
+Bronnen met een pad kunnen parallel verwerkt worden (`map_sources`); elk proces
+opent het archief dan zelf.
+"""
+
+import codecs
+import gzip
+import hashlib
+import multiprocessing
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import BinaryIO, Callable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import pandas as pd
+
+from slk_diagnostics import ParseDiagnostics
+from slk_pipeline import ProgressCallback, extract_rit_datum, parse_slk_patients
+from slk_provenance import Origin, Provenance, SourceRef, read_record
+from slk_tables import ENCODINGS_TO_TRY
+
+PLAIN = 'slk'
+GZIP = 'gzip'
+ZIP = 'zip'
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZIP_MAGIC = b'PK\x03\x04'
+
+# Bestandstypes voor de uploader en de CLI's
+SOURCE_EXTENSIONS = ['slk', 'txt', 'gz', 'zip']
+
+# Blokgrootte bij het lezen van een (gedecomprimeerde) stream
+READ_CHUNK = 1 << 20
+
+# Zoveel bytes bepalen de encoding van een preview (sniff_encoding met max_bytes)
+PREVIEW_BYTES = READ_CHUNK
+
+# Tot deze grootte blijft een gespoolde stream (stdin, upload) in het geheugen, daarna een tijdelijk bestand
+SPOOL_SIZE = 32 << 20
+
+# Bytes die is_plain_ascii toestaat (een \r alleen vóór een \n); bytes.translate haalt ze in C weg
+PLAIN_BYTES = bytes(range(0x20, 0x7f)) + b'\n\r'
+
+
+class SlkSource(NamedTuple):
+    """Eén SLK export: een bestand, de inhoud van een .gz of een lid van een zip."""
+
+    file: Union[str, BinaryIO]      # pad, of een seekbaar binair bestand (upload, gespoolde stdin)
+    compression: str                # PLAIN, GZIP of ZIP
+    member: Optional[str] = None    # naam in het zip archief
+    label: Optional[str] = None     # naam in meldingen als `file` geen pad is
+
+    @property
+    def name(self) -> str:
+        return f"{self.label_or_path}:{self.member}" if self.member else str(self.label_or_path)
+
+    @property
+    def label_or_path(self) -> str:
+        return self.file if isinstance(self.file, str) else self.label or getattr(self.file, 'name', None) or 'upload'
+
+    @property
+    def picklable(self) -> bool:
+        """Alleen bronnen met een pad kunnen naar een ander proces."""
+        return isinstance(self.file, str)
+
+    @contextmanager
+    def open(self) -> Iterator[BinaryIO]:
+        """Een nieuwe stream met de gedecomprimeerde bytes, vanaf het begin."""
+        with ExitStack() as stack:
+            file = self.file
+            if isinstance(file, str):
+                file = stack.enter_context(open(file, 'rb'))
+            else:
+                # Een upload wordt niet gesloten, alleen teruggespoeld
+                file.seek(0)
+            if self.compression == ZIP:
+                archive = stack.enter_context(zipfile.ZipFile(file))
+                file = stack.enter_context(archive.open(self.member))
+            elif self.compression == GZIP:
+                file = stack.enter_context(gzip.GzipFile(fileobj=file, mode='rb'))
+            yield file
+
+    def size(self) -> int:
+        """Gedecomprimeerde grootte in bytes, zonder de bron te lezen (voor de voortgang)."""
+        with ExitStack() as stack:
+            file = stack.enter_context(open(self.file, 'rb')) if isinstance(self.file, str) else self.file
+            if self.compression == ZIP:
+                with zipfile.ZipFile(file) as archive:
+                    return archive.getinfo(self.member).file_size
+            end = file.seek(0, os.SEEK_END)
+            if self.compression == GZIP and end >= 4:
+                # ISIZE: de laatste 4 bytes van een gzip bestand (modulo 2**32)
+                file.seek(-4, os.SEEK_END)
+                return int.from_bytes(file.read(4), 'little')
+            return end
+
+
+def detect_compression(file: Union[str, BinaryIO]) -> str:
+    """PLAIN, GZIP of ZIP aan de hand van de eerste bytes."""
+    if isinstance(file, str):
+        with open(file, 'rb') as handle:
+            head = handle.read(len(ZIP_MAGIC))
+    else:
+        file.seek(0)
+        head = file.read(len(ZIP_MAGIC))
+        file.seek(0)
+    if head.startswith(ZIP_MAGIC):
+        return ZIP
+    if head.startswith(GZIP_MAGIC):
+        return GZIP
+    return PLAIN
+
+
+def _is_slk_member(info: zipfile.ZipInfo) -> bool:
+    base = os.path.basename(info.filename)
+    # Mappen en de metadata die macOS in een zip zet overslaan
+    return (not info.is_dir() and base.lower().endswith('.slk')
+            and not base.startswith('._') and not info.filename.startswith('__MACOSX/'))
+
+
+def list_sources(file: Union[str, BinaryIO], label: Optional[str] = None) -> List[SlkSource]:
+    """Alle SLK bronnen in een bestand; een zip zonder .slk leden geeft een lege lijst."""
+    compression = detect_compression(file)
+    if compression != ZIP:
+        return [SlkSource(file, compression, label=label)]
+    with zipfile.ZipFile(file) as archive:
+        members = [info.filename for info in archive.infolist() if _is_slk_member(info)]
+    return [SlkSource(file, ZIP, member, label) for member in members]
+
+
+def spool_stream(stream: BinaryIO) -> BinaryIO:
+    """Kopie van een niet-seekbare stream (stdin) die meerdere keren gelezen kan worden; blijft gecomprimeerd."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    shutil.copyfileobj(stream, spool, READ_CHUNK)
+    spool.seek(0)
+    return spool
+
+
+def stage_upload(upload: BinaryIO) -> str:
+    """
+    Een upload klaarzetten voor een worker proces: een tijdelijk bestand (het pad;
+    de aanroeper ruimt het op). Alleen het pad gaat als pickle mee, er ontstaat
+    geen tweede kopie van de upload in het geheugen. Een upload in geheugen
+    (BytesIO, de Streamlit upload) wordt direct uit zijn buffer geschreven.
+    """
+    with tempfile.NamedTemporaryFile(prefix='slk-upload-', delete=False) as file:
+        if hasattr(upload, 'getbuffer'):
+            with upload.getbuffer() as buffer:
+                file.write(buffer)
+        else:
+            upload.seek(0)
+            shutil.copyfileobj(upload, file, READ_CHUNK)
+    return file.name
+
+
+def digest_stream(stream: BinaryIO) -> str:
+    """sha1 van een seekbare stream, in blokken gelezen."""
+    stream.seek(0)
+    digest = hashlib.sha1()
+    for chunk in _chunks(stream):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def source_digest(source: SlkSource) -> str:
+    """sha1 van de gedecomprimeerde inhoud van een bron."""
+    digest = hashlib.sha1()
+    with source.open() as stream:
+        for chunk in _chunks(stream):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _chunks(stream: BinaryIO) -> Iterator[bytes]:
+    while True:
+        chunk = stream.read(READ_CHUNK)
+        if not chunk:
+            return
+        yield chunk
+
+
+def sniff_encoding(source: SlkSource, max_bytes: Optional[int] = None) -> Tuple[str, bool]:
+    """
+    (encoding, alleen printbaar ASCII) van een bron: de eerste encoding uit
+    ENCODINGS_TO_TRY die de hele stream kan decoderen, zoals decode_slk dat op de
+    hele tekst doet. Eén pass per geprobeerde encoding; bijna altijd is dat er één.
+    Met `max_bytes` telt alleen het begin (voor een preview); ASCII is dan nooit bewezen.
+    """
+    plain = max_bytes is None
+    for encoding in ENCODINGS_TO_TRY:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        # Een \r aan het eind van een blok hoort misschien bij een \r\n in het volgende
+        tail = b''
+        read = 0
+        try:
+            with source.open() as stream:
+                for chunk in _chunks(stream):
+                    decoder.decode(chunk)
+                    read += len(chunk)
+                    if max_bytes is not None and read >= max_bytes:
+                        # Niet afronden: het blok kan midden in een teken eindigen
+                        return encoding, False
+                    if plain:
+                        chunk = tail + chunk
+                        tail = chunk[-1:] if chunk.endswith(b'\r') else b''
+                        body = chunk[:len(chunk) - len(tail)]
+                        plain = (body.isascii() and not body.translate(None, PLAIN_BYTES)
+                                 and body.count(b'\r') == body.count(b'\r\n'))
+                decoder.decode(b'', final=True)
+            return encoding, plain and not tail
+        except UnicodeDecodeError:
+            plain = False
+    return 'utf-8', False
+
+
+def iter_lines(stream: BinaryIO, encoding: str) -> Iterator[str]:
+    """De regels van een binaire stream, incrementeel gedecodeerd; dezelfde regels als text.split('\\n')."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='ignore')
+    rest = ''
+    for chunk in _chunks(stream):
+        lines = (rest + decoder.decode(chunk)).split('\n')
+        rest = lines.pop()
+        yield from lines
+    yield rest + decoder.decode(b'', final=True)
+
+
+def read_rit_datum(source: SlkSource, encoding: str) -> str:
+    """De rit datum (Y2;X1); leest tot die gevonden is."""
+    with source.open() as stream:
+        return extract_rit_datum(iter_lines(stream, encoding))
+
+
+def parse_source(source: SlkSource, diagnostics: Optional[ParseDiagnostics] = None,
+                 progress: Optional[ProgressCallback] = None,
+                 provenance: Optional[Provenance] = None) -> Tuple[pd.DataFrame, str]:
+    """
+    Patiënten en rit datum van één bron; hetzelfde resultaat als parse_slk_patients op de hele tekst.
+    De herkomst van de rijen komt met deze bron in `provenance`.
+    """
+    encoding, plain_file = sniff_encoding(source)
+    rit_datum = read_rit_datum(source, encoding)
+    rows = Provenance() if provenance is not None else None
+    with source.open() as stream:
+        df = parse_slk_patients(iter_lines(stream, encoding), diagnostics, encoding, progress, plain_file,
+                                provenance=rows)
+    if provenance is not None:
+        provenance.extend(rows.with_source(source_ref(source, encoding)))
+    return df, rit_datum
+
+
+def preview_source(source: SlkSource, rows: int) -> pd.DataFrame:
+    """
+    De eerste `rows` patiënten. De encoding komt uit de eerste PREVIEW_BYTES en
+    het tokenizen stopt na `rows` patiënten, dus de kosten hangen niet af van de
+    grootte van het bestand.
+    """
+    encoding, _ = sniff_encoding(source, PREVIEW_BYTES)
+    with source.open() as stream:
+        return parse_slk_patients(iter_lines(stream, encoding), encoding=encoding, plain_file=False, limit=rows)
+
+
+def source_ref(source: SlkSource, encoding: str) -> SourceRef:
+    """De bron zoals de herkomst hem bewaart; een pad wordt absoluut, zodat hij later terug te vinden is."""
+    file = os.path.abspath(source.file) if isinstance(source.file, str) else str(source.label_or_path)
+    return SourceRef(file, source.member or '', encoding)
+
+
+def ref_source(ref: SourceRef) -> SlkSource:
+    """Een bron met een pad uit de herkomst weer openen."""
+    return SlkSource(ref.file, ZIP if ref.member else detect_compression(ref.file), ref.member or None)
+
+
+def read_origin(source: SlkSource, origin: Origin) -> str:
+    """Het ruwe record van een cel: een seek naar het begin van zijn rij in de bron."""
+    with source.open() as stream:
+        return read_record(stream, origin)
+
+
+def map_sources(function: Callable, sources: List[SlkSource], workers: Optional[int] = None) -> Iterator:
+    """
+    `function(source)` voor elke bron, resultaten in volgorde. Bronnen met een pad
+    (ook de leden van één zip) gaan parallel door een process pool; uploads en
+    stdin delen één bestand en worden na elkaar verwerkt. `function` moet op
+    moduleniveau staan (eventueel via functools.partial).
+    """
+    workers = min(len(sources), workers or os.cpu_count() or 1)
+    if workers < 2 or not all(source.picklable for source in sources):
+        yield from map(function, sources)
+        return
+    # spawn: hetzelfde gedrag op Windows en Linux (zie ook slk_worker)
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        yield from executor.map(function, sources)
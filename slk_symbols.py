@@ -0,0 +1,65 @@
+"""
+Symbooltabellen en categorical kolommen voor waarden die zich herhalen.
+
+In een fahrdlist komen dezelfde tijden, plaatsen, titels en BHT waarden steeds
+terug, en de output heeft daarnaast lege en vaste kolommen (landcode, rit
+datum). De parser houdt per bestand voor die kolommen een `SymbolTable` bij:
+elke waarde krijgt bij de eerste keer een code en per rij wordt alleen die code
+bewaard. pandas krijgt de kolommen als Categorical (codes plus één keer elke
+waarde), zodat een maand samengevoegde exports een fractie van het geheugen
+kost (zie bench_slk.py).
+
+Bewerkingen per waarde (vouwen, tijden formatteren) lopen via `map_categories`
+over de categorieën in plaats van over elke rij.
+"""
+
+from typing import Callable, Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+# SLK kolommen die de parser als categorical teruggeeft
+CATEGORICAL_COLUMNS = ('erster_termin', 'letzter_termin', 'titel', 'ort', 'bht')
+
+
+class SymbolTable:
+    """Waarde -> code, in de volgorde waarin de waarden voorkomen."""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.codes)
+        return code
+
+    def categorical(self, codes: Iterable[int]) -> pd.Categorical:
+        """De kolom bij deze codes; -1 is een ontbrekende waarde."""
+        return pd.Categorical.from_codes(np.asarray(codes), pd.Index(list(self.codes), dtype=str))
+
+
+def is_categorical(values: pd.Series) -> bool:
+    return isinstance(values.dtype, pd.CategoricalDtype)
+
+
+def constant_column(value: str, n_rows: int) -> pd.Categorical:
+    """Een kolom met overal dezelfde waarde (lege en vaste output kolommen)."""
+    return pd.Categorical.from_codes(np.zeros(n_rows, dtype=np.int8), pd.Index([value], dtype=str))
+
+
+def map_categories(values: pd.Series, function: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    """
+    `function` (van Series naar Series) op de categorieën van een categorical
+    kolom in plaats van op elke rij; het resultaat is weer categorical.
+    """
+    mapped = function(pd.Series(values.cat.categories))
+    # Verschillende categorieën kunnen hetzelfde worden (07:00 en 7:00); factorize voegt ze samen
+    mapping, categories = pd.factorize(mapped.to_numpy(dtype=object))
+    codes = values.cat.codes.to_numpy()
+    if len(mapping):
+        codes = np.where(codes >= 0, mapping[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(codes, pd.Index(categories, dtype=str)), index=values.index, name=values.name)
@@ -0,0 +1,105 @@
+"""
+Vaste opzoektabellen voor het SLK parsen en opschonen.
+
+Alles hier wordt precies één keer opgebouwd bij de import. Streamlit voert
+`simple_app.py` bij elke rerun opnieuw uit, maar geïmporteerde modules blijven
+in `sys.modules` staan, dus deze tabellen en regexen kosten daarna niets meer.
+"""
+
+import re
+import unicodedata
+
+# SLK kolomnummer (X) naar veldnaam
+COLUMN_MAPPING = {
+    2: 'erster_termin',
+    3: 'letzter_termin',
+    4: 'name',
+    5: 'vorname',
+    6: 'titel',
+    7: 'telefon',
+    8: 'strasse',
+    9: 'plz',
+    10: 'ort',
+    11: 'adresszusatz',
+    12: 'bemerkung',
+    13: 'bht',
+    14: 'fallnummer'
+}
+
+# Alle relevante kolommen in de juiste volgorde
+ALL_COLUMNS = list(COLUMN_MAPPING.values())
+
+# Regexen voor de SLK records
+POSITION_RE = re.compile(r'Y(\d+);X(\d+)')
+CK_QUOTED_RE = re.compile(r'C;K"([^"]*)"')
+CK_NUMERIC_RE = re.compile(r'C;K([0-9]+)$')
+
+# Escape sequence + de volgende letter -> de juiste umlaut
+ESCAPE_REPLACEMENTS = {
+    '\x1bNHa': 'ä',  # \x1bNH + a = ä
+    '\x1bNHo': 'ö',  # \x1bNH + o = ö
+    '\x1bNHu': 'ü',  # \x1bNH + u = ü
+    '\x1bNHr': 'ür', # \x1bNH + r = ür (voor "für")
+    '\x1bNOo': 'ö',  # \x1bNO + o = ö
+    '\x1bNUu': 'ü',  # \x1bNU + u = ü
+    '\x1bNSs': 'ß',  # \x1bNS + s = ß (het profiel bepaalt of het ss wordt)
+    '\x1bN{e': 'ße', # \x1bN{ + e = ße (ß escape sequence)
+    # Probeer ook andere varianten
+    '\x1bNUb': 'üb', # \x1bNU + b = üb
+    '\x1bNUc': 'üc', # \x1bNU + c = üc
+}
+ESCAPE_RE = re.compile('|'.join(re.escape(seq) for seq in ESCAPE_REPLACEMENTS))
+
+# Overgebleven escape sequences, inclusief de letter erna ({ is ä in de Duitse 7-bit tekenset)
+STRAY_ESCAPE_RE = re.compile(r'\x1b[A-Z]{2,}[a-z{]?')
+
+# UTF-8 bytes die als Latin-1 gelezen zijn (het profiel vouwt het resultaat daarna, zie slk_profiles)
+ENCODING_FIXES = {
+    'Ã¤': 'ä',  # ä incorrectly encoded
+    'Ã¶': 'ö',  # ö incorrectly encoded
+    'Ã¼': 'ü',  # ü incorrectly encoded
+    'ÃŸ': 'ß',  # ß incorrectly encoded
+    'Ã„': 'Ä',  # Ä incorrectly encoded
+    'Ã–': 'Ö',  # Ö incorrectly encoded
+    'Ãœ': 'Ü',  # Ü incorrectly encoded
+}
+
+# Alleen ß -> ss; umlauts blijven staan
+SHARP_S_TABLE = str.maketrans({'ß': 'ss', 'ẞ': 'SS'})
+
+# ß -> ss en Duitse karakters naar ASCII (voor CSV compatibiliteit), in één translate
+GERMAN_ASCII_TABLE = str.maketrans({
+    'ß': 'ss',
+    'ä': 'a', 'ö': 'o', 'ü': 'u',
+    'Ä': 'A', 'Ö': 'O', 'Ü': 'U',
+})
+
+# Alles buiten printbaar ASCII (controle karakters en niet-ASCII)
+SPECIAL_CHAR_RE = re.compile(r'[^\x20-\x7e]')
+
+# Controle karakters (ook ESC) in een heel bestand, behalve de regeleinden \n en \r\n
+FILE_CONTROL_CHAR_RE = re.compile(r'[\x00-\x09\x0b\x0c\x0e-\x1f\x7f]|\r(?!\n)')
+
+# Encodings die we proberen voor Duitse karakters
+ENCODINGS_TO_TRY = ['utf-8', 'cp1252', 'iso-8859-1', 'windows-1252']
+
+
+def decode_escapes(text: str) -> str:
+    """Vervang alle bekende escape sequences in één regex pass."""
+    if '\x1b' not in text:
+        return text
+    return ESCAPE_RE.sub(lambda m: ESCAPE_REPLACEMENTS[m.group()], text)
+
+
+def is_plain_ascii(text: str) -> bool:
+    """True als de tekst alleen printbaar ASCII en regeleinden bevat."""
+    # isascii() is O(1); de regex is één scan in C
+    return text.isascii() and FILE_CONTROL_CHAR_RE.search(text) is None
+
+
+def strip_control_chars(text: str) -> str:
+    """Verwijder alle Unicode controle karakters (categorie C)."""
+    # isprintable() is False voor elk categorie C karakter, dus dit is een veilige snelle route
+    if text.isprintable():
+        return text
+    return ''.join(c for c in text if unicodedata.category(c)[0] != 'C')
@@ -0,0 +1,198 @@
+"""
+Validatieregels voor de Routemeister output.
+
+De regels zijn declaratief: elke `Rule` beschrijft welk veld gecontroleerd wordt en
+hoe. `compile_rules` zet ze één keer om naar gevectoriseerde kolomcontroles, en
+`validate_output` draait alle controles in één keer over de tabel en geeft een
+rapport met één regel per gevonden probleem.
+
+Een tabel die in batches geschreven wordt (convert_slk.py) gaat door een
+`BatchValidator`: de regels per rij draaien per batch, de regels over de hele
+tabel ('unique') één keer aan het eind, over de bewaarde kolommen van alle
+batches en bronnen.
+"""
+
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from slk_symbols import is_categorical
+
+
+class Rule(NamedTuple):
+    code: str
+    kind: str                 # 'pattern', 'contains', 'required', 'before' of 'unique'
+    fields: Tuple[str, ...]   # logische veldnamen, zie CUSTOM_FORMAT_FIELDS
+    message: str
+    pattern: str = ''
+
+
+DEFAULT_RULES = (
+    Rule('plz', 'pattern', ('plz',), 'PLZ is geen vijfcijferige postcode', r'\d{5}'),
+    Rule('termin_volgorde', 'before', ('erster_termin', 'letzter_termin'),
+         'erster_termin ligt niet voor letzter_termin'),
+    Rule('telefon', 'required', ('telefon',), 'Geen telefoonnummer'),
+    Rule('hausnummer', 'contains', ('strasse',), 'Straat zonder huisnummer', r'\d'),
+    Rule('dubbel_patient', 'unique', ('patient_id',), 'patient ID komt meerdere keren voor'),
+)
+
+# Logische veldnaam -> kolom in de output van convert_to_custom_format
+CUSTOM_FORMAT_FIELDS = {
+    'patient_id': 'patient ID',
+    'strasse': 'strasse+nr',
+    'plz': 'PLZ',
+    'telefon': '1telefon_1',
+    'erster_termin': 'erster_termin',
+    'letzter_termin': 'letze_termin',
+}
+
+REPORT_COLUMNS = ['rij', 'regel', 'kolom', 'waarde', 'melding']
+
+
+def _as_text(values: pd.Series) -> pd.Series:
+    if is_categorical(values):
+        # fillna kan geen nieuwe categorie toevoegen
+        values = values.astype(object)
+    return values.fillna('').astype(str).str.strip()
+
+
+# Elke controle krijgt de kolommen als opgeschoonde tekst en geeft True voor foute rijen
+
+def _pattern_check(pattern: str) -> Callable:
+    regex = re.compile(pattern)
+    return lambda a: ~a.str.fullmatch(regex).astype(bool)
+
+
+def _contains_check(pattern: str) -> Callable:
+    regex = re.compile(pattern)
+    return lambda a: ~a.str.contains(regex).astype(bool)
+
+
+def _required_check(pattern: str) -> Callable:
+    return lambda a: a == ''
+
+
+def _before_check(pattern: str) -> Callable:
+    # Tijden staan als 845 / 1515 in de output; alleen controleren als beide er zijn
+    def check(a, b):
+        start = pd.to_numeric(a.str.replace(':', ''), errors='coerce')
+        end = pd.to_numeric(b.str.replace(':', ''), errors='coerce')
+        return (start >= end).fillna(False).astype(bool)
+    return check
+
+
+def _unique_check(pattern: str) -> Callable:
+    return lambda a: a.duplicated(keep=False) & (a != '')
+
+
+# Regeltypes die de hele tabel nodig hebben, niet alleen de rij zelf
+TABLE_KINDS = ('unique',)
+
+CHECKS = {
+    'pattern': _pattern_check,
+    'contains': _contains_check,
+    'required': _required_check,
+    'before': _before_check,
+    'unique': _unique_check,
+}
+
+
+class CompiledRule(NamedTuple):
+    rule: Rule
+    columns: Tuple[str, ...]
+    check: Callable
+
+
+def compile_rules(rules=DEFAULT_RULES, field_map: Dict[str, str] = None) -> List[CompiledRule]:
+    """Zet regels om naar kolomcontroles voor een bepaald output formaat."""
+    field_map = field_map or CUSTOM_FORMAT_FIELDS
+    compiled = []
+    for rule in rules:
+        if rule.kind not in CHECKS:
+            raise ValueError(f"Onbekend regeltype: {rule.kind}")
+        columns = tuple(field_map[field] for field in rule.fields)
+        compiled.append(CompiledRule(rule, columns, CHECKS[rule.kind](rule.pattern)))
+    return compiled
+
+
+DEFAULT_VALIDATOR = compile_rules()
+
+
+def validate_output(df: pd.DataFrame, validator: List[CompiledRule] = None) -> pd.DataFrame:
+    """Controleer de output en geef per probleem een rij (rij, regel, kolom, waarde, melding)."""
+    validator = DEFAULT_VALIDATOR if validator is None else validator
+    # Regels waarvan de kolommen ontbreken worden overgeslagen
+    active = [c for c in validator if all(col in df.columns for col in c.columns)]
+    if df.empty or not active:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+
+    # Elke gebruikte kolom wordt maar één keer naar tekst omgezet
+    texts = {}
+    for c in active:
+        for col in c.columns:
+            if col not in texts:
+                texts[col] = _as_text(df[col])
+
+    # Alle controles vormen samen één masker (rijen x regels)
+    mask = np.column_stack([
+        c.check(*(texts[col] for col in c.columns)).to_numpy(dtype=bool) for c in active
+    ])
+    rows, rule_idx = mask.nonzero()
+    columns = np.array([c.columns[0] for c in active], dtype=object)
+    values = np.empty(len(rows), dtype=object)
+    for i, c in enumerate(active):
+        hits = rule_idx == i
+        values[hits] = df[c.columns[0]].to_numpy(dtype=object)[rows[hits]]
+    return pd.DataFrame({
+        'rij': df.index.to_numpy()[rows],
+        'regel': np.array([c.rule.code for c in active], dtype=object)[rule_idx],
+        'kolom': columns[rule_idx],
+        'waarde': values,
+        'melding': np.array([c.rule.message for c in active], dtype=object)[rule_idx],
+    }, columns=REPORT_COLUMNS)
+
+
+def summarize_issues(report: pd.DataFrame) -> Dict[str, int]:
+    """Aantal problemen per regel."""
+    return report['regel'].value_counts().to_dict() if not report.empty else {}
+
+
+class BatchValidator:
+    """
+    validate_output over een tabel die in batches langskomt, met doorlopende index.
+    Van de batches worden alleen de kolommen van de tabelregels bewaard (het patient ID).
+    """
+
+    def __init__(self, validator: Optional[List[CompiledRule]] = None):
+        self.validator = DEFAULT_VALIDATOR if validator is None else validator
+        self.row_rules = [c for c in self.validator if c.rule.kind not in TABLE_KINDS]
+        self.table_rules = [c for c in self.validator if c.rule.kind in TABLE_KINDS]
+        self.columns = list(dict.fromkeys(col for c in self.table_rules for col in c.columns))
+        self.reports: List[pd.DataFrame] = []
+        self.kept: Dict[str, List[np.ndarray]] = {col: [] for col in self.columns}
+        self.index: List[np.ndarray] = []
+
+    def add(self, df: pd.DataFrame):
+        self.reports.append(validate_output(df, self.row_rules))
+        self.index.append(df.index.to_numpy())
+        for col in self.columns:
+            # Een ontbrekende kolom telt als leeg, net als een lege cel
+            self.kept[col].append(df[col].to_numpy(dtype=object) if col in df.columns
+                                  else np.full(len(df), '', dtype=object))
+
+    def report(self) -> pd.DataFrame:
+        """Het rapport van alle batches, in dezelfde volgorde als validate_output op de hele tabel."""
+        reports = self.reports
+        if self.index:
+            table = pd.DataFrame({col: np.concatenate(parts) for col, parts in self.kept.items()},
+                                 index=np.concatenate(self.index))
+            reports = reports + [validate_output(table, self.table_rules)]
+        reports = [report for report in reports if not report.empty]
+        if not reports:
+            return pd.DataFrame(columns=REPORT_COLUMNS)
+        report = pd.concat(reports, ignore_index=True)
+        order = {c.rule.code: i for i, c in enumerate(self.validator)}
+        rank = report['regel'].map(order).to_numpy()
+        return report.iloc[np.lexsort((rank, report['rij'].to_numpy()))].reset_index(drop=True)
@@ -0,0 +1,244 @@
+"""
+Achtergrond conversie voor de app.
+
+Tokenizen, opschonen en converteren draaien in een process pool, zodat de
+Streamlit thread (en daarmee andere sessies op dezelfde server) vrij blijft. De
+worker stuurt voortgang via een queue en stopt bij de volgende voortgangsmelding
+zodra het cancel event gezet is.
+
+Met een `jobs_file` komt elke conversie ook in de job queue (slk_jobs), met
+status en tijden naast die van de batch conversies.
+"""
+
+import io
+import multiprocessing
+import os
+import queue
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from typing import BinaryIO, List, NamedTuple, Optional, Union
+
+import pandas as pd
+
+from slk_diagnostics import ParseDiagnostics
+from slk_jobs import UPLOAD, open_queue, worker_name
+from slk_pipeline import (
+    CLEANED,
+    CONVERTED,
+    EMITTED,
+    TOKENIZED,
+    clean_dataframe,
+    convert_to_custom_format,
+    parse_slk_patients,
+    special_char_cells,
+    special_char_mask,
+)
+from slk_provenance import Provenance
+from slk_sources import SlkSource, list_sources, parse_source, preview_source, stage_upload
+
+
+class ConversionCancelled(Exception):
+    """De conversie is door de gebruiker afgebroken."""
+
+
+class ConversionResult(NamedTuple):
+    df: pd.DataFrame                  # geparste SLK kolommen (voor de preview)
+    diagnostics: ParseDiagnostics
+    special_mask: pd.DataFrame
+    special_cells: pd.DataFrame
+    rit_datum: str
+    routemeister_df: pd.DataFrame     # opgeschoonde output met de standaard mapping
+    fields_df: pd.DataFrame           # opgeschoonde SLK kolommen (voor een andere mapping)
+    provenance: Provenance            # herkomst van de rijen (slk_provenance)
+
+
+# Een upload: de bytes, het pad van een tijdelijk bestand (stage_upload) of een seekbaar bestand
+Upload = Union[bytes, str, BinaryIO]
+
+
+def upload_members(upload: Upload) -> List[str]:
+    """De .slk leden van een geüploade zip; leeg voor een gewone of gzip upload."""
+    return [source.member for source in list_sources(_upload_file(upload)) if source.member]
+
+
+def upload_source(upload: Upload, member: Optional[str] = None) -> Optional[SlkSource]:
+    """De upload zelf, of `member` (standaard het eerste .slk lid) van een zip; None voor een zip zonder .slk."""
+    sources = list_sources(_upload_file(upload))
+    return next((source for source in sources if source.member == member), sources[0] if sources else None)
+
+
+def preview_upload(upload: Upload, rows: int, member: Optional[str] = None) -> pd.DataFrame:
+    """
+    De eerste `rows` patiënten van een upload, direct en zonder de worker: het
+    tokenizen stopt daarna, dus dit kost even weinig voor elk bestand.
+    """
+    source = upload_source(upload, member)
+    if source is None:
+        return parse_slk_patients('')
+    return preview_source(source, rows)
+
+
+def _upload_file(upload: Upload) -> Union[str, BinaryIO]:
+    return io.BytesIO(upload) if isinstance(upload, bytes) else upload
+
+
+def run_conversion(upload: Upload, progress_queue=None, cancel_event=None,
+                   profile: Optional[str] = None, phone_style: Optional[str] = None,
+                   member: Optional[str] = None) -> ConversionResult:
+    """
+    De volledige conversie van een upload met een transliteratieprofiel en telefoon stijl;
+    draait in de worker maar werkt ook direct. De upload mag een .slk, .slk.gz of zip
+    zijn; van een zip wordt `member` geconverteerd (standaard het eerste .slk lid).
+    De upload wordt in blokken gelezen en regel voor regel getokeniseerd, er
+    ontstaat dus geen kopie van de hele tekst (slk_sources).
+    """
+    counts = {TOKENIZED: 0, EMITTED: 0, CONVERTED: 0, CLEANED: 0}
+
+    def report(stage: str, done: int):
+        if cancel_event is not None and cancel_event.is_set():
+            raise ConversionCancelled()
+        counts[stage] = done
+        if progress_queue is not None:
+            progress_queue.put(dict(counts))
+
+    source = upload_source(upload, member)
+    diagnostics = ParseDiagnostics()
+    provenance = Provenance()
+    if source is None:
+        # Een zip zonder .slk bestanden
+        df, rit_datum = parse_slk_patients(''), ''
+    else:
+        df, rit_datum = parse_source(source, diagnostics, progress=report, provenance=provenance)
+    report(TOKENIZED, source.size() if source is not None else 0)
+    report(EMITTED, len(df))
+    special_mask = special_char_mask(df)
+    special_cells = special_char_cells(df, special_mask)
+
+    routemeister_df = convert_to_custom_format(df, rit_datum, progress=report, phone_style=phone_style)
+    report(CONVERTED, len(df))
+    # Eerst de output, daarna de SLK kolommen; samen telt dat als twee keer de rijen
+    routemeister_df = clean_dataframe(routemeister_df, progress=report, profile=profile)
+    report(CLEANED, len(df))
+    fields_df = clean_dataframe(df, progress=lambda stage, done: report(stage, len(df) + done), profile=profile)
+    report(CLEANED, 2 * len(df))
+    return ConversionResult(df, diagnostics, special_mask, special_cells,
+                            rit_datum, routemeister_df, fields_df, provenance)
+
+
+def run_queued_conversion(jobs_file: str, job_id: int, *args) -> ConversionResult:
+    """run_conversion voor een job uit de queue: status en tijden komen in de queue."""
+    jobs = open_queue(jobs_file)
+    if not jobs.start(job_id, worker_name()):
+        raise ConversionCancelled()
+    try:
+        with jobs.heartbeat(job_id):
+            result = run_conversion(*args)
+    except ConversionCancelled:
+        jobs.cancel(job_id)
+        raise
+    except Exception as e:
+        jobs.fail(job_id, f"{type(e).__name__}: {e}")
+        raise
+    jobs.finish(job_id, len(result.df))
+    return result
+
+
+class ConversionJob:
+    """Een lopende conversie: future, voortgang en cancel event."""
+
+    def __init__(self, future: Future, progress_queue, cancel_event, total_bytes: int,
+                 staged: Optional[str] = None, jobs_file: Optional[str] = None, job_id: Optional[int] = None):
+        self.future = future
+        self.progress_queue = progress_queue
+        self.cancel_event = cancel_event
+        self.total_bytes = total_bytes
+        self.staged = staged              # tijdelijk bestand met de upload, weg zodra de job klaar is
+        self.jobs_file = jobs_file
+        self.job_id = job_id              # id in de job queue, als de pool er een heeft
+        self.progress = {TOKENIZED: 0, EMITTED: 0, CONVERTED: 0, CLEANED: 0}
+
+    def poll(self) -> dict:
+        """Lees alle nieuwe voortgangsmeldingen; geeft de laatste stand."""
+        while True:
+            try:
+                self.progress = self.progress_queue.get_nowait()
+            except (queue.Empty, EOFError, OSError):
+                return self.progress
+
+    def fraction(self) -> float:
+        """Voortgang tussen 0 en 1: tokenizen, converteren en opschonen tellen elk voor een derde."""
+        tokenized = self.progress[TOKENIZED] / self.total_bytes if self.total_bytes else 1.0
+        rows = self.progress[EMITTED]
+        converted = self.progress[CONVERTED] / rows if rows else 0.0
+        cleaned = self.progress[CLEANED] / (2 * rows) if rows else 0.0
+        return min(1.0, (tokenized + converted + cleaned) / 3)
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.future.cancel()
+        if self.job_id is not None:
+            open_queue(self.jobs_file).cancel(self.job_id)
+        self._discard_staged()
+
+    def result(self) -> Optional[ConversionResult]:
+        """Het resultaat, of None als de conversie is afgebroken."""
+        try:
+            return self.future.result()
+        except (ConversionCancelled, CancelledError):
+            return None
+        finally:
+            self._discard_staged()
+
+    def _discard_staged(self):
+        if self.staged is None:
+            return
+        try:
+            os.remove(self.staged)
+        except OSError:
+            # Op Windows kan de worker hem na een cancel nog open hebben; dan blijft hij in de temp map
+            pass
+        self.staged = None
+
+
+class ConversionPool:
+    """
+    Process pool met een manager voor de voortgangsqueues en cancel events. Met
+    `jobs_file` wordt elke conversie een job in die queue (slk_jobs).
+    """
+
+    def __init__(self, max_workers: int = 2, jobs_file: Optional[str] = None):
+        # spawn in plaats van fork: de Streamlit server draait meerdere threads
+        context = multiprocessing.get_context('spawn')
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+        self.manager = context.Manager()
+        self.jobs_file = jobs_file
+
+    def submit(self, upload: Upload, profile: Optional[str] = None,
+               phone_style: Optional[str] = None, member: Optional[str] = None) -> ConversionJob:
+        """Start een conversie; een bestand (upload) gaat via een tijdelijk bestand naar de worker."""
+        staged = None
+        if isinstance(upload, (bytes, str)):
+            payload = upload
+        else:
+            payload = staged = stage_upload(upload)
+        progress_queue = self.manager.Queue()
+        cancel_event = self.manager.Event()
+        source = upload_source(upload, member)
+        args = (payload, progress_queue, cancel_event, profile, phone_style, member)
+        job_id = None
+        if self.jobs_file is not None and source is not None:
+            # Een upload wordt niet opnieuw geprobeerd: de sessie wacht op het resultaat
+            job_id = open_queue(self.jobs_file).submit(source, options=dict(profile=profile, phone_style=phone_style),
+                                                       kind=UPLOAD, max_attempts=1)
+            future = self.executor.submit(run_queued_conversion, self.jobs_file, job_id, *args)
+        else:
+            future = self.executor.submit(run_conversion, *args)
+        # Voortgang in gedecomprimeerde bytes, zoals de tokenizer ze telt
+        total_bytes = source.size() if source is not None else 0
+        return ConversionJob(future, progress_queue, cancel_event, total_bytes, staged, self.jobs_file, job_id)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.manager.shutdown()
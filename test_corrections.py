@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""De correctietabel (slk_corrections): langste match, geen kettingcorrecties, herladen en fouten."""
+import os
+
+from slk_corrections import CompiledCorrections, CorrectionError, CorrectionTable
+
+
+def test_longest_match_wins():
+    compiled = CompiledCorrections({'HN': 'X', 'HNHarig': 'Härig', 'HNHa': 'Ha'})
+    assert compiled.apply('HNHarig') == 'Härig'
+    assert compiled.apply('HNHans') == 'Hans'
+    assert compiled.apply('HNT') == 'XT'
+    assert compiled.apply('Meyer') == 'Meyer'
+
+
+def test_no_chained_replacement():
+    compiled = CompiledCorrections({'A': 'B', 'B': 'C'})
+    assert compiled.apply('AB') == 'BC'
+    assert compiled.apply('A') == 'B'
+
+
+def test_empty_table():
+    assert CompiledCorrections({}).apply('HNHarig') == 'HNHarig'
+
+
+def test_reload_on_change(tmp_path):
+    path = tmp_path / 'corrections.txt'
+    table = CorrectionTable(str(path))
+    # Nog geen bestand: geen correcties
+    assert len(table.current()) == 0
+
+    path.write_text('# bekende namen\nHNHarig = Härig\n', encoding='utf-8')
+    compiled = table.current()
+    assert compiled.apply('HNHarig') == 'Härig'
+    assert table.current() is compiled
+
+    # Andere grootte, zelfde mtime
+    stat = os.stat(path)
+    path.write_text('HNHarig = Härig\nGNHunther = Günther\n', encoding='utf-8')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert table.current().apply('GNHunther') == 'Günther'
+
+    # Zelfde grootte, andere mtime
+    stat = os.stat(path)
+    path.write_text('HNHarig = Haerig\nGNHunther = Günther\n', encoding='utf-8')
+    assert os.stat(path).st_size == stat.st_size
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert table.current().apply('HNHarig') == 'Haerig'
+
+    os.remove(path)
+    assert len(table.current()) == 0
+
+
+def test_bad_lines_in_errors(tmp_path):
+    path = tmp_path / 'corrections.txt'
+    path.write_text('HNHarig = Härig\ngeen gelijkteken\n\n = leeg\nGNHunther = Günther\n', encoding='utf-8')
+    table = CorrectionTable(str(path))
+    assert len(table.current()) == 2
+    assert table.errors == [CorrectionError(2, 'geen gelijkteken'), CorrectionError(4, '= leeg')]
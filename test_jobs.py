@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""De job queue (slk_jobs): claimen, nieuwe pogingen, gestopte workers en opruimen."""
+import time
+
+import slk_jobs
+from slk_jobs import (BATCH, CANCELLED, DONE, FAILED, MAX_ATTEMPTS, QUEUED, RUNNING, UPLOAD,
+                      JobQueue, run_workers)
+from slk_sources import SlkSource
+
+
+def make_queue(tmp_path) -> JobQueue:
+    return JobQueue(str(tmp_path / 'jobs.sqlite3'))
+
+
+def source(name: str) -> SlkSource:
+    return SlkSource(name, 'none', None)
+
+
+def test_claim_oldest_batch_job_once(tmp_path):
+    jobs = make_queue(tmp_path)
+    upload = jobs.submit(source('upload.slk'), kind=UPLOAD, max_attempts=1)
+    first = jobs.submit(source('a.slk'))
+    second = jobs.submit(source('b.slk'))
+
+    claimed = [jobs.claim('w1'), jobs.claim('w2')]
+    assert [job.id for job in claimed] == [first, second]
+    assert all(job.state == RUNNING and job.attempts == 1 for job in claimed)
+    assert jobs.claim('w3') is None
+    # Uploads start de app zelf
+    assert jobs.job(upload).state == QUEUED
+
+
+def test_submit_stores_absolute_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    jobs = make_queue(tmp_path)
+    job = jobs.job(jobs.submit(source('exports/a.slk')))
+    assert job.file == str(tmp_path / 'exports' / 'a.slk')
+
+
+def test_fail_retries_until_max_attempts(tmp_path):
+    jobs = make_queue(tmp_path)
+    job_id = jobs.submit(source('a.slk'))
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        job = jobs.claim('w1')
+        assert job.id == job_id and job.attempts == attempt
+        assert jobs.fail(job_id, 'kapot') == (attempt < MAX_ATTEMPTS)
+    job = jobs.job(job_id)
+    assert job.state == FAILED and job.error == 'kapot' and job.finished is not None
+    assert jobs.claim('w1') is None
+
+    assert jobs.retry_failed() == 1
+    assert jobs.claim('w1').attempts == 1
+
+
+def test_stale_job_is_recovered(tmp_path):
+    jobs = make_queue(tmp_path)
+    job_id = jobs.submit(source('a.slk'))
+    jobs.claim('w1')
+    # Geen heartbeat meer sinds langer dan HEARTBEAT_TIMEOUT: de worker is gestopt
+    stopped = time.time() - slk_jobs.HEARTBEAT_TIMEOUT - 1
+    jobs.db.execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (stopped, job_id))
+
+    job = jobs.claim('w2')
+    assert job.id == job_id and job.worker == 'w2' and job.attempts == 2
+
+
+def test_running_job_with_heartbeat_is_kept(tmp_path, monkeypatch):
+    monkeypatch.setattr(slk_jobs, 'HEARTBEAT_INTERVAL', 0.01)
+    jobs = make_queue(tmp_path)
+    job_id = jobs.submit(source('a.slk'))
+    jobs.claim('w1')
+    # Lang bezig, maar de worker leeft nog
+    long_ago = time.time() - 10 * slk_jobs.HEARTBEAT_TIMEOUT
+    jobs.db.execute("UPDATE jobs SET started = ?, heartbeat = ? WHERE id = ?", (long_ago, long_ago, job_id))
+    with jobs.heartbeat(job_id):
+        deadline = time.time() + 5
+        while jobs.job(job_id).heartbeat == long_ago and time.time() < deadline:
+            time.sleep(0.01)
+        assert jobs.claim('w2') is None
+    job = jobs.job(job_id)
+    assert job.state == RUNNING and job.worker == 'w1'
+
+
+def test_stale_last_attempt_fails(tmp_path):
+    jobs = make_queue(tmp_path)
+    job_id = jobs.submit(source('upload.slk'), kind=UPLOAD, max_attempts=1)
+    assert jobs.start(job_id, 'app')
+    stopped = time.time() - slk_jobs.HEARTBEAT_TIMEOUT - 1
+    jobs.db.execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (stopped, job_id))
+
+    jobs.prune()
+    job = jobs.job(job_id)
+    assert job.state == FAILED and job.finished is not None
+
+
+def test_prune_expires_uploads_and_removes_old_jobs(tmp_path):
+    jobs = make_queue(tmp_path)
+    waiting = jobs.submit(source('upload.slk'), kind=UPLOAD, max_attempts=1)
+    old = jobs.submit(source('oud.slk'))
+    recent = jobs.submit(source('nieuw.slk'))
+    now = time.time()
+    jobs.db.execute("UPDATE jobs SET submitted = ? WHERE id = ?", (now - slk_jobs.UPLOAD_TIMEOUT - 1, waiting))
+    jobs.db.execute("UPDATE jobs SET state = ?, finished = ? WHERE id = ?",
+                    (DONE, now - slk_jobs.KEEP_DAYS * 86400 - 1, old))
+    jobs.db.execute("UPDATE jobs SET state = ?, finished = ? WHERE id = ?", (DONE, now, recent))
+
+    assert jobs.prune() == 1
+    assert jobs.job(old) is None
+    assert jobs.job(recent).state == DONE
+    assert jobs.job(waiting).state == CANCELLED
+    assert not jobs.start(waiting, 'app')
+
+
+def test_old_queue_gets_heartbeat_column(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite3')
+    jobs = JobQueue(path)
+    jobs.db.execute("ALTER TABLE jobs DROP COLUMN heartbeat")
+    jobs.close()
+    jobs = JobQueue(path)
+    job_id = jobs.submit(source('a.slk'))
+    assert jobs.claim('w1').heartbeat is not None
+    assert jobs.job(job_id).kind == BATCH
+
+
+def test_run_workers_skips_unfinished_old_jobs(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite3')
+    jobs = JobQueue(path)
+    job_id = jobs.submit(source('a.slk'))
+    # Een mislukte job van een oude queue, zonder eindtijd
+    jobs.db.execute("UPDATE jobs SET state = ?, finished = NULL WHERE id = ?", (FAILED, job_id))
+    assert list(run_workers(path, workers=2)) == []
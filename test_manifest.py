@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Het manifest van batch_convert (slk_manifest): overslaan, opnieuw converteren en een halve regel."""
+import os
+import shutil
+import sys
+
+import batch_convert
+from slk_manifest import MANIFEST_NAME, Manifest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EXPORTS = [os.path.join(HERE, 'fahrdlist20250627.slk'),
+           os.path.join(HERE, 'reha bonn exports', 'fahrdlist20250808.slk')]
+
+
+def setup_exports(tmp_path):
+    exports = tmp_path / 'exports'
+    exports.mkdir()
+    for path in EXPORTS:
+        shutil.copy(path, exports)
+    return exports, tmp_path / 'out'
+
+
+def run(monkeypatch, capsys, exports, out_dir, *args) -> str:
+    """batch_convert.py op de exports; geeft de meldingen."""
+    monkeypatch.setattr(sys, 'argv', ['batch_convert.py', str(exports / '*.slk'), '--out-dir', str(out_dir),
+                                      '--workers', '1', *args])
+    batch_convert.main()
+    return capsys.readouterr().err
+
+
+def test_rerun_skips(tmp_path, monkeypatch, capsys):
+    exports, out_dir = setup_exports(tmp_path)
+    log = run(monkeypatch, capsys, exports, out_dir)
+    assert '📈 2 geconverteerd, 0 overgeslagen' in log
+    assert len(Manifest(str(out_dir / MANIFEST_NAME))) == 2
+    output = out_dir / 'fahrdlist20250627.csv'
+    converted = os.stat(output).st_mtime_ns
+
+    log = run(monkeypatch, capsys, exports, out_dir)
+    assert '📈 0 geconverteerd, 2 overgeslagen' in log
+    assert os.stat(output).st_mtime_ns == converted
+
+    # Zelfde inhoud met een nieuwe mtime: overgeslagen, en de volgende run hoeft niet te hashen
+    source = exports / 'fahrdlist20250627.slk'
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert '📈 0 geconverteerd, 2 overgeslagen' in run(monkeypatch, capsys, exports, out_dir)
+    manifest = Manifest(str(out_dir / MANIFEST_NAME))
+    assert (str(source), '', stat.st_size, stat.st_mtime_ns + 10 ** 9) in manifest.digests
+
+    # Gewijzigde inhoud of een verdwenen output: opnieuw
+    with open(source, 'ab') as file:
+        file.write(b'\r\n')
+    os.remove(out_dir / 'fahrdlist20250808.csv')
+    assert '📈 2 geconverteerd, 0 overgeslagen' in run(monkeypatch, capsys, exports, out_dir)
+
+
+def test_changed_options_reconvert(tmp_path, monkeypatch, capsys):
+    exports, out_dir = setup_exports(tmp_path)
+    run(monkeypatch, capsys, exports, out_dir)
+    output = out_dir / 'fahrdlist20250627.csv'
+    before = output.read_bytes()
+
+    log = run(monkeypatch, capsys, exports, out_dir, '--phones', 'e164')
+    assert '📈 2 geconverteerd, 0 overgeslagen' in log
+    assert output.read_bytes() != before
+    assert '📈 0 geconverteerd, 2 overgeslagen' in run(monkeypatch, capsys, exports, out_dir, '--phones', 'e164')
+    # --force negeert het manifest
+    assert '📈 2 geconverteerd, 0 overgeslagen' in run(monkeypatch, capsys, exports, out_dir, '--phones', 'e164',
+                                                       '--force')
+
+
+def test_torn_last_line_ignored(tmp_path, monkeypatch, capsys):
+    exports, out_dir = setup_exports(tmp_path)
+    run(monkeypatch, capsys, exports, out_dir)
+    path = out_dir / MANIFEST_NAME
+    lines = path.read_bytes().splitlines(keepends=True)
+    # Een run die stopte midden in het schrijven van de laatste regel
+    path.write_bytes(lines[0] + lines[1][:len(lines[1]) // 2])
+    manifest = Manifest(str(path))
+    assert len(manifest) == 1 and manifest.torn
+
+    log = run(monkeypatch, capsys, exports, out_dir)
+    assert '📈 1 geconverteerd, 1 overgeslagen' in log
+    # De nieuwe regel begint op een eigen regel, dus het manifest is weer heel
+    manifest = Manifest(str(path))
+    assert len(manifest) == 2 and not manifest.torn
+    assert '📈 0 geconverteerd, 2 overgeslagen' in run(monkeypatch, capsys, exports, out_dir)
@@ -1,42 +1,72 @@
 #!/usr/bin/env python3
-import re
-
-def test_slk_parsing():
-    with open('reha bonn.slk', 'r', encoding='utf-8') as f:
-        file_content = f.read()
-    
-    last_row = None
-    last_col = None
-    
-    print("=== TEST SLK PARSING ===")
-    
-    for line_num, line in enumerate(file_content.split('\n'), 1):
-        line = line.strip()
-        
-        # Check voor positie
-        pos_match = re.search(r'Y(\d+);X(\d+)', line)
-        if pos_match:
-            last_row = int(pos_match.group(1))
-            last_col = int(pos_match.group(2))
-            continue
-            
-        # Check voor data - alleen voor namen (kolom 4 en 5)
-        if line.startswith('C;K') and last_row is not None and last_col is not None:
-            if last_row >= 4 and last_col in [4, 5]:  # name, vorname
-                print(f"Regel {line_num}: {repr(line)} (Y{last_row};X{last_col})")
-                
-                # Probeer met quotes
-                match = re.search(r'C;K"([^"]*)"', line)
-                if match:
-                    value = match.group(1)
-                    print(f"  → Gevonden waarde: '{value}'")
-                    if 'arig' in value or 'ubra' in value:
-                        print(f"  → PROBLEMATISCH: {repr(value)}")
-                        for i, char in enumerate(value):
-                            print(f"    Char {i}: '{char}' (ord={ord(char)})")
-                else:
-                    print(f"  → GEEN MATCH")
-                print()
-
-if __name__ == "__main__":
-    test_slk_parsing()
+"""Escape sequences en niet-ASCII bytes in de namen (X4, X5) vinden met slk_inspect."""
+import functools
+import io
+
+import slk_inspect
+from slk_index import load_index
+from slk_inspect import inspect_file, scan_bytes
+
+# Rij 2: Özlem met een escape sequence, rij 3: Özlem als UTF-8, rij 4: een escape buiten de namen
+SLK = (
+    'ID;PWXL;N;E\r\n'
+    'F;Y2;X4\r\nC;K"Yilmaz"\r\n'
+    'F;Y2;X5\r\nC;K"\x1bNOozlem"\r\n'
+    'F;Y3;X4\r\nC;K"Demir"\r\n'
+    'F;Y3;X5\r\nC;K"Özlem"\r\n'
+    'F;Y4;X8\r\nC;K"Bl\x1bNHucherstrasse 24"\r\n'
+    'E\r\n'
+).encode('utf-8')
+
+
+def write_slk(tmp_path) -> str:
+    path = tmp_path / 'namen.slk'
+    path.write_bytes(SLK)
+    return str(path)
+
+
+def inspect(path: str, **kwargs) -> list:
+    out = io.StringIO()
+    inspect_file(path, out=out, **kwargs)
+    return out.getvalue().splitlines()
+
+
+def test_scan_bytes_offsets():
+    high, esc, newlines = scan_bytes(SLK)
+    # Één offset per niet-ASCII reeks, niet per byte van het UTF-8 teken
+    assert high.tolist() == [SLK.index('Ö'.encode('utf-8'))]
+    assert esc.tolist() == [SLK.index(b'\x1bNOo'), SLK.index(b'\x1bNHu')]
+    assert len(newlines) == SLK.count(b'\n')
+
+
+def test_summary(tmp_path):
+    path = write_slk(tmp_path)
+    summary, = inspect(path)
+    assert f"{len(SLK)} bytes" in summary
+    assert '1 niet-ASCII, 2 escapes' in summary
+
+
+def test_escape_and_non_ascii_hits(tmp_path):
+    path = write_slk(tmp_path)
+    escape_offset, utf8_offset = SLK.index(b'\x1bNOo'), SLK.index('Ö'.encode('utf-8'))
+    _, escape, non_ascii, street = inspect(path, escapes=True, non_ascii=True)
+    assert f"@{escape_offset} " in escape
+    assert 'Y2;X5' in escape and "'\\x1bNOo' -> 'ö'" in escape
+    assert f"@{utf8_offset} " in non_ascii
+    assert 'Y3;X5' in non_ascii and "c3 96 = 'Ö'" in non_ascii
+    assert 'Y4;X8' in street and "-> 'ü'" in street
+
+
+def test_names_only(tmp_path, monkeypatch):
+    # De index in tmp_path, niet in .slk_index naast de code
+    monkeypatch.setattr(slk_inspect, 'load_index', functools.partial(load_index, cache_dir=str(tmp_path / 'index')))
+    path = write_slk(tmp_path)
+    _, *hits = inspect(path, cols=[4, 5], escapes=True, non_ascii=True)
+    assert [hit.split()[3] for hit in hits] == ['Y2;X5', 'Y3;X5']
+
+
+def test_limit(tmp_path):
+    path = write_slk(tmp_path)
+    lines = inspect(path, escapes=True, non_ascii=True, limit=1)
+    assert len(lines) == 3
+    assert lines[-1].strip() == '... en nog 2 (zie --limit)'
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Telefoonnummers splitsen en normaliseren (slk_phones), en de CSV houdt 19 kolommen."""
+import csv
+import os
+
+import pandas as pd
+import pytest
+
+from convert_slk import SAMPLE_COLUMNS, convert_file
+from slk_phones import PHONE_COLUMNS, extract_phones, join_phones, normalize_phone
+
+SLK = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fahrdlist20250627.slk')
+
+
+@pytest.mark.parametrize('number, national, e164', [
+    ('+49 228 123456', '0049228123456', '+49228123456'),
+    ('0049228123456', '0049228123456', '+49228123456'),
+    ('0228/123456', '0049228123456', '+49228123456'),
+    ('+31201234567', '0031201234567', '+31201234567'),
+    # Zonder kengetal: niet te normaliseren
+    ('123456', '123456', '123456'),
+])
+def test_normalize_phone(number, national, e164):
+    assert normalize_phone(number, 'national') == national
+    assert normalize_phone(number, 'e164') == e164
+
+
+def test_extract_phones():
+    telefon = pd.Series(['0228 123456', '02241880514, 01603112992 ', '0228 1; 0228 2/0228 3 , 0228 4', '', None])
+    phones = extract_phones(telefon)
+    assert list(phones.columns) == PHONE_COLUMNS
+    assert phones.values.tolist() == [
+        ['0228', '123456', ''],
+        ['02241880514', '01603112992', ''],
+        ['0228', '1', '0228, 2, 0228, 3, 0228, 4'],
+        ['', '', ''],
+        ['', '', ''],
+    ]
+
+
+def test_three_numbers_overflow_normalized():
+    telefon = pd.Series(['0228111, +49228222; 0049228333/0228444', '02241880514'])
+    phones = extract_phones(telefon, 'e164')
+    assert phones.values.tolist() == [
+        ['+49228111', '+49228222', '+49228333, +49228444'],
+        ['+492241880514', '', ''],
+    ]
+    assert join_phones(phones).tolist() == ['+49228111, +49228222, +49228333, +49228444', '+492241880514']
+
+
+def test_unknown_style():
+    with pytest.raises(ValueError):
+        extract_phones(pd.Series(['0228123']), 'international')
+
+
+@pytest.mark.parametrize('style', [None, 'national', 'e164'])
+def test_csv_keeps_columns(tmp_path, style):
+    output = tmp_path / 'out.csv'
+    summary = convert_file(SLK, str(output), phone_style=style, output_format='csv')
+    with open(output, encoding='utf-8', newline='') as file:
+        rows = list(csv.reader(file, delimiter=';'))
+    assert len(SAMPLE_COLUMNS) == 19
+    assert len(rows) == summary.patients > 0
+    assert {len(row) for row in rows} == {19}
+    # Eerste patiënt: '0228-43328686, 01735176280 '
+    expected = {
+        None: '0228-43328686, 01735176280 ',
+        'national': '004922843328686, 00491735176280',
+        'e164': '+4922843328686, +491735176280',
+    }
+    assert rows[0][SAMPLE_COLUMNS.index('0049 215222111')] == expected[style]
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""ß -> ss is een keuze van het profiel (slk_profiles), op elke manier waarop een ß binnenkomt."""
+import pandas as pd
+import pytest
+
+from slk_pipeline import clean_dataframe, clean_value, parse_slk_patients
+
+# Dezelfde straat als echte ß, als mojibake en als de twee escape sequences
+SPELLINGS = ['Straße 1', 'StraÃŸe 1', 'Stra\x1bN{e 1', 'Stra\x1bNSse 1']
+
+EXPECTED = {
+    'unicode': 'Straße 1',
+    'umlauts': 'Strasse 1',
+    'german_ascii': 'Strasse 1',
+    'ascii': 'Strasse 1',
+}
+
+
+def parsed_street(value: str) -> pd.DataFrame:
+    """Een SLK met één patiënt met deze straat, door de parser (decode_cell)."""
+    slk = f'ID;PWXL;N;E\nF;Y4;X2\nC;K"845"\nF;Y4;X4\nC;K"Meyer"\nF;Y4;X8\nC;K"{value}"\nE\n'
+    return parse_slk_patients(slk)
+
+
+@pytest.mark.parametrize('profile', list(EXPECTED))
+@pytest.mark.parametrize('value', SPELLINGS)
+def test_sharp_s_follows_profile(profile, value):
+    df = parsed_street(value)
+    assert df.loc[0, 'strasse'] == ('Straße 1' if '\x1b' in value else value)
+    assert clean_dataframe(df, profile=profile).loc[0, 'strasse'] == EXPECTED[profile]
+    if '\x1b' not in value:
+        assert clean_value(value, profile=profile) == EXPECTED[profile]
+
+
+def test_unicode_keeps_umlauts_and_sharp_s():
+    assert clean_value('Blücherstraße', profile='unicode') == 'Blücherstraße'
+    assert clean_value('Blücherstraße', profile='umlauts') == 'Blücherstrasse'
+    assert clean_value('Blücherstraße', profile='german_ascii') == 'Blucherstrasse'
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Een export als .slk, als .slk.gz en in een zip geeft dezelfde patiënten (slk_sources)."""
+import gzip
+import os
+import zipfile
+
+import pandas as pd
+
+from convert_slk import convert_file
+from slk_pipeline import concat_tables, decode_slk, parse_slk_patients
+from slk_provenance import Provenance
+from slk_sources import GZIP, PLAIN, ZIP, list_sources, parse_source, sniff_encoding
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIRST = os.path.join(HERE, 'fahrdlist20250627.slk')
+SECOND = os.path.join(HERE, 'reha bonn exports', 'fahrdlist20250808.slk')
+
+
+def read(path: str) -> bytes:
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+def write_gz(tmp_path) -> str:
+    path = str(tmp_path / 'export.slk.gz')
+    with gzip.open(path, 'wb') as file:
+        file.write(read(FIRST))
+    return path
+
+
+def write_zip(tmp_path) -> str:
+    path = str(tmp_path / 'exports.zip')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('juni/eerste.slk', read(FIRST))
+        archive.writestr('__MACOSX/juni/._eerste.slk', b'\x00')
+        archive.writestr('lees mij.txt', b'geen export')
+        archive.writestr('augustus/tweede.SLK', read(SECOND))
+    return path
+
+
+def assert_same(df: pd.DataFrame, expected: pd.DataFrame):
+    pd.testing.assert_frame_equal(df, expected)
+    assert df.attrs == expected.attrs
+
+
+def test_list_sources(tmp_path):
+    assert [(source.compression, source.member) for source in list_sources(FIRST)] == [(PLAIN, None)]
+    assert [(source.compression, source.member) for source in list_sources(write_gz(tmp_path))] == [(GZIP, None)]
+    members = [(source.compression, source.member) for source in list_sources(write_zip(tmp_path))]
+    assert members == [(ZIP, 'juni/eerste.slk'), (ZIP, 'augustus/tweede.SLK')]
+
+
+def test_gz_and_stream_equal_whole_text(tmp_path):
+    plain, = list_sources(FIRST)
+    packed, = list_sources(write_gz(tmp_path))
+    text, encoding = decode_slk(read(FIRST))
+    whole = parse_slk_patients(text, encoding=encoding, plain_file=sniff_encoding(plain)[1])
+    assert len(whole) > 0
+
+    df, rit_datum = parse_source(plain)
+    assert_same(df, whole)
+    gz_df, gz_rit_datum = parse_source(packed)
+    assert_same(gz_df, whole)
+    assert gz_rit_datum == rit_datum
+
+
+def test_zip_members_numbered_on(tmp_path):
+    first, second = list_sources(write_zip(tmp_path))
+    expected = [parse_source(source)[0] for source in list_sources(FIRST) + list_sources(SECOND)]
+    provenance = Provenance()
+    frames = [parse_source(source, provenance=provenance)[0] for source in (first, second)]
+    for df, plain in zip(frames, expected):
+        assert_same(df, plain)
+
+    df = concat_tables(frames)
+    assert_same(df, concat_tables(expected))
+    assert df.index.equals(pd.RangeIndex(len(expected[0]) + len(expected[1])))
+    # De herkomst loopt door: de eerste rij van het tweede lid komt uit dat lid, met zijn eigen regels
+    assert len(provenance) == len(df)
+    boundary = len(expected[0])
+    assert provenance.locate(boundary - 1, 'name').source.member == 'juni/eerste.slk'
+    second_provenance = Provenance()
+    parse_source(list_sources(SECOND)[0], provenance=second_provenance)
+    origin, plain_origin = provenance.locate(boundary, 'name'), second_provenance.locate(0, 'name')
+    assert origin.source.member == 'augustus/tweede.SLK'
+    assert (origin.line, origin.row_offset) == (plain_origin.line, plain_origin.row_offset)
+
+
+def test_convert_zip_writes_both_members(tmp_path):
+    outputs, issues = [], []
+    for path in (FIRST, SECOND):
+        output = str(tmp_path / (os.path.basename(path) + '.csv'))
+        issues.append(convert_file(path, output, output_format='csv', workers=1).issues)
+        outputs.append(read(output).splitlines())
+    output = str(tmp_path / 'exports.csv')
+    summary = convert_file(write_zip(tmp_path), output, output_format='csv', workers=1)
+
+    # Het sample formaat heeft geen kop, dus de rijen van de leden staan gewoon achter elkaar
+    rows = read(output).splitlines()
+    assert rows == outputs[0] + outputs[1]
+    assert summary.patients == len(rows)
+    # De validatie noemt de rij in de hele output, niet in het lid
+    expected = list(issues[0]['rij']) + [row + len(outputs[0]) for row in issues[1]['rij']]
+    assert expected and list(summary.issues['rij']) == expected
+
+
+def test_convert_zip_reports_duplicate_members(tmp_path):
+    path = str(tmp_path / 'twee.zip')
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('a.slk', read(FIRST))
+        archive.writestr('b.slk', read(FIRST))
+    single = convert_file(FIRST, str(tmp_path / 'een.csv'), output_format='csv', workers=1)
+    summary = convert_file(path, str(tmp_path / 'twee.csv'), output_format='csv', workers=1)
+
+    assert summary.patients == 2 * single.patients
+    duplicates = summary.issues[summary.issues['regel'] == 'dubbel_patient']
+    # Elke patiënt staat in beide leden: alle rijen van de output
+    assert sorted(duplicates['rij']) == list(range(summary.patients))
+    assert not (single.issues['regel'] == 'dubbel_patient').any()
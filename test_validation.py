@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""Validatie van een tabel in batches (slk_validation.BatchValidator) gelijk aan die van de hele tabel."""
+import pandas as pd
+
+from slk_validation import REPORT_COLUMNS, BatchValidator, summarize_issues, validate_output
+
+
+def output_table() -> pd.DataFrame:
+    return pd.DataFrame({
+        'patient ID': ['FL1', 'FL2', 'FL3', 'FL1', '', 'FL2', 'FL4'],
+        'strasse+nr': ['Alst 6', 'Alst', 'Ring 1', 'Alst 6', 'Weg 2', 'Alst', 'Ring 3'],
+        'PLZ': ['41379', '4137', '53111', '41379', '53111', '4137', '53111'],
+        '1telefon_1': ['0228', '', '0228', '0228', '0228', '', '0228'],
+        'erster_termin': ['845', '1515', '800', '845', '800', '1515', '800'],
+        'letze_termin': ['1515', '845', '830', '1515', '830', '845', '830'],
+    })
+
+
+def test_batches_equal_whole_table():
+    df = output_table()
+    expected = validate_output(df)
+    validation = BatchValidator()
+    for start in range(0, len(df), 2):
+        validation.add(df.iloc[start:start + 2])
+    report = validation.report()
+    pd.testing.assert_frame_equal(report, expected)
+    # FL1 en FL2 staan elk in twee batches
+    assert summarize_issues(report)['dubbel_patient'] == 4
+
+
+def test_no_batches():
+    report = BatchValidator().report()
+    assert report.empty and list(report.columns) == REPORT_COLUMNS
@@ -0,0 +1,160 @@
+# Teksten voor de interface in alle ondersteunde talen
+
+TRANSLATIONS = {
+    "Nederlands": {
+        "title": "Routemeister converter tool",
+        "subtitle": "Meditec Export Reha Bonn  > Routemeister import",
+        "upload": "Upload SLK Bestand",
+        "select_file": "Selecteer een SLK bestand om te converteren",
+        "mapping": "⚙️ Kolom Mapping Configuratie (optioneel)",
+        "mapping_desc": "Configureer hoe de SLK kolommen moeten worden omgezet:",
+        "preview": "📊 Data Preview",
+        "input_data": "📁 Input Data (SLK)",
+        "found_columns": "📊 Gevonden Kolommen",
+        "output_data": "🔄 Output Data (Excel)",
+        "success": "✅ Conversie voltooid!",
+        "download": "📥 Download Excel bestand",
+        "warning_special": "⚠️ {n} cel(len) bevatten speciale of niet-toegestane tekens. Deze zijn lichtrood gemarkeerd. Pas het SLK-bestand aan en probeer opnieuw te converteren.",
+        "no_data": "❌ Geen data gevonden in het SLK bestand",
+        "processing": "SLK bestand wordt geparsed...",
+        "converting": "Data wordt geconverteerd...",
+        "page": "Pagina",
+        "special_cells": "🔍 Cellen met speciale tekens",
+        "warning_issues": "⚠️ {n} validatieprobleem/-problemen in {rows} rij(en). Deze rijen worden mogelijk door Routemeister geweigerd.",
+        "validation_report": "🩺 Validatie rapport",
+        "provenance": "🔎 Herkomst van een cel",
+        "provenance_row": "Rij (vanaf 0)",
+        "provenance_column": "Kolom",
+        "provenance_missing": "Deze rij heeft geen record voor {field}.",
+        "warning_parser": "⚠️ {n} SLK record(s) konden niet (volledig) gelezen worden. Zie het parser rapport.",
+        "parser_report": "🧾 Parser rapport",
+        "parser_report_truncated": "Eerste {shown} van {n} meldingen getoond.",
+        "preset": "Mapping preset",
+        "load_preset": "📂 Laden",
+        "apply_mapping": "✅ Mapping toepassen",
+        "preset_name": "Naam voor nieuwe preset",
+        "save_preset": "💾 Opslaan",
+        "preset_saved": "Preset '{name}' opgeslagen",
+        "cancel": "⏹️ Annuleren",
+        "progress": "{bytes} van {total} bytes gelezen · {rows} rijen · {converted} geconverteerd · {cleaned} opgeschoond",
+        "cancelled": "Conversie afgebroken",
+        "restart": "🔄 Opnieuw starten",
+        "profile": "Tekens in de export",
+        "profile_unicode": "Unicode (umlauts behouden)",
+        "profile_umlauts": "Umlauts behouden, ß → ss",
+        "profile_german_ascii": "Duits ASCII (ä → a, ß → ss)",
+        "profile_ascii": "ASCII voor alle namen (ç, ł, ğ → c, l, g)",
+        "phone_style": "Telefoonnummers",
+        "phone_style_keep": "Zoals in het bestand",
+        "phone_style_national": "Internationaal met 00 (0049...)",
+        "phone_style_e164": "E.164 (+49...)",
+        "download_format": "Downloadformaat",
+        "archive_member": "Export uit het archief",
+        "preview_partial": "Eerste {n} patiënten; de volledige conversie loopt nog",
+        "select_language": "Taal / Sprache / Language"
+    },
+    "Deutsch": {
+        "title": "Routemeister Konverter-Tool",
+        "subtitle": "Meditec Export Reha Bonn  > Routemeister Import",
+        "upload": "SLK Datei hochladen",
+        "select_file": "Wählen Sie eine SLK-Datei zum Konvertieren aus",
+        "mapping": "⚙️ Spaltenzuordnung (optional)",
+        "mapping_desc": "Konfigurieren Sie, wie die SLK-Spalten zugeordnet werden:",
+        "preview": "📊 Datenvorschau",
+        "input_data": "📁 Eingabedaten (SLK)",
+        "found_columns": "📊 Gefundene Spalten",
+        "output_data": "🔄 Ausgabedaten (Excel)",
+        "success": "✅ Konvertierung abgeschlossen!",
+        "download": "📥 Excel-Datei herunterladen",
+        "warning_special": "⚠️ {n} Zelle(n) enthalten spezielle oder nicht erlaubte Zeichen. Diese sind hellrot markiert. Bitte passen Sie die SLK-Datei an und versuchen Sie es erneut.",
+        "no_data": "❌ Keine Daten in der SLK-Datei gefunden",
+        "processing": "SLK-Datei wird geparst...",
+        "converting": "Daten werden konvertiert...",
+        "page": "Seite",
+        "special_cells": "🔍 Zellen mit Sonderzeichen",
+        "warning_issues": "⚠️ {n} Validierungsproblem(e) in {rows} Zeile(n). Diese Zeilen werden von Routemeister möglicherweise abgelehnt.",
+        "validation_report": "🩺 Validierungsbericht",
+        "provenance": "🔎 Herkunft einer Zelle",
+        "provenance_row": "Zeile (ab 0)",
+        "provenance_column": "Spalte",
+        "provenance_missing": "Diese Zeile hat keinen Datensatz für {field}.",
+        "warning_parser": "⚠️ {n} SLK-Datensatz/-sätze konnten nicht (vollständig) gelesen werden. Siehe Parser-Bericht.",
+        "parser_report": "🧾 Parser-Bericht",
+        "parser_report_truncated": "Die ersten {shown} von {n} Meldungen werden angezeigt.",
+        "preset": "Mapping-Vorlage",
+        "load_preset": "📂 Laden",
+        "apply_mapping": "✅ Zuordnung anwenden",
+        "preset_name": "Name für neue Vorlage",
+        "save_preset": "💾 Speichern",
+        "preset_saved": "Vorlage '{name}' gespeichert",
+        "cancel": "⏹️ Abbrechen",
+        "progress": "{bytes} von {total} Bytes gelesen · {rows} Zeilen · {converted} konvertiert · {cleaned} bereinigt",
+        "cancelled": "Konvertierung abgebrochen",
+        "restart": "🔄 Neu starten",
+        "profile": "Zeichen im Export",
+        "profile_unicode": "Unicode (Umlaute behalten)",
+        "profile_umlauts": "Umlaute behalten, ß → ss",
+        "profile_german_ascii": "Deutsches ASCII (ä → a, ß → ss)",
+        "profile_ascii": "ASCII für alle Namen (ç, ł, ğ → c, l, g)",
+        "phone_style": "Telefonnummern",
+        "phone_style_keep": "Wie in der Datei",
+        "phone_style_national": "International mit 00 (0049...)",
+        "phone_style_e164": "E.164 (+49...)",
+        "download_format": "Download-Format",
+        "archive_member": "Export aus dem Archiv",
+        "preview_partial": "Erste {n} Patienten; die vollständige Konvertierung läuft noch",
+        "select_language": "Taal / Sprache / Language"
+    },
+    "English": {
+        "title": "Routemeister converter tool",
+        "subtitle": "Meditec Export Reha Bonn  > Routemeister import",
+        "upload": "Upload SLK file",
+        "select_file": "Select an SLK file to convert",
+        "mapping": "⚙️ Column Mapping (optional)",
+        "mapping_desc": "Configure how the SLK columns should be mapped:",
+        "preview": "📊 Data Preview",
+        "input_data": "📁 Input Data (SLK)",
+        "found_columns": "📊 Found Columns",
+        "output_data": "🔄 Output Data (Excel)",
+        "success": "✅ Conversion completed!",
+        "download": "📥 Download Excel file",
+        "warning_special": "⚠️ {n} cell(s) contain special or disallowed characters. These are highlighted in light red. Please adjust the SLK file and try again.",
+        "no_data": "❌ No data found in the SLK file",
+        "processing": "Parsing SLK file...",
+        "converting": "Converting data...",
+        "page": "Page",
+        "special_cells": "🔍 Cells with special characters",
+        "warning_issues": "⚠️ {n} validation issue(s) in {rows} row(s). Routemeister may reject these rows.",
+        "validation_report": "🩺 Validation report",
+        "provenance": "🔎 Origin of a cell",
+        "provenance_row": "Row (from 0)",
+        "provenance_column": "Column",
+        "provenance_missing": "This row has no record for {field}.",
+        "warning_parser": "⚠️ {n} SLK record(s) could not be read (completely). See the parser report.",
+        "parser_report": "🧾 Parser report",
+        "parser_report_truncated": "Showing the first {shown} of {n} messages.",
+        "preset": "Mapping preset",
+        "load_preset": "📂 Load",
+        "apply_mapping": "✅ Apply mapping",
+        "preset_name": "Name for new preset",
+        "save_preset": "💾 Save",
+        "preset_saved": "Preset '{name}' saved",
+        "cancel": "⏹️ Cancel",
+        "progress": "{bytes} of {total} bytes read · {rows} rows · {converted} converted · {cleaned} cleaned",
+        "cancelled": "Conversion cancelled",
+        "restart": "🔄 Start again",
+        "profile": "Characters in the export",
+        "profile_unicode": "Unicode (keep umlauts)",
+        "profile_umlauts": "Keep umlauts, ß → ss",
+        "profile_german_ascii": "German ASCII (ä → a, ß → ss)",
+        "profile_ascii": "ASCII for all names (ç, ł, ğ → c, l, g)",
+        "phone_style": "Phone numbers",
+        "phone_style_keep": "As in the file",
+        "phone_style_national": "International with 00 (0049...)",
+        "phone_style_e164": "E.164 (+49...)",
+        "download_format": "Download format",
+        "archive_member": "Export from the archive",
+        "preview_partial": "First {n} patients; the full conversion is still running",
+        "select_language": "Taal / Sprache / Language"
+    }
+}